@@ -0,0 +1,164 @@
+"""
+Benchmark Generators - seeded random inputs for the reducers
+Every generator takes a seed and the same size knobs (variable count, domain size,
+branch count, density), so a benchmark case is fully described by its parameters
+and reproduces the same input on every machine.
+"""
+
+import random
+from itertools import product
+from typing import List, Dict
+
+# Comparison operators of generated branch conditions
+OPERATORS = ('==', '!=', '<', '>=')
+
+# Draws of a branch chain before branch_program gives up on reaching all its arms
+MAX_ATTEMPTS = 1000
+
+
+def _conjunct_count(variables: int, density: float) -> int:
+    """Variables a condition or expression reads, at least one"""
+    return max(1, min(variables, round(density * variables)))
+
+
+def variable_names(variables: int) -> List[str]:
+    """Names of the generated variables: v0, v1, ..."""
+    return [f"v{i}" for i in range(variables)]
+
+
+def variable_domains(variables: int, domain_size: int) -> Dict[str, List[int]]:
+    """Domain 0..domain_size-1 of every generated variable, for generate_all_test_cases"""
+    return {name: list(range(domain_size)) for name in variable_names(variables)}
+
+
+def _random_condition(rng: random.Random, names: List[str], width: int, domain_size: int):
+    """Comparisons of width variables with constants and the operator joining them"""
+    comparisons = [f"{name} {rng.choice(OPERATORS)} {rng.randrange(domain_size)}"
+                   for name in rng.sample(names, width)]
+    return comparisons, 'or' if rng.random() < 0.25 else 'and'
+
+
+def _chain_is_reachable(chain, assignments: List[Dict[str, int]]) -> bool:
+    """Whether some assignment takes each arm of an if/elif/else chain, the else included"""
+    tests = [compile(f" {joiner} ".join(comparisons), '<condition>', 'eval') for comparisons, joiner in chain]
+    reached = set()
+    for assignment in assignments:
+        arm = next((i for i, test in enumerate(tests) if eval(test, {}, assignment)), len(tests))
+        reached.add(arm)
+        if len(reached) > len(tests):
+            return True
+    return False
+
+
+def branch_program(seed: int, variables: int = 4, domain_size: int = 3, branches: int = 6,
+                   density: float = 0.5, language: str = 'python') -> str:
+    """
+    Source of one function whose if/elif chains compare its arguments with constants
+
+    Args:
+        seed: Random seed
+        variables: Function arguments v0..v(n-1)
+        domain_size: Constants are drawn from 0..domain_size-1
+        branches: Conditioned arms (if and elif), in chains of up to three arms with an
+            else; chains are drawn again until some assignment reaches each of their arms
+        density: Share of the variables each condition reads; conditions join their
+            comparisons with 'and', and a quarter of them with 'or'
+        language: 'python' or 'c'
+
+    Returns:
+        Source text
+    """
+    rng = random.Random(seed)
+    names = variable_names(variables)
+    width = _conjunct_count(variables, density)
+    python = language == 'python'
+    assignments = [dict(zip(names, values)) for values in product(range(domain_size), repeat=variables)]
+
+    chains = []
+    for start in range(0, branches, 3):
+        for _ in range(MAX_ATTEMPTS):
+            chain = [_random_condition(rng, names, width, domain_size) for _ in range(min(3, branches - start))]
+            if _chain_is_reachable(chain, assignments):
+                break
+        else:
+            raise ValueError(f"No chain with reachable arms found in {MAX_ATTEMPTS} attempts; "
+                             f"increase domain_size or lower density")
+        chains.append(chain)
+
+    if python:
+        lines = [f"def program({', '.join(names)}):"]
+    else:
+        lines = [f"int program({', '.join('int ' + name for name in names)}) {{"]
+    for number, chain in enumerate(chains):
+        for arm, (comparisons, joiner) in enumerate(chain):
+            value = number * 3 + arm + 1
+            if python:
+                lines.append(f"    {'if' if arm == 0 else 'elif'} {f' {joiner} '.join(comparisons)}:")
+                lines.append(f"        result = {value}")
+            else:
+                condition = f" {'&&' if joiner == 'and' else '||'} ".join(comparisons)
+                lines.append(f"    {'if' if arm == 0 else '} else if'} ({condition}) {{")
+                lines.append(f"        result = {value};")
+        if python:
+            lines.append("    else:")
+            lines.append("        result = 0")
+        else:
+            lines.append("    } else {")
+            lines.append("        result = 0;")
+            lines.append("    }")
+    lines.append("    return result" if python else "    return result;\n}")
+    return "\n".join(lines) + "\n"
+
+
+def expression_set(seed: int, variables: int = 6, expressions: int = 8, density: float = 0.5) -> List[str]:
+    """
+    Boolean expressions over v0..v(n-1), as accepted by reduce_string_expressions
+
+    Args:
+        seed: Random seed
+        variables: Variables to draw from
+        expressions: Expressions to generate
+        density: Share of the variables each expression reads
+
+    Returns:
+        Expression strings
+    """
+    rng = random.Random(seed)
+    names = variable_names(variables)
+    width = _conjunct_count(variables, density)
+
+    result = []
+    for _ in range(expressions):
+        terms = [name if rng.random() < 0.6 else f"not {name}" for name in rng.sample(names, width)]
+        while len(terms) > 1:
+            # Combine two random terms until one expression is left
+            left = terms.pop(rng.randrange(len(terms)))
+            right = terms.pop(rng.randrange(len(terms)))
+            terms.append(f"({left} {rng.choice(('and', 'or'))} {right})")
+        result.append(terms[0])
+    return result
+
+
+def coverage_matrix(seed: int, variables: int = 4, domain_size: int = 3, branches: int = 12,
+                    density: float = 0.2) -> List[List[bool]]:
+    """
+    Random test-by-branch coverage matrix in which every branch is coverable
+
+    Args:
+        seed: Random seed
+        variables: With domain_size, sets the tests to domain_size ** variables, the
+            size of an exhaustive enumeration
+        domain_size: Values per variable
+        branches: Columns
+        density: Probability that a test covers a branch
+
+    Returns:
+        matrix[test][branch]
+    """
+    rng = random.Random(seed)
+    tests = domain_size ** variables
+    matrix = [[rng.random() < density for _ in range(branches)] for _ in range(tests)]
+    for branch in range(branches):
+        if not any(row[branch] for row in matrix):
+            matrix[rng.randrange(tests)][branch] = True
+    return matrix
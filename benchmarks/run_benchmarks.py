@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness - time, peak memory and solution size of every reducer
+Runs each reduction algorithm and backend on seeded generated inputs and compares
+the measurements with a stored baseline. Solution sizes are the same everywhere
+and always checked. Times are compared relative to a calibration workload and peak
+memory only under the Python version of the baseline; both still vary between
+machines, so they only fail the run with --strict, against a baseline saved on the
+same machine.
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generators import branch_program, expression_set, coverage_matrix, variable_domains, variable_names
+from logic_parser import LogicParser
+from coverage_analyzer import CoverageAnalyzer
+from test_reducer import TestReducer
+from string_expression_reducer import reduce_string_expressions
+from simple_expression_reducer import reduce_expressions
+import core_reduction_functions
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+# Slowdowns smaller than this are timer noise, whatever their ratio
+MIN_TIME_DELTA = 0.002
+
+# Timed runs of the calibration workload; the best is kept
+CALIBRATION_REPEAT = 5
+
+# Exhaustive searches (the optimal reducers, and the traced reducer, which always
+# tries optimal first) only run on inputs with at most this many tests
+OPTIMAL_MAX_TESTS = 32
+
+# Benchmark cases: generator parameters per family, all seeded
+BRANCH_CASES = {
+    'small': dict(seed=1, variables=3, domain_size=3, branches=4, density=0.67),
+    'wide': dict(seed=2, variables=6, domain_size=3, branches=9, density=0.34),
+    'deep': dict(seed=3, variables=4, domain_size=5, branches=12, density=0.5),
+}
+EXPRESSION_CASES = {
+    'small': dict(seed=1, variables=4, expressions=6, density=0.5),
+    'medium': dict(seed=2, variables=10, expressions=12, density=0.4),
+    'sparse': dict(seed=3, variables=18, expressions=10, density=0.2),
+}
+MATRIX_CASES = {
+    'small': dict(seed=4, variables=3, domain_size=3, branches=8, density=0.2),
+    'sparse': dict(seed=1, variables=4, domain_size=3, branches=12, density=0.1),
+    'dense': dict(seed=2, variables=4, domain_size=3, branches=20, density=0.4),
+    'large': dict(seed=3, variables=6, domain_size=3, branches=30, density=0.15),
+}
+
+
+@dataclass
+class Measurement:
+    """Result of one benchmark"""
+    name: str
+    seconds: float
+    peak_bytes: int
+    solution_size: Optional[int]  # Tests selected, or generated by an analysis (None if a reducer gave up)
+    calibration_seconds: float  # Calibration time of the run, see calibrate
+    python: str  # Major.minor version; peak memory depends on it
+
+
+def python_version() -> str:
+    return '.'.join(map(str, sys.version_info[:2]))
+
+
+def calibrate() -> float:
+    """Best time of a fixed pure-Python workload, the unit benchmark times are compared in"""
+    best = float('inf')
+    for _ in range(CALIBRATION_REPEAT):
+        start = time.perf_counter()
+        counts = {}
+        for i in range(50000):
+            bits = i * 2654435761 & 0xffffffff
+            counts[bits & 0xff] = counts.get(bits & 0xff, 0) + bin(bits).count('1')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(run: Callable[[], Optional[int]]) -> int:
+    """Peak traced memory of one run, in bytes"""
+    gc.collect()
+    with redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            run()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def measure(name: str, run: Callable[[], Optional[int]], repeat: int, calibration: float) -> Measurement:
+    """
+    Best time of repeat runs, then the peak memory of one run in a fresh interpreter
+
+    The memory run gets its own process because the parser, expression and truth-basis
+    caches that earlier benchmarks fill would otherwise change what a run allocates.
+
+    Args:
+        name: Benchmark name
+        run: Runs the benchmark once and returns its solution size
+        repeat: Timed runs
+        calibration: Result of calibrate for this run
+
+    Returns:
+        Measurement
+    """
+    best = float('inf')
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            size = run()
+            best = min(best, time.perf_counter() - start)
+
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure-memory', name],
+                            stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+    return Measurement(name, best, int(output), size, calibration, python_version())
+
+
+def analyze_program(path: str, params: Dict[str, Any]) -> CoverageAnalyzer:
+    """Parse a generated program and build its test cases and coverage rows"""
+    parser = LogicParser()
+    analyzer = CoverageAnalyzer(parser.parse_file(path), parser.variables)
+    analyzer.generate_all_test_cases(variable_domains(params['variables'], params['domain_size']))
+    analyzer.get_coverage_rows()
+    return analyzer
+
+
+def branch_benchmarks(case: str, params: Dict[str, Any], workdir: str) -> Dict[str, Callable]:
+    """Analysis per parser backend (Python and C), then every TestReducer algorithm"""
+    benchmarks, paths = {}, {}
+    for language, suffix in (('python', '.py'), ('c', '.c')):
+        paths[language] = os.path.join(workdir, f"{case}{suffix}")
+        with open(paths[language], 'w') as f:
+            f.write(branch_program(language=language, **params))
+        benchmarks[f"branches/{case}/analysis[{language}]"] = \
+            lambda path=paths[language]: len(analyze_program(path, params).test_cases)
+
+    with redirect_stdout(io.StringIO()):
+        analyzer = analyze_program(paths['python'], params)
+    reducers = {
+        'greedy': lambda reducer: reducer.reduce_greedy(),
+        'heuristic': lambda reducer: reducer.reduce_heuristic(),
+        'intelligent': lambda reducer: reducer.reduce_intelligent(),
+        'optimal': lambda reducer: reducer.reduce_optimal_small(),
+    }
+    if len(analyzer.test_cases) > OPTIMAL_MAX_TESTS:
+        del reducers['optimal']
+    for algorithm, reduce in reducers.items():
+        def run(reduce=reduce):
+            result = reduce(TestReducer(analyzer))
+            return len(result.minimal_test_cases) if result else None
+        benchmarks[f"branches/{case}/{algorithm}"] = run
+    return benchmarks
+
+
+def expression_benchmarks(case: str, params: Dict[str, Any]) -> Dict[str, Callable]:
+    """Truth-table and cube backends per coverage mode, and the traced-function reducer"""
+    expressions = expression_set(**params)
+    names = variable_names(params['variables'])
+    functions = [eval(f"lambda {', '.join(names)}: {expr}") for expr in expressions]
+
+    def string_reducer(**options):
+        return lambda: len(reduce_string_expressions(expressions, use_cache=False, **options).selected_indices)
+
+    benchmarks = {
+        f"expressions/{case}/truth-table": string_reducer(method='truth-table'),
+        f"expressions/{case}/cubes": string_reducer(method='cubes'),
+        f"expressions/{case}/decision": string_reducer(coverage='decision'),
+        f"expressions/{case}/mcdc": string_reducer(coverage='mcdc'),
+    }
+    if 2 ** len(names) <= OPTIMAL_MAX_TESTS:
+        benchmarks[f"expressions/{case}/traced"] = \
+            lambda: len(reduce_expressions(functions, names).selected_indices)
+    return benchmarks
+
+
+def matrix_benchmarks(case: str, params: Dict[str, Any]) -> Dict[str, Callable]:
+    """Every set cover of core_reduction_functions"""
+    matrix = coverage_matrix(**params)
+    tests = list(range(len(matrix)))
+    branches = list(range(params['branches']))
+    covers = {
+        'greedy': core_reduction_functions.greedy_set_cover,
+        'heuristic': core_reduction_functions.heuristic_set_cover,
+        'intelligent': core_reduction_functions.intelligent_set_cover,
+        'optimal': core_reduction_functions.optimal_set_cover,
+    }
+    if len(matrix) > OPTIMAL_MAX_TESTS:
+        del covers['optimal']
+    benchmarks = {}
+    for algorithm, cover in covers.items():
+        def run(cover=cover):
+            result = cover(matrix, tests, branches)
+            return len(result[0]) if result else None
+        benchmarks[f"matrix/{case}/{algorithm}"] = run
+    return benchmarks
+
+
+def collect_benchmarks(workdir: str, only: str = '') -> Dict[str, Callable]:
+    """
+    Every benchmark by name
+
+    Args:
+        workdir: Directory for the generated programs
+        only: Name of one benchmark; only its case is built (default: all cases)
+    """
+    families = (
+        ('branches', BRANCH_CASES, lambda case, params: branch_benchmarks(case, params, workdir)),
+        ('expressions', EXPRESSION_CASES, expression_benchmarks),
+        ('matrix', MATRIX_CASES, matrix_benchmarks),
+    )
+    benchmarks = {}
+    for family, cases, build in families:
+        for case, params in cases.items():
+            if only.startswith(f"{family}/{case}/") or not only:
+                benchmarks.update(build(case, params))
+    return benchmarks
+
+
+def compare(measurement: Measurement, baseline: Optional[Dict[str, Any]],
+            threshold: float) -> List[Tuple[str, str]]:
+    """
+    Regressions of a measurement against its baseline entry
+
+    Args:
+        measurement: New measurement
+        baseline: Stored measurement of the same benchmark (None if there is none)
+        threshold: Allowed relative growth of time and peak memory
+
+    Returns:
+        (kind, description) per regression, kind being 'time', 'memory' or
+        'solution size' ([] if none)
+    """
+    if baseline is None:
+        return []
+    regressions = []
+    # The baseline time in this machine's seconds
+    expected = baseline['seconds'] / baseline['calibration_seconds'] * measurement.calibration_seconds
+    if measurement.seconds > expected * (1 + threshold) and measurement.seconds - expected > MIN_TIME_DELTA:
+        regressions.append(('time', f"time {expected * 1000:.2f} -> {measurement.seconds * 1000:.2f} ms (calibrated)"))
+    if (baseline['python'] == measurement.python
+            and measurement.peak_bytes > baseline['peak_bytes'] * (1 + threshold)):
+        regressions.append(('memory', f"memory {baseline['peak_bytes'] / 1024:.1f} -> "
+                                      f"{measurement.peak_bytes / 1024:.1f} KiB"))
+    old_size, new_size = baseline['solution_size'], measurement.solution_size
+    if old_size is not None and (new_size is None or new_size > old_size):
+        regressions.append(('solution size', f"solution size {old_size} -> {new_size}"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the reducers on seeded generated inputs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --filter matrix/ --repeat 5
+  python benchmarks/run_benchmarks.py --save-baseline
+        """
+    )
+    parser.add_argument('--filter', default='',
+                        help='Only run benchmarks whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per benchmark; the best is kept (default: 3)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline JSON file (default: benchmarks/baseline.json)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed relative growth of time and peak memory (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--strict', action='store_true',
+                        help='Also fail on time and peak memory regressions (for a baseline saved on this machine)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store the measurements as the new baseline instead of comparing')
+    parser.add_argument('--output',
+                        help='Also write the measurements to this JSON file')
+    # Used by measure: print the peak memory of one run of a benchmark
+    parser.add_argument('--measure-memory', metavar='NAME', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_memory:
+        with tempfile.TemporaryDirectory() as workdir:
+            print(peak_memory(collect_benchmarks(workdir, args.measure_memory)[args.measure_memory]))
+        return
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    measurements, regressed = [], 0
+    calibration = calibrate()
+    print(f"Calibration: {calibration * 1000:.2f} ms\n")
+    print(f"{'Benchmark':<36} {'Time (ms)':>10} {'Peak (KiB)':>11} {'Size':>5}  Baseline")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, run in collect_benchmarks(workdir).items():
+            if args.filter not in name:
+                continue
+            measurement = measure(name, run, args.repeat, calibration)
+            measurements.append(measurement)
+            failed, unchecked = [], []
+            for kind, description in compare(measurement, baseline.get(name), args.threshold):
+                (failed if args.strict or kind == 'solution size' else unchecked).append(description)
+            regressed += bool(failed)
+            status = "ok" if name in baseline else "-"
+            if failed:
+                status = "REGRESSION: " + ", ".join(failed)
+            if unchecked:
+                status += " (unchecked: " + ", ".join(unchecked) + ")"
+            size = '-' if measurement.solution_size is None else measurement.solution_size
+            print(f"{name:<36} {measurement.seconds * 1000:>10.2f} {measurement.peak_bytes / 1024:>11.1f} "
+                  f"{size:>5}  {status}")
+
+    results = {m.name: {k: v for k, v in asdict(m).items() if k != 'name'} for m in measurements}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            # Keep the entries of benchmarks that were filtered out
+            with open(args.baseline) as f:
+                results = {**json.load(f), **results}
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressed:
+        print(f"\n{regressed} of {len(measurements)} benchmarks regressed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+C Tokenizer - single-pass tokens of C-family source (C, C++, Java, JavaScript...)
+The whole source is scanned once by one pattern, so it can be an mmap of a file of
+any size. Comments, preprocessor lines and whitespace are dropped; string literals
+come out as single tokens, so nothing inside them is mistaken for code.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+_TOKEN = re.compile(rb"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<directive>\#(?:\\\r?\n|[^\n])*)
+  | (?P<string>"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?|`(?:\\.|[^`\\])*`?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<number>\.?\d(?:[eEpP][+-]|[\w.])*)
+  | (?P<op>===|!==|==|!=|<=|>=|&&|\|\||->|<<|>>|\+\+|--|.)
+""", re.VERBOSE | re.DOTALL)
+
+# Tokens that are dropped, and those of them that may span lines
+_SKIPPED = ('space', 'comment', 'directive')
+_MULTILINE = ('space', 'comment', 'directive', 'string')
+
+# Brackets that nest
+_OPENING = {'(': ')', '[': ']', '{': '}'}
+
+
+class Token(NamedTuple):
+    """One token with its 1-based line and 0-based column"""
+    kind: str
+    text: str
+    line: int
+    column: int
+
+
+def tokenize(buffer) -> Iterator[Token]:
+    """
+    Tokens of a C-family source in order
+
+    Args:
+        buffer: Source as bytes, or any bytes-like object such as an mmap
+
+    Returns:
+        Iterator of Tokens of kind 'name', 'number', 'string' or 'op'
+    """
+    line, line_start = 1, 0
+    for match in _TOKEN.finditer(buffer):
+        kind = match.lastgroup
+        start = match.start()
+        if kind not in _SKIPPED:
+            text = match.group().decode('utf-8', 'replace')
+            yield Token(kind, text, line, start - line_start)
+        if kind in _MULTILINE:
+            newlines = match.group().count(b'\n')
+            if newlines:
+                line += newlines
+                line_start = start + match.group().rindex(b'\n') + 1
+
+
+class TokenStream:
+    """Tokens with one token of lookahead"""
+
+    def __init__(self, tokens: Iterator[Token]):
+        self._tokens = iter(tokens)
+        self._next = next(self._tokens, None)
+
+    def peek(self) -> Optional[Token]:
+        """Next token without consuming it, None at the end"""
+        return self._next
+
+    def next(self) -> Optional[Token]:
+        """Consume and return the next token, None at the end"""
+        token = self._next
+        if token is not None:
+            self._next = next(self._tokens, None)
+        return token
+
+    def at(self, *texts: str) -> bool:
+        """Whether the next token is code (not a string) with one of the texts"""
+        return self._next is not None and self._next.kind != 'string' and self._next.text in texts
+
+    def accept(self, text: str) -> Optional[Token]:
+        """Consume the next token if it is text"""
+        return self.next() if self.at(text) else None
+
+    def group(self) -> List[Token]:
+        """Tokens inside a parenthesized group, consumed with its parentheses ([] if none follows)"""
+        if not self.accept('('):
+            return []
+        tokens, _ = self.until(')')
+        self.accept(')')
+        return tokens
+
+    def until(self, *texts: str) -> Tuple[List[Token], Optional[Token]]:
+        """
+        Consume tokens up to one of texts outside brackets
+
+        Returns:
+            The tokens before it and the stopping token, which is left unconsumed
+            (None if the input ended first)
+        """
+        tokens, closing = [], []
+        while self._next is not None:
+            token = self._next
+            if token.kind != 'string':
+                if not closing and token.text in texts:
+                    return tokens, token
+                if token.text in _OPENING:
+                    closing.append(_OPENING[token.text])
+                elif closing and token.text == closing[-1]:
+                    closing.pop()
+                elif token.text in _OPENING.values():
+                    # An unbalanced closing bracket ends the enclosing construct
+                    return tokens, token
+            tokens.append(self.next())
+        return tokens, None
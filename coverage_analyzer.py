@@ -2,50 +2,179 @@
 Coverage Analysis for determining which test cases cover which branches
 """
 
-from typing import List, Dict, Set, Tuple, Any
+from typing import List, Dict, Set, Tuple, Any, Iterator, Callable, FrozenSet
 from itertools import product
-from logic_parser import Branch, Condition
+from array import array
+from logic_parser import Branch, Condition, CompoundCondition
 from dataclasses import dataclass
+from observers import AnalysisObserver
+import profiling
+
+# Test cases evaluated between two progress events
+PROGRESS_INTERVAL = 4096
 
 
 @dataclass
+class DomainEncoding:
+    """Dictionary encoding of variable domains - each value is stored as its index in the domain"""
+    variables: List[str]
+    dictionaries: List[List[Any]]
+    
+    def decode(self, codes: Tuple[int, ...]) -> Dict[str, Any]:
+        """Convert a tuple of codes back into variable assignments"""
+        return {var: dictionary[code] for var, dictionary, code in zip(self.variables, self.dictionaries, codes)}
+
+
 class TestCase:
-    """Represents a test case with variable assignments"""
-    values: Dict[str, Any]
-    covered_branches: Set[str]
+    """Lightweight view of one test case in a TestStore - values and branches are materialized on demand"""
+    __slots__ = ('store', 'index')
+    
+    def __init__(self, store: 'TestStore', index: int):
+        self.store = store
+        self.index = index
+    
+    @property
+    def codes(self) -> Tuple[int, ...]:
+        """Dictionary-encoded variable assignments"""
+        return tuple(column[self.index] for column in self.store.columns)
+    
+    @property
+    def values(self) -> Dict[str, Any]:
+        """Decoded variable assignments"""
+        return self.store.encoding.decode(self.codes)
+    
+    @property
+    def coverage_bits(self) -> int:
+        """Bitset of covered branches, indexed like TestStore.branch_ids"""
+        return self.store.coverage[self.index]
+    
+    @property
+    def covered_branches(self) -> Set[str]:
+        """IDs of the branches covered by this test case"""
+        return self.store.decode_coverage(self.coverage_bits)
+    
+    def __eq__(self, other):
+        return isinstance(other, TestCase) and self.store is other.store and self.index == other.index
+    
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+    
+    def __repr__(self):
+        return f"TestCase(index={self.index}, codes={self.codes})"
     
     def __str__(self):
         return f"TestCase({self.values}) -> covers {self.covered_branches}"
 
 
+class TestStore:
+    """Columnar storage of test cases: one code array per variable plus a coverage bitset column"""
+    
+    def __init__(self, encoding: DomainEncoding, branch_ids: List[str]):
+        self.encoding = encoding
+        self.branch_ids = branch_ids
+        self.columns = [array('B' if len(dictionary) <= 256 else 'L') for dictionary in encoding.dictionaries]
+        self.coverage = []
+    
+    def append(self, codes: Tuple[int, ...], coverage_bits: int):
+        """Store one test case"""
+        for column, code in zip(self.columns, codes):
+            column.append(code)
+        self.coverage.append(coverage_bits)
+    
+    def decode_coverage(self, coverage_bits: int) -> Set[str]:
+        """Convert a coverage bitset into branch IDs"""
+        return {branch_id for bit, branch_id in enumerate(self.branch_ids) if coverage_bits >> bit & 1}
+    
+    def __len__(self) -> int:
+        return len(self.coverage)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TestCase(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("test case index out of range")
+        return TestCase(self, index)
+    
+    def __iter__(self) -> Iterator[TestCase]:
+        return (TestCase(self, i) for i in range(len(self)))
+
+
+class CoverageMatrix:
+    """Read-only test x branch view of coverage bitmasks; matrix[i][j] is built on access"""
+    
+    def __init__(self, rows: List[int], n_branches: int):
+        self.rows = rows
+        self.n_branches = n_branches
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def __getitem__(self, index) -> List[bool]:
+        coverage_bits = self.rows[index]
+        return [bool(coverage_bits >> j & 1) for j in range(self.n_branches)]
+    
+    def __iter__(self) -> Iterator[List[bool]]:
+        return (self[i] for i in range(len(self)))
+
+
 class CoverageAnalyzer:
     """Analyzes which test cases provide coverage for which branches"""
     
     def __init__(self, branches: List[Branch], variables: Set[str]):
         self.branches = branches
         self.variables = sorted(variables)  # Sort for consistent ordering
-        self.test_cases = []
+        self.encoding = None
+        self._branch_tables = []
+        
+        # Coverage bits are assigned per distinct branch ID, in order of first appearance
+        self._branch_ids = list(dict.fromkeys(branch.branch_id for branch in branches))
+        self._branch_bits = {branch_id: bit for bit, branch_id in enumerate(self._branch_ids)}
+        self.test_cases = TestStore(DomainEncoding([], []), self._branch_ids)
+        self.observers: List[AnalysisObserver] = []
     
-    def generate_all_test_cases(self, variable_domains: Dict[str, List[Any]] = None) -> List[TestCase]:
+    def add_observer(self, observer: AnalysisObserver):
+        """Report progress to an observer; TestReducers created afterwards report to it too"""
+        self.observers.append(observer)
+    
+    @profiling.timed('enumeration')
+    def generate_all_test_cases(self, variable_domains: Dict[str, List[Any]] = None) -> TestStore:
         """Generate all possible test cases based on variable domains"""
         if not variable_domains:
             # Default domains - boolean for simple cases
             variable_domains = {var: [True, False] for var in self.variables}
         
-        # Generate cartesian product of all variable values
+        # Encode every domain value as its index; values are only decoded for output
         var_names = list(variable_domains.keys())
-        var_values = [variable_domains[var] for var in var_names]
+        self.encoding = DomainEncoding(var_names, [list(variable_domains[var]) for var in var_names])
+        self._build_projection_tables(self.encoding)
         
-        test_cases = []
-        for values in product(*var_values):
-            test_dict = dict(zip(var_names, values))
-            covered = self._evaluate_coverage(test_dict)
-            test_cases.append(TestCase(test_dict, covered))
+        # Generate cartesian product of all variable codes
+        test_cases = TestStore(self.encoding, self._branch_ids)
+        observers = self.observers
+        if observers:
+            total = 1
+            for dictionary in self.encoding.dictionaries:
+                total *= len(dictionary)
+            for observer in observers:
+                observer.on_progress(0, total)
+        for codes in product(*[range(len(values)) for values in self.encoding.dictionaries]):
+            test_cases.append(codes, self._evaluate_projected_coverage(codes))
+            if observers and len(test_cases) % PROGRESS_INTERVAL == 0:
+                for observer in observers:
+                    observer.on_progress(len(test_cases), total)
+        if observers and len(test_cases) % PROGRESS_INTERVAL:
+            for observer in observers:
+                observer.on_progress(len(test_cases), total)
         
+        profiling.count('tests_generated', len(test_cases))
+        if profiling.enabled():
+            profiling.count('rows_after_dedupe', len(set(test_cases.coverage)))
         self.test_cases = test_cases
         return test_cases
     
-    def generate_smart_test_cases(self, variable_domains: Dict[str, List[Any]] = None) -> List[TestCase]:
+    def generate_smart_test_cases(self, variable_domains: Dict[str, List[Any]] = None) -> TestStore:
         """Generate test cases more intelligently based on conditions"""
         if not variable_domains:
             variable_domains = self._infer_domains_from_conditions()
@@ -55,29 +184,35 @@ class CoverageAnalyzer:
         
         return self.generate_all_test_cases(enhanced_domains)
     
+    @profiling.timed('domains')
     def _infer_domains_from_conditions(self) -> Dict[str, List[Any]]:
         """Infer variable domains from the conditions in branches"""
         domains = {}
         
+        # Each distinct condition once, however many branches repeat it
+        leaves = {}
+        for branch in self.branches:
+            for condition in branch.conditions:
+                for leaf in condition.leaves():
+                    leaves.setdefault(leaf.variable, {})[leaf.id] = leaf
+        
         for var in self.variables:
             values = set()
             
             # Look at all conditions involving this variable
-            for branch in self.branches:
-                for condition in branch.conditions:
-                    if condition.variable == var:
-                        # Add the specific value from the condition
-                        try:
-                            if condition.value.lower() in ['true', 'false']:
-                                values.add(condition.value.lower() == 'true')
-                            elif condition.value.isdigit():
-                                values.add(int(condition.value))
-                            elif self._is_float(condition.value):
-                                values.add(float(condition.value))
-                            else:
-                                values.add(condition.value)
-                        except:
-                            values.add(condition.value)
+            for condition in leaves.get(var, {}).values():
+                # Add the specific value from the condition
+                try:
+                    if condition.value.lower() in ['true', 'false']:
+                        values.add(condition.value.lower() == 'true')
+                    elif condition.value.isdigit():
+                        values.add(int(condition.value))
+                    elif self._is_float(condition.value):
+                        values.add(float(condition.value))
+                    else:
+                        values.add(condition.value)
+                except:
+                    values.add(condition.value)
             
             if not values:
                 # Default to boolean if no specific values found
@@ -90,6 +225,7 @@ class CoverageAnalyzer:
         
         return domains
     
+    @profiling.timed('domains')
     def _enhance_domains(self, base_domains: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
         """Add boundary values and negations to domains"""
         enhanced = {}
@@ -115,6 +251,67 @@ class CoverageAnalyzer:
         except ValueError:
             return False
     
+    def _build_projection_tables(self, encoding: DomainEncoding):
+        """Precompute each branch's outcome over the codes of only the variables it reads"""
+        positions = {var: k for k, var in enumerate(encoding.variables)}
+        self._branch_tables = []
+        accepted_codes = {}  # condition id -> codes satisfying it, shared by the branches repeating it
+        
+        for branch in self.branches:
+            leaves = [leaf for condition in branch.conditions for leaf in condition.leaves()]
+            branch_positions = tuple(sorted({positions[c.variable] for c in leaves if c.variable in positions}))
+            
+            # Compile the condition trees once into short-circuiting closures over the codes
+            slots = {encoding.variables[p]: k for k, p in enumerate(branch_positions)}
+            checks = [self._compile_condition(condition, slots, encoding, accepted_codes)
+                      for condition in branch.conditions]
+            
+            # Keyed by the tuple of codes, so tests sharing a projection share a result
+            table = {}
+            for sub_codes in product(*[range(len(encoding.dictionaries[p])) for p in branch_positions]):
+                table[sub_codes] = all(check(sub_codes) for check in checks)
+            
+            self._branch_tables.append((1 << self._branch_bits[branch.branch_id], branch_positions, table))
+    
+    def _compile_condition(self, condition, slots: Dict[str, int], encoding: DomainEncoding,
+                           accepted_codes: Dict[int, FrozenSet[int]]) -> Callable[[Tuple[int, ...]], bool]:
+        """Closure testing a condition tree on the codes of a branch's variables (in slots order)"""
+        if isinstance(condition, CompoundCondition):
+            operands = [self._compile_condition(c, slots, encoding, accepted_codes) for c in condition.operands]
+            if condition.operator == 'not':
+                operand = operands[0]
+                return lambda codes: not operand(codes)
+            if condition.operator == 'and':
+                return lambda codes: all(operand(codes) for operand in operands)
+            return lambda codes: any(operand(codes) for operand in operands)
+        
+        if condition.variable not in slots:
+            return lambda codes: False  # Condition on an unknown variable is never satisfied
+        
+        # Rewrite the condition constant into the set of codes that satisfy it
+        slot = slots[condition.variable]
+        accepted = accepted_codes.get(condition.id)
+        if accepted is None:
+            dictionary = encoding.dictionaries[encoding.variables.index(condition.variable)]
+            accepted = accepted_codes[condition.id] = frozenset(self._encode_condition(condition, dictionary))
+        return lambda codes: codes[slot] in accepted
+    
+    def _encode_condition(self, condition: Condition, dictionary: List[Any]) -> Set[int]:
+        """Get the codes of the domain values that satisfy a condition"""
+        profiling.count('conditions_evaluated', len(dictionary))
+        return {code for code, value in enumerate(dictionary)
+                if self._condition_is_satisfied(condition, {condition.variable: value})}
+    
+    def _evaluate_projected_coverage(self, codes: Tuple[int, ...]) -> int:
+        """Determine the coverage bitset of encoded values using the projection tables"""
+        coverage_bits = 0
+        
+        for branch_bit, branch_positions, table in self._branch_tables:
+            if table[tuple(codes[p] for p in branch_positions)]:
+                coverage_bits |= branch_bit
+        
+        return coverage_bits
+    
     def _evaluate_coverage(self, test_values: Dict[str, Any]) -> Set[str]:
         """Determine which branches are covered by a test case"""
         covered_branches = set()
@@ -128,10 +325,20 @@ class CoverageAnalyzer:
     def _branch_is_covered(self, branch: Branch, test_values: Dict[str, Any]) -> bool:
         """Check if a branch is covered by the given test values"""
         for condition in branch.conditions:
-            if not self._condition_is_satisfied(condition, test_values):
+            if not self._tree_is_satisfied(condition, test_values):
                 return False
         return True
     
+    def _tree_is_satisfied(self, condition, test_values: Dict[str, Any]) -> bool:
+        """Check a condition or a tree of conditions, short-circuiting like Python"""
+        if isinstance(condition, CompoundCondition):
+            if condition.operator == 'not':
+                return not self._tree_is_satisfied(condition.operands[0], test_values)
+            if condition.operator == 'and':
+                return all(self._tree_is_satisfied(c, test_values) for c in condition.operands)
+            return any(self._tree_is_satisfied(c, test_values) for c in condition.operands)
+        return self._condition_is_satisfied(condition, test_values)
+    
     def _condition_is_satisfied(self, condition: Condition, test_values: Dict[str, Any]) -> bool:
         """Check if a condition is satisfied by the test values"""
         if condition.variable not in test_values:
@@ -177,16 +384,27 @@ class CoverageAnalyzer:
         else:
             return value_str
     
-    def get_coverage_matrix(self) -> Tuple[List[TestCase], List[str], List[List[bool]]]:
-        """Get coverage matrix: test_cases x branches"""
-        all_branches = [branch.branch_id for branch in self.branches]
-        matrix = []
+    @profiling.timed('coverage_matrix')
+    def get_coverage_rows(self) -> Tuple[TestStore, List[str], List[int]]:
+        """
+        Get the coverage of each test case as a bitmask: bit j is branch j of self.branches
         
-        for test_case in self.test_cases:
-            row = [branch_id in test_case.covered_branches for branch_id in all_branches]
-            matrix.append(row)
+        Unless branches share an ID, the rows are the store's own coverage column, so
+        no per-test objects are built.
+        """
+        all_branches = [branch.branch_id for branch in self.branches]
+        branch_bits = [self._branch_bits[branch_id] for branch_id in all_branches]
+        if branch_bits == list(range(len(branch_bits))):
+            return self.test_cases, all_branches, self.test_cases.coverage
         
-        return self.test_cases, all_branches, matrix
+        rows = [sum(1 << j for j, bit in enumerate(branch_bits) if coverage_bits >> bit & 1)
+                for coverage_bits in self.test_cases.coverage]
+        return self.test_cases, all_branches, rows
+    
+    def get_coverage_matrix(self) -> Tuple[TestStore, List[str], CoverageMatrix]:
+        """Get coverage matrix: test_cases x branches, as a view that builds rows on access"""
+        test_cases, all_branches, rows = self.get_coverage_rows()
+        return test_cases, all_branches, CoverageMatrix(rows, len(all_branches))
     
     def print_coverage_report(self):
         """Print a coverage report showing which test cases cover which branches"""
@@ -200,9 +418,10 @@ class CoverageAnalyzer:
         
         # Coverage summary
         all_branches = set(branch.branch_id for branch in self.branches)
-        covered_branches = set()
-        for test_case in self.test_cases:
-            covered_branches.update(test_case.covered_branches)
+        covered_bits = 0
+        for coverage_bits in self.test_cases.coverage:
+            covered_bits |= coverage_bits
+        covered_branches = self.test_cases.decode_coverage(covered_bits)
         
         print(f"\nCoverage Summary:")
         print(f"Total branches: {len(all_branches)}")
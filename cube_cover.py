@@ -0,0 +1,188 @@
+"""
+Cube Cover - satisfying sets of boolean expressions as lists of cubes
+A cube is a partial assignment (care, value): the variables whose bits are set in
+care are fixed to their bits in value, the others are free. Tests are picked by
+intersecting cubes across expressions, so the work grows with the number of cubes
+instead of with the 2^n combinations of the variables.
+"""
+
+from typing import List, Tuple, Optional
+
+# Cubes kept per node before giving up on the cube representation
+MAX_CUBES = 1024
+
+Cube = Tuple[int, int]
+
+
+class _TooManyCubes(Exception):
+    """Raised when an expression has no cube form within MAX_CUBES cubes"""
+
+
+def _and_cubes(left: List[Cube], right: List[Cube]) -> List[Cube]:
+    result = set()
+    for care_a, value_a in left:
+        for care_b, value_b in right:
+            # Cubes conflict when a variable both fix is fixed differently
+            if (value_a ^ value_b) & care_a & care_b:
+                continue
+            result.add((care_a | care_b, value_a | value_b))
+    return minimize_cubes(result)
+
+
+def minimize_cubes(cubes) -> List[Cube]:
+    """
+    Merge and absorb cubes without changing the set they cover
+
+    Cubes differing in one fixed variable merge into one without it (the
+    Quine-McCluskey combining step), then cubes inside another cube are dropped.
+
+    Raises:
+        _TooManyCubes: If more than MAX_CUBES cubes remain
+    """
+    cubes = set(cubes)
+    merged = True
+    while merged:
+        merged = False
+        for care, value in list(cubes):
+            if (care, value) not in cubes:
+                continue
+            bits = care
+            while bits:
+                bit = bits & -bits
+                bits &= bits - 1
+                partner = (care, value ^ bit)
+                if partner in cubes:
+                    cubes.discard((care, value))
+                    cubes.discard(partner)
+                    cubes.add((care & ~bit, value & ~bit))
+                    merged = True
+                    break
+
+    if len(cubes) > MAX_CUBES:
+        raise _TooManyCubes()
+
+    # Fewer fixed variables first, so a cube is only checked against larger ones
+    ordered = sorted(cubes, key=lambda cube: bin(cube[0]).count('1'))
+    kept = []
+    for care, value in ordered:
+        if not any(care & outer_care == outer_care and value & outer_care == outer_value
+                   for outer_care, outer_value in kept):
+            kept.append((care, value))
+    return kept
+
+
+def expression_cubes(dag, variables: List[str]) -> Optional[List[List[Cube]]]:
+    """
+    Satisfying cubes of every expression of an ExpressionDAG
+
+    Variable k of variables is bit len(variables)-1-k, so a cube's value with its
+    free variables False is the index of that test in product order.
+
+    Returns:
+        Cube list per expression, or None if an expression has opaque nodes or
+        needs more than MAX_CUBES cubes
+    """
+    n = len(variables)
+    position = {var: n - 1 - k for k, var in enumerate(variables)}
+    memo = {}
+
+    def cubes(node_id, polarity):
+        key = (node_id, polarity)
+        if key in memo:
+            return memo[key]
+        op, args = dag.nodes[node_id]
+        if op == 'var':
+            bit = 1 << position[args]
+            result = [(bit, bit if polarity else 0)]
+        elif op == 'const':
+            result = [(0, 0)] if args == polarity else []
+        elif op == 'not':
+            result = cubes(args, not polarity)
+        elif op in ('and', 'or'):
+            # De Morgan: a negated and is an or of negations and vice versa
+            if (op == 'and') == polarity:
+                result = [(0, 0)]
+                for child in args:
+                    result = _and_cubes(result, cubes(child, polarity))
+            else:
+                result = minimize_cubes(cube for child in args for cube in cubes(child, polarity))
+        elif op in ('eq', 'ne'):
+            left, right = args
+            same = (op == 'eq') == polarity
+            result = minimize_cubes(
+                _and_cubes(cubes(left, True), cubes(right, same))
+                + _and_cubes(cubes(left, False), cubes(right, not same))
+            )
+        else:
+            raise _TooManyCubes()
+        memo[key] = result
+        return result
+
+    try:
+        return [cubes(root, True) for root in dag.roots]
+    except _TooManyCubes:
+        return None
+
+
+def _satisfies(test: int, cubes: List[Cube]) -> bool:
+    return any(test & care == value for care, value in cubes)
+
+
+def select_cube_tests(cube_lists: List[List[Cube]]) -> List[int]:
+    """
+    Greedy tests making every satisfiable expression True at least once
+
+    Each round starts from every cube of an uncovered expression, intersects it
+    with a compatible cube of each other uncovered expression in turn, and keeps
+    the intersection satisfying the most uncovered expressions. Free variables of
+    the chosen cube are set False.
+
+    Returns:
+        Selected test indices in product order
+    """
+    uncovered = {i for i, cubes in enumerate(cube_lists) if cubes}
+    selected = []
+    while uncovered:
+        best_test, best_count = None, 0
+        for seed in sorted(uncovered):
+            for care, value in cube_lists[seed]:
+                for other in sorted(uncovered - {seed}):
+                    for other_care, other_value in cube_lists[other]:
+                        if not (value ^ other_value) & care & other_care:
+                            care, value = care | other_care, value | other_value
+                            break
+                count = sum(1 for i in uncovered if _satisfies(value, cube_lists[i]))
+                if count > best_count:
+                    best_test, best_count = value, count
+        selected.append(best_test)
+        uncovered = {i for i in uncovered if not _satisfies(best_test, cube_lists[i])}
+    return selected
+
+
+class CubeCoverage:
+    """
+    Per-test coverage bitmasks computed on demand from expression cubes
+
+    There is no __len__: len() fails once 2 ** n_variables exceeds a C ssize_t,
+    which the many-variable inputs this class exists for easily reach.
+    """
+
+    def __init__(self, cube_lists: List[List[Cube]], n_variables: int):
+        self.cube_lists = cube_lists
+        self.n_variables = n_variables
+        # Expressions some test makes True (those with at least one cube)
+        self.union = sum(1 << i for i, cubes in enumerate(cube_lists) if cubes)
+
+    @property
+    def n_tests(self) -> int:
+        """Number of tests, 2 ** n_variables"""
+        return 1 << self.n_variables
+
+    def __getitem__(self, test_idx):
+        if not 0 <= test_idx < self.n_tests:
+            raise IndexError(test_idx)
+        return sum(1 << i for i, cubes in enumerate(self.cube_lists) if _satisfies(test_idx, cubes))
+
+    def __iter__(self):
+        for test_idx in range(self.n_tests):
+            yield self[test_idx]
@@ -0,0 +1,222 @@
+"""
+Expression Cache - persistent store of truth columns and minimal test sets
+Entries are keyed by canonicalized expressions, so renamed or reordered copies
+of an expression set share one entry across runs. The same store, in its own
+database file, holds the per-function results of source file analysis.
+"""
+
+import ast
+import atexit
+import json
+import os
+import sqlite3
+import hashlib
+import time
+from pathlib import Path
+from typing import List, Optional, Dict, Any
+
+# Default location and size of the cache; LOGIC_REDUCTION_NO_CACHE=1 disables it
+CACHE_DIR_ENV = 'LOGIC_REDUCTION_CACHE_DIR'
+NO_CACHE_ENV = 'LOGIC_REDUCTION_NO_CACHE'
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'logic_reduction'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Database files in the cache directory
+REDUCTIONS_FILE = 'reductions.sqlite'
+ANALYSIS_FILE = 'analysis.sqlite'
+
+# Hits whose recency update is held back before it is written in one transaction
+MAX_PENDING_TOUCHES = 256
+
+# Bumped whenever the stored value layout changes
+CACHE_VERSION = 3
+
+
+class _Canonicalizer(ast.NodeVisitor):
+    """Render an expression AST with numbered variables and sorted commutative operands"""
+
+    def __init__(self, variables: List[str]):
+        self.names = {var: f"v{i}" for i, var in enumerate(variables)}
+
+    def visit_BoolOp(self, node):
+        op = 'and' if isinstance(node.op, ast.And) else 'or'
+        return f"{op}({','.join(sorted(self.visit(v) for v in node.values))})"
+
+    def visit_UnaryOp(self, node):
+        return f"{type(node.op).__name__}({self.visit(node.operand)})"
+
+    def visit_Compare(self, node):
+        operands = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        if len(node.ops) == 1 and isinstance(node.ops[0], (ast.Eq, ast.NotEq)):
+            operands.sort()
+        ops = ','.join(type(op).__name__ for op in node.ops)
+        return f"Compare[{ops}]({','.join(operands)})"
+
+    def visit_Name(self, node):
+        return self.names.get(node.id, f"name:{node.id}")
+
+    def visit_Constant(self, node):
+        return repr(node.value)
+
+    def generic_visit(self, node):
+        # Anything else keeps its operand order, with variables renamed inside
+        fields = []
+        for name, value in ast.iter_fields(node):
+            if isinstance(value, ast.AST):
+                fields.append(self.visit(value))
+            elif isinstance(value, list):
+                fields.append('[' + ','.join(self.visit(v) if isinstance(v, ast.AST) else repr(v)
+                                             for v in value) + ']')
+            elif name != 'ctx':
+                fields.append(repr(value))
+        return f"{type(node).__name__}({','.join(fields)})"
+
+
+def canonical_expression(expr_str: str, variables: List[str]) -> Optional[str]:
+    """Canonical form of an expression, or None if it does not parse"""
+    try:
+        tree = ast.parse(expr_str.strip(), mode='eval').body
+    except SyntaxError:
+        return None
+    return _Canonicalizer(variables).visit(tree)
+
+
+def cache_key(expressions: List[str], variables: List[str], domain: str = 'bool',
+              mode: str = 'true-only') -> Optional[str]:
+    """
+    Content hash of an expression set and its variable domain
+
+    Args:
+        expressions: Expression strings, in order
+        variables: Variables in enumeration order (renamed v0, v1, ... in the key)
+        domain: Description of the variable domains
+        mode: Coverage mode the stored result was reduced for
+
+    Returns:
+        Hex digest, or None if some expression cannot be canonicalized
+    """
+    canonical = [canonical_expression(expr, variables) for expr in expressions]
+    if any(c is None for c in canonical):
+        return None
+    spec = json.dumps([CACHE_VERSION, domain, mode, len(variables), canonical])
+    return hashlib.sha256(spec.encode()).hexdigest()
+
+
+class ReductionCache:
+    """SQLite-backed cache with least-recently-used eviction by total size"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if path is None:
+            cache_dir = Path(os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR))
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            path = cache_dir / REDUCTIONS_FILE
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._touched = {}  # key -> time of its last hit, not yet written
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry and mark it as recently used (None on a miss or a locked store)
+
+        The recency update is only written by the next flush, so a hit costs no commit.
+        """
+        try:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        if len(self._touched) >= MAX_PENDING_TOUCHES:
+            self.flush()
+        return json.loads(row[0])
+
+    def _write_touches(self):
+        self._conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                               [(used, key) for key, used in self._touched.items()])
+        self._touched.clear()
+
+    def flush(self):
+        """Write the recency of the hits since the last flush, in one transaction"""
+        if not self._touched:
+            return
+        try:
+            self._write_touches()
+            self._conn.commit()
+        except sqlite3.Error:
+            # Lost recency only makes eviction less accurate
+            self._conn.rollback()
+            self._touched.clear()
+
+    def close(self):
+        """Flush pending recency updates and close the database"""
+        self.flush()
+        self._conn.close()
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store an entry, evicting the least recently used ones beyond max_bytes"""
+        data = json.dumps(value)
+        try:
+            # Eviction must see the recency of the hits so far
+            self._write_touches()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+        except sqlite3.Error:
+            # A cache that cannot be written only costs the next run its speedup
+            self._conn.rollback()
+            self._touched.clear()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every entry"""
+        self._conn.execute("DELETE FROM entries")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+_default_caches = {}  # file name -> (pid, ReductionCache)
+
+
+def get_default_cache(filename: str = REDUCTIONS_FILE) -> Optional[ReductionCache]:
+    """
+    Shared cache of this process, or None when disabled or unavailable
+
+    Args:
+        filename: Database in the cache directory (REDUCTIONS_FILE for expression
+            reductions, ANALYSIS_FILE for per-function source analysis)
+    """
+    if os.environ.get(NO_CACHE_ENV):
+        return None
+    # SQLite connections must not cross a fork, so pool workers open their own
+    pid, cache = _default_caches.get(filename, (None, None))
+    if cache is None or pid != os.getpid():
+        try:
+            cache_dir = Path(os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR))
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache = ReductionCache(cache_dir / filename)
+        except (OSError, sqlite3.Error):
+            return None
+        _default_caches[filename] = (os.getpid(), cache)
+        atexit.register(cache.flush)
+    return cache
@@ -0,0 +1,466 @@
+"""
+Expression Reduction Results - structured output of the expression reducers
+The reducers stay quiet; render_report turns a result into a readable report
+"""
+
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import List, Dict, Tuple, Optional, Any
+from core_reduction_functions import optimal_set_cover, greedy_set_cover
+
+# Coverage table rows shown by render_report before truncating
+DEFAULT_MAX_ROWS = 64
+
+# Pairs the exact MC/DC search may try before settling for its best set so far, and
+# the most tests it searches over
+MCDC_SEARCH_STEPS = 5000
+MCDC_SEARCH_MAX_ROWS = 1 << 12
+
+
+@dataclass
+class ExpressionReductionResult:
+    """Minimal test set for a list of boolean expressions"""
+    expressions: List[str]
+    variables: List[str]
+    active_variables: List[str]
+    coverage_masks: List[int]
+    selected_indices: List[int]
+    algorithm: str
+    coverage_percentage: float
+    reduction_ratio: float
+    execution_time: float
+    evaluation_stats: Dict[str, Any] = field(default_factory=dict)
+    targets: List[str] = field(default_factory=list)
+    independence_pairs: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    unresolved_conditions: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        # Without explicit targets, bit i of a mask means expression i is True
+        if not self.targets:
+            self.targets = [f"exp{i+1}" for i in range(len(self.expressions))]
+
+    @property
+    def total_combinations(self) -> int:
+        """Number of enumerated test combinations"""
+        # Lazily computed masks may be too many for len()
+        n_tests = getattr(self.coverage_masks, 'n_tests', None)
+        return len(self.coverage_masks) if n_tests is None else n_tests
+
+    @property
+    def unsatisfiable(self) -> List[int]:
+        """Indices of targets no combination meets"""
+        # Lazily computed masks (see cube_cover.CubeCoverage) know their union
+        covered = getattr(self.coverage_masks, 'union', None)
+        if covered is None:
+            covered = 0
+            for mask in self.coverage_masks:
+                covered |= mask
+        return [i for i in range(len(self.targets)) if not covered >> i & 1]
+
+    def assignment(self, test_idx: int) -> Dict[str, bool]:
+        """Variable values of an enumerated test (in itertools.product order)"""
+        values = {var: False for var in self.variables}
+        n_active = len(self.active_variables)
+        for k, var in enumerate(self.active_variables):
+            values[var] = bool(test_idx >> (n_active - 1 - k) & 1)
+        return values
+
+    def test_name(self, test_idx: int) -> str:
+        """Short name of a test, e.g. 'A=T,B=F'"""
+        return ",".join(f"{var}={str(val)[0]}" for var, val in self.assignment(test_idx).items())
+
+    def covered_targets(self, test_idx: int) -> List[int]:
+        """Indices of the targets a test meets"""
+        mask = self.coverage_masks[test_idx]
+        return [i for i in range(len(self.targets)) if mask >> i & 1]
+
+    @property
+    def selected_assignments(self) -> List[Dict[str, bool]]:
+        """Variable values of the selected tests"""
+        return [self.assignment(i) for i in self.selected_indices]
+
+    @property
+    def selected_tests(self) -> List[str]:
+        """Names of the selected tests"""
+        return [self.test_name(i) for i in self.selected_indices]
+
+
+def solve_coverage(expressions: List[str], variables: List[str], active_variables: List[str],
+                   coverage_masks: List[int], optimal_limit: Optional[int] = None,
+                   targets: Optional[List[str]] = None) -> ExpressionReductionResult:
+    """
+    Pick a minimal set of tests from per-test coverage bitmasks
+
+    Args:
+        expressions: Expression labels
+        variables: All variable names
+        active_variables: Variables enumerated in the masks (the others stay False)
+        coverage_masks: Bitmask of the expressions each enumerated test makes True
+        optimal_limit: Only try the optimal algorithm up to this many tests (None: always)
+        targets: Coverage target labels, bit i of a mask refers to targets[i]
+            (default: expression i is True)
+
+    Returns:
+        ExpressionReductionResult
+    """
+    start_time = time.time()
+
+    if targets is None:
+        targets = [f"exp{i+1}" for i in range(len(expressions))]
+    n_targets = len(targets)
+    coverage_matrix = [[bool(mask >> j & 1) for j in range(n_targets)] for mask in coverage_masks]
+    test_indices = list(range(len(coverage_masks)))
+
+    result = None
+    if optimal_limit is None or len(coverage_masks) <= optimal_limit:
+        result = optimal_set_cover(coverage_matrix, test_indices, targets)
+    if result:
+        algorithm = "Optimal"
+    else:
+        result = greedy_set_cover(coverage_matrix, test_indices, targets)
+        algorithm = "Greedy"
+    selected_indices, coverage_pct, reduction_ratio = result
+
+    return ExpressionReductionResult(
+        list(expressions),
+        list(variables),
+        list(active_variables),
+        coverage_masks,
+        list(selected_indices),
+        algorithm,
+        coverage_pct,
+        reduction_ratio,
+        time.time() - start_time,
+        targets=list(targets)
+    )
+
+
+def _independence_rows(column: int, n_active: int, k: int) -> int:
+    """
+    Rows t where flipping only active variable k (from False to True) flips the column
+
+    Each set bit t pairs test t with test t + 2**(n_active-1-k).
+    """
+    stride = 1 << (n_active - 1 - k)
+    n_rows = 1 << n_active
+    # Rows where variable k is False: the complement of its truth_basis column
+    low = ((1 << stride) - 1) * (((1 << n_rows) - 1) // ((1 << 2 * stride) - 1))
+    return (column ^ (column >> stride)) & low
+
+
+def _search_mcdc(requirements: List[Tuple[str, int, int]], n_active: int,
+                 incumbent: set) -> Tuple[set, bool]:
+    """
+    Smallest test set showing every requirement, by branch and bound over their pairs
+
+    Args:
+        requirements: (label, variable position, independence rows) per requirement
+        n_active: Active variables
+        incumbent: A test set showing every requirement, the bound to beat
+
+    Returns:
+        The best test set found, and whether the search finished (it is minimum)
+    """
+    strides = [1 << (n_active - 1 - pos) for _, pos, _ in requirements]
+    rows_of = [rows for _, _, rows in requirements]
+    by_stride = {}  # stride -> [(requirement, rows)] of the requirements on that variable
+    for j, (rows, stride) in enumerate(zip(rows_of, strides)):
+        by_stride.setdefault(stride, []).append((j, rows))
+    counts = [bin(rows).count('1') for rows in rows_of]
+    shown = [0] * len(requirements)  # Pairs among the chosen tests showing each requirement
+    chosen = set()
+    best = [set(incumbent)]
+    steps = 0
+
+    def toggle(t: int, delta: int):
+        # Pairs t completes (delta=1) or breaks (delta=-1) with the other chosen tests
+        for stride, on_stride in by_stride.items():
+            if t ^ stride in chosen:
+                low = t & ~stride
+                for j, rows in on_stride:
+                    if rows >> low & 1:
+                        shown[j] += delta
+
+    def add(t: int):
+        toggle(t, 1)
+        chosen.add(t)
+
+    def remove(t: int):
+        chosen.discard(t)
+        toggle(t, -1)
+
+    def search() -> bool:
+        nonlocal steps
+        # Branch on the unshown requirement with the fewest pairs
+        pending = min((j for j in range(len(requirements)) if not shown[j]),
+                      key=counts.__getitem__, default=None)
+        if pending is None:
+            best[0] = set(chosen)
+            return True
+        if len(chosen) + 1 >= len(best[0]):
+            return True
+
+        rows, stride = rows_of[pending], strides[pending]
+        # Pairs with one test already chosen first, then pairs of two new tests
+        partners = [t ^ stride for t in chosen if rows >> (t & ~stride) & 1 and t ^ stride not in chosen]
+        for t in partners:
+            steps += 1
+            if steps > MCDC_SEARCH_STEPS:
+                return False
+            add(t)
+            finished = search()
+            remove(t)
+            if not finished:
+                return False
+        if len(chosen) + 2 >= len(best[0]):
+            return True
+        remaining = rows
+        while remaining:
+            t = (remaining & -remaining).bit_length() - 1
+            remaining &= remaining - 1
+            if t in chosen or t + stride in chosen:
+                continue
+            steps += 1
+            if steps > MCDC_SEARCH_STEPS:
+                return False
+            add(t)
+            add(t + stride)
+            finished = search()
+            remove(t + stride)
+            remove(t)
+            if not finished or len(chosen) + 2 >= len(best[0]):
+                return finished
+        return True
+
+    finished = search()
+    return best[0], finished
+
+
+def solve_mcdc(expressions: List[str], variables: List[str], active_variables: List[str],
+               columns: List[int], conditions: List[List[str]],
+               optimal_limit: Optional[int] = 16) -> ExpressionReductionResult:
+    """
+    Pick a small test set showing every condition's independent effect (MC/DC)
+
+    A condition is shown independent by a pair of tests that differ only in that
+    condition and give the expression different values (unique-cause MC/DC). The
+    pairs are read bit-parallel from the truth columns. Small problems are solved
+    exactly; otherwise greedy set cover picks pairs covering every condition, tests
+    no longer needed are dropped, and a branch-and-bound search over the pairs
+    improves on that set (up to MCDC_SEARCH_MAX_ROWS tests). The result is minimum
+    ("Optimal MC/DC") when the search finishes within MCDC_SEARCH_STEPS pairs tried,
+    and only near-minimal ("Greedy MC/DC") otherwise.
+
+    Args:
+        expressions: Expression labels
+        variables: All variable names
+        active_variables: Variables enumerated in the columns (the others stay False)
+        columns: Truth column of each expression, bit t = its value in test t
+        conditions: Variables of each expression whose independence must be shown
+        optimal_limit: Only search exhaustively up to this many tests (None: always)
+
+    Returns:
+        ExpressionReductionResult; conditions without any independence pair are
+        listed in unresolved_conditions
+    """
+    start_time = time.time()
+    n_active = len(active_variables)
+    n_rows = 1 << n_active
+    position = {var: k for k, var in enumerate(active_variables)}
+
+    # Independence rows per requirement (expression i, condition var)
+    requirements = []
+    unresolved = []
+    for i, (column, conds) in enumerate(zip(columns, conditions)):
+        for var in conds:
+            label = f"exp{i+1}:{var}"
+            rows = _independence_rows(column, n_active, position[var]) if var in position else 0
+            if rows:
+                requirements.append((label, position[var], rows))
+            else:
+                unresolved.append(label)
+
+    def shown(rows_selected) -> bool:
+        chosen = 0
+        for t in rows_selected:
+            chosen |= 1 << t
+        return all(rows & chosen & (chosen >> (1 << (n_active - 1 - pos)))
+                   for _, pos, rows in requirements)
+
+    # Small problems: smallest test subset showing every requirement, by size
+    selected = None
+    algorithm = "Optimal"
+    if not requirements:
+        # Nothing can be shown, so no test is needed
+        selected = set()
+    elif optimal_limit is None or n_rows <= optimal_limit:
+        for set_size in range(n_rows + 1):
+            selected = next((set(c) for c in combinations(range(n_rows), set_size) if shown(c)), None)
+            if selected is not None:
+                break
+
+    if selected is None:
+        # Candidate pairs, one per distinct set of requirements they show
+        candidates = {}
+        for k in range(n_active):
+            stride = 1 << (n_active - 1 - k)
+            on_k = [(j, rows) for j, (_, pos, rows) in enumerate(requirements) if pos == k]
+            remaining = 0
+            for _, rows in on_k:
+                remaining |= rows
+            while remaining:
+                t = (remaining & -remaining).bit_length() - 1
+                remaining &= remaining - 1
+                signature = tuple(j for j, rows in on_k if rows >> t & 1)
+                if signature not in candidates:
+                    candidates[signature] = (t, t + stride)
+        pairs = list(candidates.values())
+        pair_matrix = [[j in signature for j in range(len(requirements))] for signature in candidates]
+        selected_pairs, _, _ = greedy_set_cover(pair_matrix, list(range(len(pairs))), requirements)
+        algorithm = "Greedy"
+
+        # Drop tests whose requirements other selected pairs still show
+        selected = set()
+        for p in selected_pairs:
+            selected.update(pairs[p])
+        for t in sorted(selected, reverse=True):
+            if shown(selected - {t}):
+                selected.discard(t)
+
+        if n_rows <= MCDC_SEARCH_MAX_ROWS:
+            selected, exact = _search_mcdc(requirements, n_active, selected)
+            if exact:
+                algorithm = "Optimal"
+
+    # Record one independence pair per requirement among the kept tests
+    chosen = 0
+    for t in selected:
+        chosen |= 1 << t
+    independence_pairs = {}
+    for label, pos, rows in requirements:
+        stride = 1 << (n_active - 1 - pos)
+        hits = rows & chosen & (chosen >> stride)
+        t = (hits & -hits).bit_length() - 1
+        independence_pairs[label] = (t, t + stride)
+
+    n_requirements = len(requirements) + len(unresolved)
+    coverage_pct = len(requirements) / n_requirements * 100 if n_requirements else 100.0
+    coverage_masks = []
+    for t in range(n_rows):
+        coverage_masks.append(sum(1 << i for i, column in enumerate(columns) if column >> t & 1))
+
+    return ExpressionReductionResult(
+        list(expressions),
+        list(variables),
+        list(active_variables),
+        coverage_masks,
+        sorted(selected),
+        f"{algorithm} MC/DC",
+        coverage_pct,
+        len(selected) / n_rows,
+        time.time() - start_time,
+        independence_pairs=independence_pairs,
+        unresolved_conditions=unresolved
+    )
+
+
+def render_report(result: ExpressionReductionResult, stream=None, max_rows: Optional[int] = DEFAULT_MAX_ROWS):
+    """
+    Write a human-readable report of a reduction, line by line
+
+    Args:
+        result: ExpressionReductionResult to describe
+        stream: File-like object to write to (default: sys.stdout)
+        max_rows: Coverage table rows to show before truncating (None: all)
+    """
+    out = stream if stream is not None else sys.stdout
+    n_expressions = len(result.expressions)
+    expression_ids = {f"exp{i+1}": i for i in range(n_expressions)}
+    headers = [f"exp{expression_ids[label]+1:2d}" if label in expression_ids else label
+               for label in result.targets]
+
+    print("EXPRESSION REDUCER", file=out)
+    print("=" * 50, file=out)
+    print("Input expressions:", file=out)
+    for i, expr in enumerate(result.expressions, 1):
+        print(f"  exp{i}: {expr}", file=out)
+    print(file=out)
+
+    print(f"Variables found: {result.variables}", file=out)
+    unread = [var for var in result.variables if var not in result.active_variables]
+    if unread:
+        print(f"Variables not read by any expression (fixed to False): {unread}", file=out)
+    print(f"Total possible combinations: {result.total_combinations}", file=out)
+    print(file=out)
+
+    print("COVERAGE ANALYSIS:", file=out)
+    header = "Test Case" + " " * max(0, 20-len("Test Case")) + "| "
+    header += " | ".join(headers) + " | Covers"
+    print(header, file=out)
+    print("-" * (25 + sum(len(h) + 1 for h in headers) + 15), file=out)
+
+    shown = result.total_combinations if max_rows is None else min(max_rows, result.total_combinations)
+    for test_idx in range(shown):
+        mask = result.coverage_masks[test_idx]
+        cells = " | ".join([f"{'T' if mask >> i & 1 else 'F':{len(h) - 1}s}" for i, h in enumerate(headers)])
+        covered = result.covered_targets(test_idx)
+        covers = ", ".join(result.targets[i] for i in covered) if covered else "none"
+        print(f"{result.test_name(test_idx):23s} | {cells} | {covers}", file=out)
+    if shown < result.total_combinations:
+        print(f"... {result.total_combinations - shown} more rows not shown", file=out)
+    print(file=out)
+
+    unsatisfiable = result.unsatisfiable
+    for i in unsatisfiable:
+        label = result.targets[i]
+        if label in expression_ids:
+            expr = result.expressions[expression_ids[label]]
+            print(f"WARNING: Expression {expression_ids[label]+1} '{expr}' can never be True with these variables!", file=out)
+        else:
+            print(f"WARNING: Target {label} can never be met with these variables!", file=out)
+    if unsatisfiable:
+        n_targets = len(result.targets)
+        noun = "expressions are satisfiable" if n_targets == n_expressions else "targets can be met"
+        print(f"Only {n_targets - len(unsatisfiable)}/{n_targets} {noun}.", file=out)
+        print(file=out)
+
+    for label in result.unresolved_conditions:
+        print(f"WARNING: Condition {label} cannot be shown to independently affect its expression!", file=out)
+    if result.unresolved_conditions:
+        print(file=out)
+
+    print(f"{result.algorithm.upper()} SOLUTION:", file=out)
+    print(f"Minimum test cases needed: {len(result.selected_indices)}/{result.total_combinations}", file=out)
+    print(f"Reduction: {(1-result.reduction_ratio)*100:.1f}%", file=out)
+    print(f"Coverage: {result.coverage_percentage:.1f}%", file=out)
+    stats = result.evaluation_stats
+    if stats.get('cache_hit'):
+        print("Evaluation: loaded from the expression cache", file=out)
+    elif 'dag_nodes' in stats:
+        print(f"Evaluation: {stats['dag_nodes']} shared nodes for {stats['tree_nodes']} expression nodes "
+              f"({stats['evaluations_saved']} evaluations saved) in {stats['evaluation_time']:.3f}s", file=out)
+    elif 'cubes' in stats:
+        print(f"Evaluation: {stats['cubes']} satisfying cubes in {stats['evaluation_time']:.3f}s", file=out)
+    print(file=out)
+
+    if result.independence_pairs:
+        print("INDEPENDENCE PAIRS:", file=out)
+        for label, (t_false, t_true) in result.independence_pairs.items():
+            print(f"  {label}: {result.test_name(t_false)} <-> {result.test_name(t_true)}", file=out)
+        print(file=out)
+
+    print("SELECTED TEST CASES:", file=out)
+    for i, test_idx in enumerate(result.selected_indices, 1):
+        covered = result.covered_targets(test_idx)
+        print(f"  Test {i}: {result.test_name(test_idx)}", file=out)
+        print(f"    Variable values: {result.assignment(test_idx)}", file=out)
+        print(f"    {'Makes True' if len(result.targets) == n_expressions else 'Covers'}: "
+              f"{', '.join(result.targets[j] for j in covered) if covered else 'none'}", file=out)
+
+        # Show expression evaluations
+        mask = result.coverage_masks[test_idx]
+        for j, expr in enumerate(result.expressions):
+            print(f"      exp{j+1}: {expr} = {bool(mask >> result.targets.index(f'exp{j+1}') & 1)}", file=out)
+        print(file=out)
@@ -2,97 +2,586 @@
 Logic Expression Parser for extracting conditions from if/else statements
 """
 
-import re
+import os
 import ast
-from typing import List, Set, Dict, Tuple
-from dataclasses import dataclass
+import copy
+import mmap
+import hashlib
+import itertools
+import weakref
+from contextlib import contextmanager
+from typing import List, Set, Dict, Tuple, Optional, Iterator, Union, Any, Callable, NamedTuple
+from dataclasses import dataclass, field
+from c_tokenizer import Token, TokenStream, tokenize
+import profiling
+
+# Largest expression a local may stand for before it is treated as an input again
+MAX_SYMBOLIC_NODES = 64
+
+# Syntax a local's value may use to be propagated into later conditions
+_SYMBOLIC_NODES = (ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.Compare, ast.cmpop,
+                   ast.Name, ast.Load, ast.Constant, ast.IfExp)
+
+# Files parsed as C-family source without trying Python first
+C_FAMILY_SUFFIXES = {'.c', '.h', '.cc', '.cpp', '.cxx', '.hh', '.hpp', '.cs', '.java',
+                     '.js', '.jsx', '.ts', '.tsx', '.go', '.kt', '.swift', '.php', '.m'}
+
+# Comparison operators of C-family conditions, normalized
+_C_COMPARISONS = {'==': '==', '!=': '!=', '===': '==', '!==': '!=',
+                  '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+# Condition literals, as the Python parser writes them
+_C_LITERALS = {'true': 'True', 'false': 'False'}
+
+
+# Every live condition of this process, by id and by identifying key. The tables
+# hold them weakly, so conditions no branch uses any more (e.g. those of files a
+# batch worker finished) are freed; ids are never reused.
+_CONDITIONS = weakref.WeakValueDictionary()
+_CONDITION_KEYS = weakref.WeakValueDictionary()
+_next_id = itertools.count()
+
+
+def _intern(cls, key: tuple, **fields):
+    """The condition with this key, created on first use"""
+    condition = _CONDITION_KEYS.get(key)
+    if condition is not None:
+        return condition
+    condition = object.__new__(cls)
+    for name, value in fields.items():
+        object.__setattr__(condition, name, value)
+    object.__setattr__(condition, 'id', next(_next_id))
+    _CONDITION_KEYS[key] = condition
+    _CONDITIONS[condition.id] = condition
+    return condition
+
+
+def condition_by_id(condition_id: int) -> Union['Condition', 'CompoundCondition']:
+    """
+    The live condition with an id
+
+    Ids are only meaningful within one process, and only while something (such as
+    a Branch) still holds the condition.
+    """
+    return _CONDITIONS[condition_id]
 
 
-@dataclass
 class Condition:
-    """Represents a single boolean condition"""
-    variable: str
-    operator: str
-    value: str
+    """
+    Represents a single boolean condition
+    
+    Conditions are interned and immutable: equal conditions are one object with
+    one integer id, so comparing and hashing them is by identity.
+    """
+    __slots__ = ('variable', 'operator', 'value', 'id', '__weakref__')
+    
+    def __new__(cls, variable: str, operator: str, value: str):
+        return _intern(cls, ('leaf', variable, operator, value),
+                       variable=variable, operator=operator, value=value)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __reduce__(self):
+        # Ids differ between processes, so a condition is re-interned where it is unpickled
+        return (Condition, (self.variable, self.operator, self.value))
+    
+    def __repr__(self):
+        return f"Condition({self.variable!r}, {self.operator!r}, {self.value!r})"
     
     def __str__(self):
         return f"{self.variable} {self.operator} {self.value}"
     
-    def __hash__(self):
-        return hash((self.variable, self.operator, self.value))
+    def leaves(self) -> List['Condition']:
+        """Single conditions this condition is built from"""
+        return [self]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'variable': self.variable, 'operator': self.operator, 'value': self.value}
+
+
+class CompoundCondition:
+    """Boolean combination of conditions: 'and', 'or' or 'not' (one operand); interned like Condition"""
+    __slots__ = ('operator', 'operands', 'id', '__weakref__')
+    
+    def __new__(cls, operator: str, operands: List[Union[Condition, 'CompoundCondition']]):
+        operands = tuple(operands)
+        return _intern(cls, ('tree', operator, tuple(c.id for c in operands)),
+                       operator=operator, operands=operands)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __reduce__(self):
+        return (CompoundCondition, (self.operator, self.operands))
+    
+    def __repr__(self):
+        return f"CompoundCondition({self.operator!r}, {list(self.operands)!r})"
+    
+    def __str__(self):
+        if self.operator == 'not':
+            return f"NOT ({self.operands[0]})"
+        if not self.operands:
+            return "TRUE" if self.operator == 'and' else "FALSE"
+        return "(" + f" {self.operator.upper()} ".join(str(c) for c in self.operands) + ")"
+    
+    def leaves(self) -> List[Condition]:
+        """Single conditions this condition is built from"""
+        return [leaf for operand in self.operands for leaf in operand.leaves()]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'operator': self.operator, 'operands': [c.to_dict() for c in self.operands]}
+
 
+def condition_from_dict(data: Dict[str, Any]) -> Union[Condition, CompoundCondition]:
+    """Rebuild a condition from its to_dict form"""
+    if 'operands' in data:
+        return CompoundCondition(data['operator'], [condition_from_dict(c) for c in data['operands']])
+    return Condition(data['variable'], data['operator'], data['value'])
 
-@dataclass 
-class Branch:
-    """Represents a code branch with its conditions"""
-    conditions: List[Condition]
+
+class Branch(NamedTuple):
+    """
+    Represents a code branch by its conditions (all of which must hold) and their ids
+    
+    Holding the conditions keeps them, and so their ids, alive as long as the branch.
+    """
+    condition_ids: Tuple[int, ...]
     branch_id: str
+    conditions: Tuple[Union[Condition, CompoundCondition], ...]
+    
+    @classmethod
+    def from_conditions(cls, conditions: List[Union[Condition, CompoundCondition]], branch_id: str) -> 'Branch':
+        conditions = tuple(conditions)
+        return cls(tuple(c.id for c in conditions), branch_id, conditions)
+    
+    def __reduce__(self):
+        return (Branch.from_conditions, (self.conditions, self.branch_id))
     
     def __str__(self):
         return f"Branch {self.branch_id}: {' AND '.join(str(c) for c in self.conditions)}"
 
 
+@dataclass
+class FunctionScope:
+    """Branches and variables of one function, analyzed independently of the rest of its file"""
+    name: str
+    branches: List[Branch]
+    variables: Set[str] = field(default_factory=set)
+    lineno: int = 0
+    fingerprint: str = ''
+
+
 class LogicParser:
     """Extracts logic conditions from source code"""
     
     def __init__(self):
         self.branches = []
         self.variables = set()
+        self._environments = {}  # id(if node) -> {local: expression over inputs} before its test
+        self._filename = '<string>'
+        self._qualnames = {}  # id(function node) -> qualified name
+        self._scope = None  # (qualified name, def line) of the function being parsed, None at module level
+        self._symbolic = set()  # Conditions comparing with a variable or expression instead of a literal
     
+    @profiling.timed('parse')
     def parse_file(self, filepath: str) -> List[Branch]:
         """Parse a source file and extract all branches"""
+        self._filename = os.path.basename(filepath)
+        if os.path.splitext(filepath)[1].lower() in C_FAMILY_SUFFIXES:
+            with self._map_file(filepath) as buffer:
+                self.branches = self._parse_c_family(buffer)
+            return self.branches
+        
         with open(filepath, 'r') as f:
             content = f.read()
         
         # Try to parse as Python first
         try:
             tree = ast.parse(content)
-            return self._parse_ast(tree)
+            self.branches = self._parse_ast(tree)
+        except SyntaxError:
+            # Fall back to C-family parsing for other languages
+            with self._map_file(filepath) as buffer:
+                self.branches = self._parse_c_family(buffer)
+        return self.branches
+    
+    @profiling.timed('parse')
+    def parse_scopes(self, filepath: str,
+                     reuse: Optional[Callable[[str], bool]] = None) -> List[FunctionScope]:
+        """
+        Parse a source file into one scope per function that has branches
+        
+        Args:
+            filepath: Source file
+            reuse: Called with each scope's fingerprint; scopes it accepts (e.g. found
+                in a cache) are returned without extracting their branches
+        
+        Returns:
+            FunctionScopes in source order, reused ones with empty branches
+        """
+        self._filename = os.path.basename(filepath)
+        if os.path.splitext(filepath)[1].lower() in C_FAMILY_SUFFIXES:
+            return self._c_family_scopes(filepath, reuse)
+        
+        with open(filepath, 'r') as f:
+            content = f.read()
+        
+        try:
+            tree = ast.parse(content)
         except SyntaxError:
-            # Fall back to regex parsing for other languages
-            return self._parse_regex(content)
+            return self._c_family_scopes(filepath, reuse)
+        
+        self._propagate_assignments(tree)
+        scopes = []
+        self.branches = []
+        for name, node in [('<module>', tree)] + list(self._function_nodes(tree)):
+            lineno = getattr(node, 'lineno', 0)
+            fingerprint = self._scope_fingerprint(name, node)
+            if reuse and reuse(fingerprint):
+                scopes.append(FunctionScope(name, [], set(), lineno, fingerprint))
+                continue
+            # Variables are collected per scope, and the parser still sees all of them
+            file_variables, self.variables = self.variables, set()
+            self._scope = (name, node.lineno) if node is not tree else None
+            branches = self._collect_branches(node.body, [], nested_functions=False)
+            if branches:
+                scopes.append(FunctionScope(name, branches, self.variables, lineno, fingerprint))
+                self.branches.extend(branches)
+            self.variables = file_variables | self.variables
+        self._scope = None
+        
+        return scopes
+    
+    def _c_family_scopes(self, filepath: str, reuse: Optional[Callable[[str], bool]]) -> List[FunctionScope]:
+        """Without functions to tell apart, the whole file is one scope"""
+        with self._map_file(filepath) as buffer:
+            digest = hashlib.sha256(f"{self._filename}\0".encode())
+            digest.update(buffer)
+            fingerprint = digest.hexdigest()
+            if reuse and reuse(fingerprint):
+                return [FunctionScope('<file>', [], set(), 0, fingerprint)]
+            self.branches = self._parse_c_family(buffer)
+        return [FunctionScope('<file>', self.branches, set(self.variables), 0, fingerprint)] if self.branches else []
+    
+    @contextmanager
+    def _map_file(self, filepath: str):
+        """Read-only memory map of a file (empty bytes for an empty file, which cannot be mapped)"""
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+    
+    def _scope_fingerprint(self, name: str, node: ast.AST) -> str:
+        """
+        Content hash of a scope: its syntax tree without nested functions, with
+        positions relative to the def line as in its branch IDs
+        """
+        base = getattr(node, 'lineno', 0)
+        digest = hashlib.sha256(f"{self._filename}\0{name}".encode())
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            fields = [type(current).__name__]
+            if hasattr(current, 'lineno'):
+                fields += [current.lineno - base, current.col_offset]
+            for field_name, value in ast.iter_fields(current):
+                values = value if isinstance(value, list) else [value]
+                fields.append(repr([v if not isinstance(v, ast.AST) else None for v in values]))
+                for child in reversed(values):
+                    if not isinstance(child, ast.AST):
+                        continue
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        # Nested functions are scopes of their own; only their name is visible here
+                        fields.append(child.name)
+                    else:
+                        pending.append(child)
+            digest.update(repr(fields).encode())
+        return digest.hexdigest()
+    
+    def _function_nodes(self, node: ast.AST, prefix: str = '') -> Iterator[Tuple[str, ast.AST]]:
+        """Every function below a node with its qualified name (Class.method, outer.inner)"""
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                yield prefix + child.name, child
+                yield from self._function_nodes(child, f"{prefix}{child.name}.")
+            elif isinstance(child, ast.ClassDef):
+                yield from self._function_nodes(child, f"{prefix}{child.name}.")
+            else:
+                yield from self._function_nodes(child, prefix)
     
     def _parse_ast(self, tree: ast.AST) -> List[Branch]:
         """Parse Python AST to extract if/else branches"""
+        self._propagate_assignments(tree)
+        return self._collect_branches(tree.body, [])
+    
+    def _collect_branches(self, statements: List[ast.stmt], path_conditions: List[Condition],
+                          nested_functions: bool = True) -> List[Branch]:
+        """Branches of a block in source order, each under the conditions that lead to it"""
         branches = []
-        
+        for stmt in statements:
+            if isinstance(stmt, ast.If):
+                branches.extend(self._extract_if_branches(stmt, path_conditions, nested_functions))
+            elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                # A function body runs when called, not under the conditions around its definition
+                if nested_functions:
+                    outer_scope = self._scope
+                    self._scope = (self._qualnames.get(id(stmt), stmt.name), stmt.lineno)
+                    branches.extend(self._collect_branches(stmt.body, [], nested_functions))
+                    self._scope = outer_scope
+            else:
+                blocks = [getattr(stmt, name, []) for name in ('body', 'orelse', 'finalbody')]
+                blocks += [handler.body for handler in getattr(stmt, 'handlers', [])]
+                blocks += [case.body for case in getattr(stmt, 'cases', [])]
+                for block in blocks:
+                    branches.extend(self._collect_branches(block, path_conditions, nested_functions))
+        return branches
+    
+    def _propagate_assignments(self, tree: ast.AST):
+        """Record what the locals assigned before each if statement stand for"""
+        self._environments = {}
+        self._qualnames = {id(node): name for name, node in self._function_nodes(tree)}
         for node in ast.walk(tree):
-            if isinstance(node, ast.If):
-                branches.extend(self._extract_if_branches(node))
+            if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._propagate_block(node.body, {})
+    
+    def _propagate_block(self, statements: List[ast.stmt], env: Dict[str, ast.expr]) -> Dict[str, ast.expr]:
+        """Follow the statements of a block in order, returning the locals known after it"""
+        for stmt in statements:
+            if isinstance(stmt, ast.If):
+                env = self._propagate_if(stmt, env)
+            elif self._assigned_local(stmt):
+                name = self._assigned_local(stmt)
+                value = self._substitute(stmt.value, env)
+                env = self._kill(env, {name})
+                if self._is_symbolic(value):
+                    env[name] = value
+            elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                env = self._kill(env, {stmt.name})
+            else:
+                # Loops, with, try...: whatever they assign is unknown, also inside a loop body
+                env = self._kill(env, self._assigned_names(stmt))
+                for field in ('body', 'orelse', 'finalbody'):
+                    self._propagate_block(getattr(stmt, field, []), env)
+                for handler in getattr(stmt, 'handlers', []):
+                    self._propagate_block(handler.body, env)
+        return env
+    
+    def _propagate_if(self, if_node: ast.If, env: Dict[str, ast.expr]) -> Dict[str, ast.expr]:
+        """Locals known after an if statement - those both arms leave known become conditional"""
+        self._environments[id(if_node)] = env
+        test = self._substitute(if_node.test, env)
+        body_env = self._propagate_block(if_node.body, env)
+        else_env = self._propagate_block(if_node.orelse, env)
         
-        return branches
+        assigned = self._assigned_names(if_node)
+        merged = self._kill(env, assigned)
+        for name in sorted(assigned):
+            if name in body_env and name in else_env:
+                value = self._select(test, body_env[name], else_env[name])
+                if self._is_symbolic(value):
+                    merged[name] = value
+        return merged
+    
+    def _assigned_local(self, stmt: ast.stmt) -> Optional[str]:
+        """Name of a plain `name = value` assignment, or None"""
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            target = stmt.targets[0]
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            target = stmt.target
+        else:
+            return None
+        return target.id if isinstance(target, ast.Name) else None
+    
+    def _assigned_names(self, node: ast.AST) -> Set[str]:
+        """Names stored anywhere inside a statement"""
+        return {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
     
-    def _extract_if_branches(self, if_node: ast.If, parent_conditions: List[Condition] = None) -> List[Branch]:
-        """Extract branches from an if statement"""
+    def _kill(self, env: Dict[str, ast.expr], names: Set[str]) -> Dict[str, ast.expr]:
+        """Copy of env without the names and the locals whose value reads them"""
+        return {local: value for local, value in env.items()
+                if local not in names and not any(isinstance(n, ast.Name) and n.id in names
+                                                  for n in ast.walk(value))}
+    
+    def _substitute(self, node: ast.expr, env: Dict[str, ast.expr]) -> ast.expr:
+        """Copy of an expression with known locals replaced by what they stand for"""
+        if not env:
+            return node
+        if isinstance(node, ast.Name) and node.id in env:
+            return copy.deepcopy(env[node.id])
+        node = copy.copy(node)
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, ast.expr):
+                setattr(node, field, self._substitute(value, env))
+            elif isinstance(value, list):
+                setattr(node, field, [self._substitute(v, env) if isinstance(v, ast.expr) else v
+                                      for v in value])
+        return node
+    
+    def _is_symbolic(self, node: ast.expr) -> bool:
+        """Whether an expression is small, side-effect free logic over names and constants"""
+        nodes = list(ast.walk(node))
+        return len(nodes) <= MAX_SYMBOLIC_NODES and all(isinstance(n, _SYMBOLIC_NODES) for n in nodes)
+    
+    def _select(self, test: ast.expr, body: ast.expr, orelse: ast.expr) -> ast.expr:
+        """Expression for `body if test else orelse`, simplified for boolean constants"""
+        if ast.dump(body) == ast.dump(orelse):
+            return body
+        if isinstance(body, ast.Constant) and isinstance(orelse, ast.Constant):
+            if body.value is True and orelse.value is False:
+                return test
+            if body.value is False and orelse.value is True:
+                return ast.UnaryOp(ast.Not(), test)
+        if isinstance(orelse, ast.Constant) and orelse.value is False:
+            return ast.BoolOp(ast.And(), [test, body])
+        if isinstance(body, ast.Constant) and body.value is False:
+            return ast.BoolOp(ast.And(), [ast.UnaryOp(ast.Not(), test), orelse])
+        return ast.IfExp(test, body, orelse)
+    
+    def _branch_id(self, node: ast.AST, arm: str) -> str:
+        """
+        Stable ID of a branch arm from its file, line, column and arm
+        
+        Inside a function the line counts from the def line (name+offset), so edits
+        elsewhere in the file leave the ID unchanged.
+        """
+        if self._scope is None:
+            return f"{self._filename}:{node.lineno}:{node.col_offset}:{arm}"
+        name, def_line = self._scope
+        return f"{self._filename}:{name}+{node.lineno - def_line}:{node.col_offset}:{arm}"
+    
+    def _extract_if_branches(self, if_node: ast.If, parent_conditions: List[Condition] = None,
+                             nested_functions: bool = True, is_elif: bool = False) -> List[Branch]:
+        """Extract branches from an if statement and the statements nested in its arms"""
         if parent_conditions is None:
             parent_conditions = []
         
         branches = []
         
-        # Extract condition from the if statement
-        if_condition = self._extract_condition(if_node.test)
+        # Extract condition from the if statement, over the inputs where locals are known
+        if_condition = self._extract_propagated_condition(if_node.test, self._environments.get(id(if_node), {}))
         if_conditions = parent_conditions + [if_condition] if if_condition else parent_conditions
+        else_condition = self._negate_condition(if_condition) if if_condition else None
+        else_conditions = parent_conditions + [else_condition] if else_condition else parent_conditions
         
-        # Create branch for if body
-        branch_id = f"if_{len(self.branches)}"
-        branches.append(Branch(if_conditions, branch_id))
+        # Arms whose path conditions contradict each other can never run, nor can anything inside them
+        if self._is_feasible(if_conditions):
+            branch_id = self._branch_id(if_node, 'elif' if is_elif else 'if')
+            branches.append(Branch.from_conditions(if_conditions, branch_id))
+            branches.extend(self._collect_branches(if_node.body, if_conditions, nested_functions))
         
-        # Handle else/elif
-        if if_node.orelse:
+        # Handle else/elif - both only run when the test is False
+        if if_node.orelse and self._is_feasible(else_conditions):
             if len(if_node.orelse) == 1 and isinstance(if_node.orelse[0], ast.If):
                 # elif case
-                branches.extend(self._extract_if_branches(if_node.orelse[0], parent_conditions))
+                branches.extend(self._extract_if_branches(if_node.orelse[0], else_conditions,
+                                                          nested_functions, is_elif=True))
             else:
                 # else case
-                else_condition = self._negate_condition(if_condition) if if_condition else None
-                else_conditions = parent_conditions + [else_condition] if else_condition else parent_conditions
-                else_branch_id = f"else_{len(self.branches)}"
-                branches.append(Branch(else_conditions, else_branch_id))
+                else_branch_id = self._branch_id(if_node, 'else')
+                branches.append(Branch.from_conditions(else_conditions, else_branch_id))
+                branches.extend(self._collect_branches(if_node.orelse, else_conditions, nested_functions))
         
         return branches
     
-    def _extract_condition(self, node: ast.AST) -> Condition:
-        """Extract a condition from an AST node"""
+    def _is_feasible(self, conditions: List[Condition]) -> bool:
+        """
+        False if some variable's conditions cannot all hold at once
+        
+        Only comparisons with literals are checked: x == y and x == z can both hold.
+        """
+        by_variable = {}
+        pending = list(conditions)
+        while pending:
+            condition = pending.pop()
+            if isinstance(condition, CompoundCondition):
+                # Operands of an and must all hold; an empty or never does; other trees are not checked
+                if condition.operator == 'and':
+                    pending.extend(condition.operands)
+                elif condition.operator == 'or' and not condition.operands:
+                    return False
+                continue
+            if condition in self._symbolic:
+                continue
+            by_variable.setdefault(condition.variable, []).append(condition)
+        
+        for var_conditions in by_variable.values():
+            equal = {self._comparable(c.value) for c in var_conditions if c.operator == "=="}
+            not_equal = {self._comparable(c.value) for c in var_conditions if c.operator == "!="}
+            if len(equal) > 1 or equal & not_equal:
+                return False
+            
+            # Numeric bounds as (value, inclusive)
+            lower, upper = None, None
+            for c in var_conditions:
+                value = self._comparable(c.value)
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                bound = (value, c.operator in (">=", "<="))
+                if c.operator in (">", ">="):
+                    if lower is None or value > lower[0] or value == lower[0] and not bound[1]:
+                        lower = bound
+                elif c.operator in ("<", "<="):
+                    if upper is None or value < upper[0] or value == upper[0] and not bound[1]:
+                        upper = bound
+            
+            # Equality with a numeric value has to fall inside the bounds
+            for value in equal:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if lower is not None and (value < lower[0] or value == lower[0] and not lower[1]):
+                        return False
+                    if upper is not None and (value > upper[0] or value == upper[0] and not upper[1]):
+                        return False
+            if lower is not None and upper is not None:
+                if lower[0] > upper[0] or lower[0] == upper[0] and not (lower[1] and upper[1]):
+                    return False
+        
+        return True
+    
+    def _comparable(self, value: str):
+        """Condition value as a number where it is one, so 1 and 1.0 compare equal"""
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    
+    def _extract_condition(self, node: ast.AST) -> Optional[Union[Condition, CompoundCondition]]:
+        """Extract a condition, or a tree of conditions for and/or/not, from an AST node"""
+        if isinstance(node, ast.BoolOp):
+            # An operand we cannot model would make the whole tree wrong once negated
+            operands = [self._extract_condition(value) for value in node.values]
+            if any(operand is None for operand in operands):
+                return None
+            return CompoundCondition('and' if isinstance(node.op, ast.And) else 'or', operands)
+        
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return self._negate_condition(self._extract_condition(node.operand))
+        
+        if isinstance(node, ast.IfExp):
+            return self._extract_condition(ast.BoolOp(ast.Or(), [
+                ast.BoolOp(ast.And(), [node.test, node.body]),
+                ast.BoolOp(ast.And(), [ast.UnaryOp(ast.Not(), node.test), node.orelse])
+            ]))
+        
+        if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+            # An empty and always holds, an empty or never does
+            return CompoundCondition('and' if node.value else 'or', [])
+        
+        # Boolean logic and conditionals compared with a constant, e.g. after propagation
+        if (isinstance(node, ast.Compare) and len(node.ops) == 1
+                and isinstance(node.ops[0], (ast.Eq, ast.NotEq))
+                and isinstance(node.comparators[0], ast.Constant)
+                and isinstance(node.left, (ast.IfExp, ast.Compare, ast.UnaryOp, ast.BoolOp))):
+            equal = self._resolve_comparison(node.left, node.comparators[0].value)
+            condition = self._extract_condition(equal) if equal is not None else None
+            return condition if isinstance(node.ops[0], ast.Eq) else self._negate_condition(condition)
+        
         if isinstance(node, ast.Compare):
             if len(node.ops) == 1 and len(node.comparators) == 1:
                 left = self._get_variable_name(node.left)
@@ -101,7 +590,7 @@ class LogicParser:
                 
                 if left and op and right:
                     self.variables.add(left)
-                    return Condition(left, op, right)
+                    return self._comparison(left, op, right, self._is_literal(node.comparators[0]))
         
         elif isinstance(node, ast.Name):
             # Boolean variable
@@ -110,6 +599,36 @@ class LogicParser:
         
         return None
     
+    def _extract_propagated_condition(self, node: ast.AST, env: Dict[str, ast.expr]) -> Condition:
+        """Extract a condition with known locals rewritten into conditions on the inputs"""
+        if any(isinstance(n, ast.Name) and n.id in env for n in ast.walk(node)):
+            condition = self._extract_condition(self._substitute(node, env))
+            if condition:
+                return condition
+        return self._extract_condition(node)
+    
+    def _resolve_comparison(self, node: ast.expr, value) -> Optional[ast.expr]:
+        """Expression for `node == value` without the comparison, if one exists"""
+        if isinstance(node, ast.Constant):
+            return ast.Constant(node.value == value)
+        
+        if isinstance(node, ast.IfExp):
+            body = self._resolve_comparison(node.body, value)
+            orelse = self._resolve_comparison(node.orelse, value)
+            if body is None or orelse is None:
+                return None
+            return self._select(node.test, body, orelse)
+        
+        # Comparisons and logic evaluate to booleans
+        if isinstance(node, (ast.Compare, ast.UnaryOp, ast.BoolOp)):
+            if value is True:
+                return node
+            if value is False:
+                return ast.UnaryOp(ast.Not(), node)
+            return None
+        
+        return ast.Compare(node, [ast.Eq()], [ast.Constant(value)])
+    
     def _get_variable_name(self, node: ast.AST) -> str:
         """Get variable name from AST node"""
         if isinstance(node, ast.Name):
@@ -138,15 +657,40 @@ class LogicParser:
         """Get value from AST node"""
         if isinstance(node, ast.Constant):
             return str(node.value)
+        elif self._is_literal(node):
+            # Negated number
+            return str(-node.operand.value if isinstance(node.op, ast.USub) else node.operand.value)
         elif isinstance(node, ast.Name):
             return node.id
         return str(node)
     
-    def _negate_condition(self, condition: Condition) -> Condition:
+    def _is_literal(self, node: ast.AST) -> bool:
+        """Whether a comparison operand is a constant, such as 3, 'a' or -1"""
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            node = node.operand
+            return (isinstance(node, ast.Constant) and isinstance(node.value, (int, float))
+                    and not isinstance(node.value, bool))
+        return isinstance(node, ast.Constant)
+    
+    def _comparison(self, variable: str, operator: str, value: str, literal: bool) -> Condition:
+        """Condition of a comparison, remembering whether its value is a literal"""
+        condition = Condition(variable, operator, value)
+        if not literal:
+            self._symbolic.add(condition)
+        return condition
+    
+    def _negate_condition(self, condition):
         """Create negated version of a condition"""
         if not condition:
             return None
         
+        if isinstance(condition, CompoundCondition):
+            if condition.operator == 'not':
+                return condition.operands[0]
+            # De Morgan keeps the tree the same size
+            return CompoundCondition('or' if condition.operator == 'and' else 'and',
+                                     [self._negate_condition(c) for c in condition.operands])
+        
         neg_op_map = {
             "==": "!=",
             "!=": "==", 
@@ -157,41 +701,243 @@ class LogicParser:
         }
         
         neg_op = neg_op_map.get(condition.operator, f"not ({condition.operator})")
-        return Condition(condition.variable, neg_op, condition.value)
+        return self._comparison(condition.variable, neg_op, condition.value, condition not in self._symbolic)
     
-    def _parse_regex(self, content: str) -> List[Branch]:
-        """Fallback regex-based parsing for non-Python code"""
-        branches = []
+    def _parse_c_family(self, buffer) -> List[Branch]:
+        """
+        Branches of C-family source (C, C++, Java, JavaScript...) in one pass over its tokens
         
-        # Simple regex to find if statements
-        if_pattern = r'if\s*\((.*?)\)'
-        matches = re.finditer(if_pattern, content, re.MULTILINE)
+        Handles if/else if/else and switch/case with path conditions as for Python;
+        loops and other statements are walked for the branches inside them.
+        """
+        stream = TokenStream(tokenize(buffer))
+        branches = []
+        while stream.peek() is not None:
+            self._c_statement(stream, [], True, branches)
+            # A stray closing brace ends no block at the top level
+            stream.accept('}')
+        return branches
+    
+    def _c_branch_id(self, token: Token, arm: str) -> str:
+        return f"{self._filename}:{token.line}:{token.column}:{arm}"
+    
+    def _c_statement(self, stream: TokenStream, path_conditions: List[Condition], live: bool,
+                     branches: List[Branch]):
+        """Consume one statement; branches are only recorded while live (the path is feasible)"""
+        if stream.at('if'):
+            self._c_if(stream, path_conditions, live, branches)
+        elif stream.at('switch'):
+            self._c_switch(stream, path_conditions, live, branches)
+        elif stream.at('{'):
+            stream.next()
+            self._c_block(stream, path_conditions, live, branches)
+        elif stream.at('for', 'while'):
+            # Loop conditions are not branch conditions; the body runs under the same path
+            stream.next()
+            stream.group()
+            self._c_statement(stream, path_conditions, live, branches)
+        elif stream.at('do', 'else'):
+            stream.next()
+            self._c_statement(stream, path_conditions, live, branches)
+        else:
+            # Anything else runs to its semicolon; braces inside it (function bodies,
+            # callbacks...) are blocks, and one outside parentheses ends the statement
+            depth = 0
+            while stream.peek() is not None and not (depth == 0 and stream.at('}')):
+                token = stream.next()
+                if token.kind == 'string':
+                    continue
+                if token.text == '{':
+                    self._c_block(stream, path_conditions, live, branches)
+                    if depth == 0:
+                        return
+                elif token.text == '(':
+                    depth += 1
+                elif token.text == ')':
+                    depth = max(depth - 1, 0)
+                elif token.text == ';' and depth == 0:
+                    return
+    
+    def _c_block(self, stream: TokenStream, path_conditions: List[Condition], live: bool,
+                 branches: List[Branch]):
+        """Consume the statements of a block after its opening brace, and the closing brace"""
+        while stream.peek() is not None and not stream.at('}'):
+            self._c_statement(stream, path_conditions, live, branches)
+        stream.accept('}')
+    
+    def _c_if(self, stream: TokenStream, path_conditions: List[Condition], live: bool,
+              branches: List[Branch]):
+        """Consume an if statement with its else if/else chain"""
+        arm = 'if'
+        while True:
+            if_token = stream.next()
+            condition = self._c_condition(stream.group())
+            if_conditions = path_conditions + [condition] if condition else path_conditions
+            else_condition = self._negate_condition(condition) if condition else None
+            else_conditions = path_conditions + [else_condition] if else_condition else path_conditions
+            
+            if_live = live and self._is_feasible(if_conditions)
+            if if_live:
+                branches.append(Branch.from_conditions(if_conditions, self._c_branch_id(if_token, arm)))
+            self._c_statement(stream, if_conditions, if_live, branches)
+            
+            # else if chains are followed in a loop, so long generated chains need no recursion
+            if not stream.accept('else'):
+                return
+            path_conditions, live = else_conditions, live and self._is_feasible(else_conditions)
+            if stream.at('if'):
+                arm = 'elif'
+                continue
+            if live:
+                branches.append(Branch.from_conditions(else_conditions, self._c_branch_id(if_token, 'else')))
+            self._c_statement(stream, else_conditions, live, branches)
+            return
+    
+    def _c_switch(self, stream: TokenStream, path_conditions: List[Condition], live: bool,
+                  branches: List[Branch]):
+        """Consume a switch statement; each case is a branch, and so is default"""
+        stream.next()
+        subject = self._c_name(stream.group())
+        if not stream.accept('{'):
+            self._c_statement(stream, path_conditions, live, branches)
+            return
         
-        for i, match in enumerate(matches):
-            condition_str = match.group(1).strip()
-            conditions = self._parse_condition_string(condition_str)
-            branch_id = f"branch_{i}"
-            branches.append(Branch(conditions, branch_id))
+        cases, default_token = [], None
+        case_conditions, case_live = path_conditions, live
+        while stream.peek() is not None and not stream.at('}'):
+            if not stream.at('case', 'default'):
+                self._c_statement(stream, case_conditions, case_live, branches)
+                continue
+            label = stream.next()
+            value_tokens, _ = stream.until(':', ';', '}')
+            stream.accept(':')
+            if label.text == 'default':
+                # Its conditions (no case matches) are only known once all cases are seen
+                default_token = label
+                case_conditions, case_live = path_conditions, live
+                continue
+            value = self._c_value(value_tokens)
+            condition = None
+            if subject and value is not None:
+                condition = self._comparison(subject, '==', value, self._c_is_literal(value_tokens))
+            if condition:
+                self.variables.add(subject)
+                cases.append(condition)
+            case_conditions = path_conditions + [condition] if condition else path_conditions
+            case_live = live and self._is_feasible(case_conditions)
+            if case_live:
+                branches.append(Branch.from_conditions(case_conditions, self._c_branch_id(label, 'case')))
+        stream.accept('}')
         
-        return branches
+        if default_token is not None:
+            default_conditions = path_conditions + [self._negate_condition(c) for c in cases]
+            if live and self._is_feasible(default_conditions):
+                branches.append(Branch.from_conditions(default_conditions, self._c_branch_id(default_token, 'default')))
     
-    def _parse_condition_string(self, condition_str: str) -> List[Condition]:
-        """Parse condition string into Condition objects"""
-        # Simple parsing for basic conditions
-        conditions = []
+    def _c_condition(self, tokens: List[Token]) -> Optional[Union[Condition, CompoundCondition]]:
+        """Condition of C-family tokens: || over && over ! over comparisons"""
+        if not tokens:
+            return None
+        for operators, operator in ((('||', 'or'), 'or'), (('&&', 'and'), 'and')):
+            parts = self._c_split(tokens, operators)
+            if len(parts) > 1:
+                # An operand we cannot model would make the whole tree wrong once negated
+                operands = [self._c_condition(part) for part in parts]
+                if any(operand is None for operand in operands):
+                    return None
+                return CompoundCondition(operator, operands)
         
-        # Split on AND/OR (for now just handle AND)
-        parts = re.split(r'\s+&&\s+|\s+and\s+', condition_str, flags=re.IGNORECASE)
+        if tokens[0].text in ('!', 'not') and tokens[0].kind != 'string':
+            return self._negate_condition(self._c_condition(tokens[1:]))
+        if tokens[0].text == '(' and len(self._c_split(tokens, (')',))) == 2 and tokens[-1].text == ')':
+            return self._c_condition(tokens[1:-1])
+        return self._c_comparison(tokens)
+    
+    def _c_split(self, tokens: List[Token], operators: Tuple[str, ...]) -> List[List[Token]]:
+        """Split tokens at the operators outside brackets"""
+        parts, current, closing = [], [], []
+        for token in tokens:
+            if token.kind != 'string':
+                if token.text in ('(', '[', '{'):
+                    closing.append(token.text)
+                elif token.text in (')', ']', '}') and closing:
+                    closing.pop()
+                    if not closing and token.text in operators:
+                        current.append(token)
+                        parts.append(current)
+                        current = []
+                        continue
+                elif not closing and token.text in operators:
+                    parts.append(current)
+                    current = []
+                    continue
+            current.append(token)
+        parts.append(current)
+        return parts
+    
+    def _c_comparison(self, tokens: List[Token]) -> Optional[Union[Condition, CompoundCondition]]:
+        """Condition of a comparison, a boolean variable or a constant"""
+        depth = 0
+        for i, token in enumerate(tokens):
+            if token.kind == 'string':
+                continue
+            if token.text in ('(', '['):
+                depth += 1
+            elif token.text in (')', ']'):
+                depth -= 1
+            elif depth == 0 and token.text in _C_COMPARISONS:
+                op = _C_COMPARISONS[token.text]
+                left, right = tokens[:i], tokens[i + 1:]
+                variable, value = self._c_name(left), self._c_value(right)
+                if variable is None or value is None:
+                    # Constant on the left: 0 < x is x > 0
+                    variable, value = self._c_name(right), self._c_value(left)
+                    op = {'<': '>', '<=': '>=', '>': '<', '>=': '<='}.get(op, op)
+                    right = left
+                if variable is None or value is None:
+                    return None
+                self.variables.add(variable)
+                return self._comparison(variable, op, value, self._c_is_literal(right))
         
-        for part in parts:
-            part = part.strip()
-            
-            # Match pattern like "variable operator value"
-            match = re.match(r'(\w+(?:\.\w+)*)\s*([<>=!]+|==|!=)\s*(.+)', part)
-            if match:
-                var, op, val = match.groups()
-                val = val.strip('"\'')  # Remove quotes
-                self.variables.add(var)
-                conditions.append(Condition(var, op, val))
-        
-        return conditions
\ No newline at end of file
+        variable = self._c_name(tokens)
+        if variable is not None:
+            # Boolean variable
+            self.variables.add(variable)
+            return Condition(variable, "==", "True")
+        # Constants: an empty and always holds, an empty or never does
+        value = self._c_value(tokens)
+        if value == 'True' or value is not None and value.isdigit() and int(value):
+            return CompoundCondition('and', [])
+        if value == 'False' or value is not None and value.isdigit():
+            return CompoundCondition('or', [])
+        return None
+    
+    def _c_name(self, tokens: List[Token]) -> Optional[str]:
+        """Variable name of tokens like a, a.b or a->b, or None"""
+        if not tokens or len(tokens) % 2 == 0 or tokens[0].text in _C_LITERALS:
+            return None
+        for i, token in enumerate(tokens):
+            if i % 2 == 0 and token.kind != 'name' or i % 2 == 1 and token.text not in ('.', '->'):
+                return None
+        return ''.join(token.text for token in tokens)
+    
+    def _c_is_literal(self, tokens: List[Token]) -> bool:
+        """Whether comparison operand tokens are a constant, such as 3, "a", true or -1"""
+        if len(tokens) == 2 and tokens[0].text in ('-', '+'):
+            tokens = tokens[1:]
+            return tokens[0].kind == 'number'
+        return (len(tokens) == 1 and
+                (tokens[0].kind in ('number', 'string') or tokens[0].text in _C_LITERALS))
+    
+    def _c_value(self, tokens: List[Token]) -> Optional[str]:
+        """Value of a comparison operand as the Python parser writes it, or None if empty"""
+        if not tokens:
+            return None
+        if len(tokens) == 1:
+            token = tokens[0]
+            if token.kind == 'string':
+                return token.text[1:-1] if len(token.text) > 1 else ''
+            return _C_LITERALS.get(token.text, token.text)
+        if len(tokens) == 2 and tokens[0].text in ('-', '+') and tokens[1].kind == 'number':
+            return tokens[0].text + tokens[1].text if tokens[0].text == '-' else tokens[1].text
+        return ' '.join(token.text for token in tokens)
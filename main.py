@@ -10,9 +10,12 @@ import argparse
 import sys
 import json
 from pathlib import Path
-from logic_parser import LogicParser
+from logic_parser import LogicParser, Branch, condition_from_dict
 from coverage_analyzer import CoverageAnalyzer
 from test_reducer import TestReducer
+from scope_analysis import analyze_file, analyze_files, FileResult
+from metrics_export import write_metrics
+import profiling
 
 
 def main():
@@ -25,11 +28,20 @@ Examples:
   python main.py -f code.c --domains domains.json
   python main.py -f script.js --algorithm greedy
   python main.py -f program.py --compare-all
+  python main.py -f program.py --whole-file
+  python main.py --dir src/ --glob '**/*.py' --jobs 8 --output report.json
+  python main.py -f program.py --profile --profile-json profile.json
+  python main.py --dir src/ --metrics /var/lib/node_exporter/logic_reduction.prom
         """
     )
     
-    parser.add_argument('-f', '--file', required=True,
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-f', '--file',
                        help='Source file to analyze')
+    source.add_argument('--dir',
+                       help='Analyze every file under this directory matching --glob')
+    parser.add_argument('--glob', default='**/*.py',
+                       help="File pattern for --dir, relative to it (default: '**/*.py')")
     parser.add_argument('--domains', 
                        help='JSON file specifying variable domains')
     parser.add_argument('--algorithm', 
@@ -42,14 +54,65 @@ Examples:
                        help='Output file for results (JSON format)')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Verbose output')
+    parser.add_argument('--whole-file', action='store_true',
+                       help='Enumerate the variables of all functions together instead of per function')
+    parser.add_argument('--jobs', type=int,
+                       help='Worker processes for per-function analysis, or per file with --dir '
+                            '(default: one per CPU)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-analyze every function instead of reusing results of unchanged ones')
+    parser.add_argument('--profile', action='store_true',
+                       help='Print time, peak memory and counters per phase (summed over worker processes)')
+    parser.add_argument('--profile-json',
+                       help='Write the profile to this file as JSON (implies --profile)')
+    parser.add_argument('--metrics',
+                       help='Write per-file metrics of the run to this Prometheus textfile (.prom)')
     
     args = parser.parse_args()
+    if args.whole_file and args.dir:
+        parser.error("--whole-file analyzes a single file (-f)")
+    if args.whole_file and args.metrics:
+        parser.error("--metrics reports per-function analyses and cannot be used with --whole-file")
+    
+    if not (args.profile or args.profile_json or args.metrics):
+        run(args)
+        return
+    
+    # Metrics need phase times but not the cost of tracing memory
+    report = args.profile or args.profile_json
+    with profiling.profile(trace_memory=bool(report)) as profiler:
+        try:
+            run(args)
+        finally:
+            if report:
+                report_profile(profiler, args)
+
+
+def report_profile(profiler, args):
+    """Print the profile, and write it as JSON if requested"""
+    print(f"\nProfile:")
+    print(profiler.format_table())
+    if args.profile_json:
+        with open(args.profile_json, 'w') as f:
+            json.dump(profiler.to_dict(), f, indent=2)
+        print(f"\nProfile saved to {args.profile_json}")
+
+
+def run(args):
+    """Analyze the file or directory given on the command line"""
+    if args.dir:
+        analyze_directory(args)
+        return
     
     # Check if input file exists
     if not Path(args.file).exists():
         print(f"Error: File '{args.file}' not found")
         sys.exit(1)
     
+    if not args.whole_file:
+        analyze_per_function(args)
+        return
+    
     try:
         # Parse the source file
         print(f"Analyzing file: {args.file}")
@@ -69,14 +132,7 @@ Examples:
                 print(f"  {i}. {branch}")
         
         # Load variable domains if provided
-        domains = None
-        if args.domains:
-            try:
-                with open(args.domains, 'r') as f:
-                    domains = json.load(f)
-                print(f"Loaded variable domains from {args.domains}")
-            except Exception as e:
-                print(f"Warning: Could not load domains file: {e}")
+        domains = load_domains(args.domains)
         
         # Analyze coverage
         print("\nGenerating test cases...")
@@ -159,20 +215,13 @@ Examples:
                 'branches': [
                     {
                         'id': branch.branch_id,
-                        'conditions': [
-                            {
-                                'variable': c.variable,
-                                'operator': c.operator,
-                                'value': c.value
-                            }
-                            for c in branch.conditions
-                        ]
+                        'conditions': [c.to_dict() for c in branch.conditions]
                     }
                     for branch in branches
                 ]
             }
             
-            with open(args.output, 'w') as f:
+            with profiling.phase('output'), open(args.output, 'w') as f:
                 json.dump(output_data, f, indent=2)
             
             print(f"\nResults saved to {args.output}")
@@ -185,5 +234,159 @@ Examples:
         sys.exit(1)
 
 
+def load_domains(path):
+    """Load variable domains from a JSON file, or None if not given or unreadable"""
+    if not path:
+        return None
+    try:
+        with open(path, 'r') as f:
+            domains = json.load(f)
+        print(f"Loaded variable domains from {path}")
+        return domains
+    except Exception as e:
+        print(f"Warning: Could not load domains file: {e}")
+        return None
+
+
+def analyze_per_function(args):
+    """Analyze and reduce each function of the file independently"""
+    try:
+        print(f"Analyzing file: {args.file}")
+        domains = load_domains(args.domains)
+        
+        algorithm = args.algorithm
+        print(f"Reducing test cases per function using "
+              f"{'all algorithms' if args.compare_all else algorithm + ' algorithm'}...")
+        results = analyze_file(args.file, domains, algorithm, args.compare_all, args.jobs,
+                               use_cache=not args.no_cache)
+        
+        if not results:
+            print("No if/else branches found in the file")
+            sys.exit(1)
+        
+        cached = sum(1 for r in results if r.cached)
+        print(f"Found {len(results)} functions with branches"
+              + (f" ({cached} unchanged, reused from cache)" if cached else ""))
+    except Exception as e:
+        print(f"Error: {e}")
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        sys.exit(1)
+    
+    for result in results:
+        print(f"\nFunction {result.scope} (line {result.lineno}): {result.branch_count} branches, "
+              f"{len(result.variables)} variables: {result.variables}")
+        if args.verbose:
+            for i, branch in enumerate(result.branches, 1):
+                conditions = [condition_from_dict(c) for c in branch['conditions']]
+                print(f"  {i}. {Branch.from_conditions(conditions, branch['id'])}")
+        if result.error:
+            print(f"  Error: {result.error}")
+            continue
+        
+        print(f"  Algorithm: {result.algorithm}")
+        print(f"  Tests: {result.original_test_count} -> {len(result.test_cases)} "
+              f"({(1 - result.reduction_ratio) * 100:.1f}% reduction)")
+        print(f"  Coverage: {result.coverage_percentage:.1f}%")
+        for i, test_case in enumerate(result.test_cases, 1):
+            print(f"  Test {i}: {test_case['values']}")
+            if args.verbose:
+                print(f"      Covers: {test_case['covered_branches']}")
+    
+    succeeded = [r for r in results if not r.error]
+    print(f"\nMinimal Test Set: {sum(len(r.test_cases) for r in succeeded)} test cases "
+          f"across {len(succeeded)}/{len(results)} functions "
+          f"(from {sum(r.original_test_count for r in succeeded)} generated)")
+    
+    if args.output:
+        output_data = {
+            'file': args.file,
+            'scope': 'function',
+            'functions': [r.to_dict() for r in results]
+        }
+        with profiling.phase('output'), open(args.output, 'w') as f:
+            json.dump(output_data, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    
+    if args.metrics:
+        save_metrics(args.metrics, [FileResult(args.file, results, profile=profiling.current().to_dict())])
+    
+    if not succeeded:
+        sys.exit(1)
+
+
+def analyze_directory(args):
+    """Analyze every matching file of a directory, printing each file's summary as it completes"""
+    if not Path(args.dir).is_dir():
+        print(f"Error: Directory '{args.dir}' not found")
+        sys.exit(1)
+    files = sorted(str(path) for path in Path(args.dir).glob(args.glob) if path.is_file())
+    if not files:
+        print(f"No files matching '{args.glob}' in {args.dir}")
+        sys.exit(1)
+    
+    print(f"Analyzing {len(files)} files in {args.dir}")
+    domains = load_domains(args.domains)
+    reports = []
+    totals = {
+        'files': len(files), 'failed_files': 0, 'functions': 0, 'failed_functions': 0,
+        'cached_functions': 0, 'branches': 0, 'original_test_count': 0, 'minimal_test_count': 0
+    }
+    for report in analyze_files(files, domains, args.algorithm, args.compare_all, args.jobs,
+                                use_cache=not args.no_cache):
+        reports.append(report)
+        if report.error:
+            totals['failed_files'] += 1
+            print(f"{report.file}: Error: {report.error}")
+            continue
+        
+        succeeded = [r for r in report.functions if not r.error]
+        totals['functions'] += len(report.functions)
+        totals['failed_functions'] += len(report.functions) - len(succeeded)
+        totals['cached_functions'] += sum(1 for r in report.functions if r.cached)
+        totals['branches'] += sum(r.branch_count for r in report.functions)
+        totals['original_test_count'] += sum(r.original_test_count for r in succeeded)
+        totals['minimal_test_count'] += sum(len(r.test_cases) for r in succeeded)
+        print(f"{report.file}: {len(report.functions)} functions, "
+              f"{sum(r.original_test_count for r in succeeded)} -> "
+              f"{sum(len(r.test_cases) for r in succeeded)} tests")
+        for result in report.functions:
+            if result.error:
+                print(f"  {result.scope}: Error: {result.error}")
+            elif args.verbose:
+                print(f"  {result.scope} (line {result.lineno}): {result.original_test_count} -> "
+                      f"{len(result.test_cases)} tests, {result.coverage_percentage:.1f}% coverage")
+    
+    print(f"\nTotal: {totals['minimal_test_count']} test cases across {totals['functions']} functions "
+          f"in {totals['files'] - totals['failed_files']}/{totals['files']} files "
+          f"(from {totals['original_test_count']} generated)")
+    
+    if args.output:
+        output_data = {
+            'directory': args.dir,
+            'glob': args.glob,
+            'scope': 'function',
+            'totals': totals,
+            'files': [r.to_dict() for r in reports]
+        }
+        with profiling.phase('output'), open(args.output, 'w') as f:
+            json.dump(output_data, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    
+    if args.metrics:
+        save_metrics(args.metrics, reports)
+    
+    if totals['failed_files'] == totals['files']:
+        sys.exit(1)
+
+
+def save_metrics(path, reports):
+    """Write the metrics of the run's file reports"""
+    with profiling.phase('output'):
+        write_metrics(path, reports)
+    print(f"\nMetrics saved to {path}")
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Metrics Export - Prometheus textfile of a per-function analysis run
+The file is written for node_exporter's textfile collector: per-file histograms
+of phase durations, test-space sizes, reduced test counts and coverage over the
+functions of each file, plus the algorithms that produced the reductions.
+"""
+
+import os
+import time
+from typing import List, Dict, Tuple, Optional
+
+# Histogram bucket upper bounds (+Inf is added)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+TEST_SPACE_BUCKETS = (1, 4, 16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+REDUCED_TESTS_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+COVERAGE_BUCKETS = (50.0, 75.0, 90.0, 95.0, 99.0, 100.0)
+
+PREFIX = 'logic_reduction'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self.series: Dict[Labels, List[float]] = {}  # labels -> bucket counts + [sum, count]
+
+    def observe(self, labels: Labels, value: float):
+        counts = self.series.setdefault(labels, [0] * len(self.buckets) + [0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def lines(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, counts in self.series.items():
+            for bound, n in zip(self.buckets, counts):
+                bucket_labels = labels + (('le', _format_value(float(bound))),)
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {n}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(counts[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {counts[-1]}")
+        return lines
+
+
+class _Gauge:
+    """One value per label set"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.series: Dict[Labels, float] = {}
+
+    def add(self, labels: Labels, value: float = 1):
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def lines(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.series.items():
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+def format_metrics(file_results: List, timestamp: Optional[float] = None) -> str:
+    """
+    Metrics of a run in the Prometheus text exposition format
+
+    Args:
+        file_results: FileResults from scope_analysis.analyze_files; phase durations
+            come from their profiles and those of their functions (present when the
+            run was profiled)
+        timestamp: Time of the run (default: now)
+
+    Returns:
+        Text of the metrics file
+    """
+    phases = _Histogram(f"{PREFIX}_phase_duration_seconds",
+                        "Duration of each analysis phase, per function (parse: per file)", DURATION_BUCKETS)
+    test_space = _Histogram(f"{PREFIX}_test_space_size",
+                            "Test cases generated per function", TEST_SPACE_BUCKETS)
+    reduced = _Histogram(f"{PREFIX}_reduced_test_count",
+                         "Test cases in the minimal set per function", REDUCED_TESTS_BUCKETS)
+    coverage = _Histogram(f"{PREFIX}_coverage_percent",
+                          "Branch coverage of the minimal set per function", COVERAGE_BUCKETS)
+    algorithms = _Gauge(f"{PREFIX}_functions", "Functions reduced, by the algorithm that produced the result")
+    errors = _Gauge(f"{PREFIX}_errors", "Files and functions that could not be analyzed")
+    cached = _Gauge(f"{PREFIX}_cached_functions", "Functions whose results were reused from the cache")
+
+    for file_result in file_results:
+        file_labels = (('file', file_result.file),)
+        if file_result.error:
+            errors.add(file_labels + (('level', 'file'),))
+            continue
+        errors.add(file_labels + (('level', 'function'),), 0)
+        parse = (file_result.profile or {}).get('phases', {}).get('parse')
+        if parse:
+            phases.observe(file_labels + (('phase', 'parse'),), parse['time_ns'] / 1e9)
+
+        for result in file_result.functions:
+            if result.error:
+                errors.add(file_labels + (('level', 'function'),))
+                continue
+            if result.cached:
+                cached.add(file_labels)
+            for phase, stats in (result.profile or {}).get('phases', {}).items():
+                phases.observe(file_labels + (('phase', phase),), stats['time_ns'] / 1e9)
+            test_space.observe(file_labels, result.original_test_count)
+            reduced.observe(file_labels, len(result.test_cases))
+            coverage.observe(file_labels, result.coverage_percentage)
+            algorithms.add(file_labels + (('algorithm', result.algorithm),))
+
+    last_run = _Gauge(f"{PREFIX}_last_run_timestamp_seconds", "Unix time of the run")
+    last_run.add((), timestamp if timestamp is not None else time.time())
+
+    lines = []
+    for metric in (phases, test_space, reduced, coverage, algorithms, errors, cached, last_run):
+        lines.extend(metric.lines())
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics(path: str, file_results: List, timestamp: Optional[float] = None):
+    """
+    Write the metrics file, replacing it atomically so a scrape never sees half of it
+
+    Args:
+        path: Target file, e.g. in node_exporter's --collector.textfile.directory
+            (it must end in .prom to be collected)
+        file_results: FileResults of the run (see format_metrics)
+        timestamp: Time of the run (default: now)
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as f:
+        f.write(format_metrics(file_results, timestamp))
+    os.replace(temporary, path)
@@ -0,0 +1,47 @@
+"""
+Observers - callbacks from running analyses and reductions
+Register an AnalysisObserver on a CoverageAnalyzer (its TestReducers inherit it)
+to follow enumeration progress, greedy picks and local-search moves. Analyses
+only build event arguments when an observer is registered, so unobserved runs pay
+one truth test per event site. An observer stops a run by raising AbortAnalysis.
+"""
+
+
+class AbortAnalysis(Exception):
+    """Raised by an observer to stop the analysis or reduction it is watching"""
+
+
+class AnalysisObserver:
+    """Base observer; every callback does nothing, so subclasses override only what they need"""
+
+    def on_progress(self, done: int, total: int):
+        """Test cases evaluated so far out of the total (first called with done=0)"""
+
+    def on_pick(self, algorithm: str, test_index: int, gain: int, covered: int, total: int):
+        """
+        A constructive reducer selected a test
+
+        Args:
+            algorithm: Reducer name
+            test_index: Index of the test in the analyzer's test cases
+            gain: Branches it newly covers
+            covered: Branches covered after the pick
+            total: Branches to cover
+        """
+
+    def on_move(self, algorithm: str, move: str, test_index: int, size: int):
+        """A local search changed its solution (move is e.g. 'remove'); size is the new size"""
+
+    def on_incumbent(self, algorithm: str, size: int):
+        """A reducer has a complete solution of this size, the best it has found so far"""
+
+
+class TestLimit(AnalysisObserver):
+    """Abort enumerations that would generate more than max_tests test cases"""
+
+    def __init__(self, max_tests: int):
+        self.max_tests = max_tests
+
+    def on_progress(self, done: int, total: int):
+        if total > self.max_tests:
+            raise AbortAnalysis(f"{total} test cases exceed the limit of {self.max_tests}")
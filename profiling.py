@@ -0,0 +1,178 @@
+"""
+Profiling - wall time and peak memory per analysis phase, plus work counters
+Library code marks its phases with phase() and its work with count(); both do
+nothing unless a profile() is active, so unprofiled runs pay one global lookup.
+"""
+
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, asdict
+from functools import wraps
+from time import perf_counter_ns
+from typing import Dict, Any, Iterator, Optional
+
+_NO_PHASE = nullcontext()
+
+
+@dataclass
+class PhaseStats:
+    """Accumulated cost of one phase over all the times it ran"""
+    calls: int = 0
+    time_ns: int = 0
+    peak_bytes: int = 0
+
+
+class Profiler:
+    """Collects phase timings, peak traced memory per phase and counters"""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        # [name, traced bytes at start, highest peak seen] of each open phase
+        self._open = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a phase and record the memory it allocated at its peak
+
+        A phase entered again while it is open (e.g. a reducer calling another
+        reducer) is only counted once, by the outermost entry.
+        """
+        if any(frame[0] == name for frame in self._open):
+            yield
+            return
+        start_bytes = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            start_bytes, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak must not lose the peaks of the phases around this one
+            for frame in self._open:
+                frame[2] = max(frame[2], peak)
+            tracemalloc.reset_peak()
+        frame = [name, start_bytes, start_bytes]
+        self._open.append(frame)
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter_ns() - start
+            self._open.pop()
+            peak = frame[2]
+            if self.trace_memory and tracemalloc.is_tracing():
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                for outer in self._open:
+                    outer[2] = max(outer[2], peak)
+            stats = self.phases.setdefault(name, PhaseStats())
+            stats.calls += 1
+            stats.time_ns += elapsed
+            stats.peak_bytes = max(stats.peak_bytes, peak - start_bytes)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, data: Dict[str, Any]):
+        """
+        Add a profile from to_dict, e.g. one recorded in a worker process
+
+        Times and counters are summed; peaks keep the largest.
+        """
+        for name, phase_data in data.get('phases', {}).items():
+            stats = self.phases.setdefault(name, PhaseStats())
+            stats.calls += phase_data['calls']
+            stats.time_ns += phase_data['time_ns']
+            stats.peak_bytes = max(stats.peak_bytes, phase_data['peak_bytes'])
+        for name, n in data.get('counters', {}).items():
+            self.count(name, n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form: {'phases': {name: stats}, 'counters': {name: n}}"""
+        return {
+            'phases': {name: asdict(stats) for name, stats in self.phases.items()},
+            'counters': dict(self.counters)
+        }
+
+    def format_table(self) -> str:
+        """Phases and counters as a text table"""
+        lines = [f"{'Phase':<20} {'Calls':>7} {'Time (ms)':>12} {'Peak memory (KiB)':>18}"]
+        for name, stats in self.phases.items():
+            lines.append(f"{name:<20} {stats.calls:>7} {stats.time_ns / 1e6:>12.2f} "
+                         f"{stats.peak_bytes / 1024:>18.1f}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'Counter':<28} {'Value':>12}")
+            for name, n in self.counters.items():
+                lines.append(f"{name:<28} {n:>12}")
+        return "\n".join(lines)
+
+
+_active: Optional[Profiler] = None
+
+
+@contextmanager
+def profile(trace_memory: Optional[bool] = None) -> Iterator[Profiler]:
+    """
+    Profile the library calls made inside the block
+
+    Args:
+        trace_memory: Also record peak memory per phase with tracemalloc, which
+            slows allocation-heavy phases down (default: as the enclosing profile
+            does, or True)
+
+    Returns:
+        Context manager yielding the Profiler that collects the results
+    """
+    global _active
+    if trace_memory is None:
+        trace_memory = _active.trace_memory if _active is not None else True
+    outer, profiler = _active, Profiler(trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = outer
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def enabled() -> bool:
+    """Whether a profile is active, for counters that are costly to compute"""
+    return _active is not None
+
+
+def current() -> Optional[Profiler]:
+    """The active Profiler, or None"""
+    return _active
+
+
+def phase(name: str):
+    """Context manager timing a phase of the active profile (a no-op without one)"""
+    return _active.phase(name) if _active is not None else _NO_PHASE
+
+
+def merge(data: Dict[str, Any]):
+    """Add a profile recorded elsewhere (see Profiler.merge) to the active profile"""
+    if _active is not None:
+        _active.merge(data)
+
+
+def timed(name: str):
+    """Decorator running a function as a phase of the active profile"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name: str, n: int = 1):
+    """Add to a counter of the active profile"""
+    if _active is not None:
+        _active.count(name, n)
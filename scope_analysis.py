@@ -0,0 +1,271 @@
+"""
+Scope Analysis - analyze and reduce every function of a file on its own
+Functions rarely share inputs, so enumerating each function's variables separately
+replaces one product over the whole file with a much smaller product per function.
+Results are cached per function content, so re-analyzing an edited file only
+reduces the functions that changed.
+"""
+
+import io
+import os
+import json
+import hashlib
+import multiprocessing
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field, asdict
+from functools import partial
+from typing import List, Dict, Any, Optional, Iterator
+from logic_parser import LogicParser, FunctionScope
+from coverage_analyzer import CoverageAnalyzer
+from test_reducer import TestReducer
+from expression_cache import ANALYSIS_FILE, CACHE_VERSION, get_default_cache
+import profiling
+
+
+@dataclass
+class ScopeResult:
+    """Reduction of one function, as plain data so it can come back from a worker process"""
+    scope: str
+    lineno: int
+    variables: List[str]
+    branch_count: int
+    original_test_count: int = 0
+    algorithm: str = ''
+    coverage_percentage: float = 0.0
+    reduction_ratio: float = 0.0
+    execution_time: float = 0.0
+    test_cases: List[Dict[str, Any]] = field(default_factory=list)
+    branches: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    domains: Dict[str, List[Any]] = field(default_factory=dict)
+    cached: bool = False
+    profile: Optional[Dict[str, Any]] = None  # This function's own profile, when profiled
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form, in the layout of main.py's whole-file output"""
+        data = asdict(self)
+        del data['profile']
+        return data
+
+
+@dataclass
+class FileResult:
+    """Per-function results of one file of a batch run"""
+    file: str
+    functions: List[ScopeResult] = field(default_factory=list)
+    error: Optional[str] = None
+    profile: Optional[Dict[str, Any]] = None  # Includes the profiles of its functions
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'file': self.file, 'functions': [r.to_dict() for r in self.functions], 'error': self.error}
+
+
+def analyze_scope(scope: FunctionScope, domains: Optional[Dict[str, List[Any]]] = None,
+                  algorithm: str = 'intelligent', compare_all: bool = False,
+                  profile: bool = False) -> ScopeResult:
+    """
+    Generate, analyze and reduce the test cases of one function
+
+    Args:
+        scope: FunctionScope from LogicParser.parse_scopes
+        domains: Variable domains (only those of the scope's variables are used)
+        algorithm: 'greedy', 'heuristic', 'intelligent' or 'optimal'
+        compare_all: Run every algorithm and keep the smallest result
+        profile: Profile the analysis on its own and return it in the result's
+            profile field (used by worker processes)
+
+    Returns:
+        ScopeResult; failures are reported in its error field instead of raised
+    """
+    if profile:
+        with profiling.profile() as profiler:
+            result = analyze_scope(scope, domains, algorithm, compare_all)
+        result.profile = profiler.to_dict()
+        return result
+
+    result = ScopeResult(scope.name, scope.lineno, sorted(scope.variables), len(scope.branches))
+    result.branches = [
+        {
+            'id': branch.branch_id,
+            'conditions': [c.to_dict() for c in branch.conditions]
+        }
+        for branch in scope.branches
+    ]
+
+    try:
+        # The reducers report progress on stdout, which would interleave across workers
+        with redirect_stdout(io.StringIO()):
+            analyzer = CoverageAnalyzer(scope.branches, scope.variables)
+            scope_domains = {var: values for var, values in (domains or {}).items() if var in scope.variables}
+            if scope_domains:
+                test_cases = analyzer.generate_all_test_cases(scope_domains)
+            else:
+                test_cases = analyzer.generate_smart_test_cases()
+            result.domains = dict(zip(analyzer.encoding.variables, analyzer.encoding.dictionaries))
+            if not test_cases:
+                result.error = "No test cases could be generated"
+                return result
+
+            reducer = TestReducer(analyzer)
+            if compare_all:
+                best = min(reducer.compare_algorithms(), key=lambda r: r.reduction_ratio)
+            elif algorithm == 'greedy':
+                best = reducer.reduce_greedy()
+            elif algorithm == 'heuristic':
+                best = reducer.reduce_heuristic()
+            elif algorithm == 'optimal':
+                best = reducer.reduce_optimal_small() or reducer.reduce_intelligent()
+            else:
+                best = reducer.reduce_intelligent()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    result.original_test_count = len(test_cases)
+    result.algorithm = best.algorithm_used
+    result.coverage_percentage = best.coverage_percentage
+    result.reduction_ratio = best.reduction_ratio
+    result.execution_time = best.execution_time
+    result.test_cases = [
+        {'values': dict(tc.values), 'covered_branches': sorted(tc.covered_branches)}
+        for tc in best.minimal_test_cases
+    ]
+    return result
+
+
+def analyze_scopes(scopes: List[FunctionScope], domains: Optional[Dict[str, List[Any]]] = None,
+                   algorithm: str = 'intelligent', compare_all: bool = False,
+                   jobs: Optional[int] = None) -> List[ScopeResult]:
+    """
+    Analyze functions independently, in parallel worker processes
+
+    Args:
+        scopes: FunctionScopes to analyze
+        domains: Variable domains shared by all scopes
+        algorithm: Reduction algorithm (see analyze_scope)
+        compare_all: Run every algorithm per scope and keep the best
+        jobs: Worker processes (default: one per CPU; 1 analyzes in this process)
+
+    Returns:
+        ScopeResult per scope, in input order
+    """
+    # When this process is profiled, each function is profiled on its own (also in
+    # workers) and the profiles are added up here
+    analyze = partial(analyze_scope, domains=domains, algorithm=algorithm, compare_all=compare_all,
+                      profile=profiling.enabled())
+    jobs = min(jobs or os.cpu_count() or 1, len(scopes))
+    if jobs <= 1:
+        results = [analyze(scope) for scope in scopes]
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            results = pool.map(analyze, scopes, chunksize=1)
+    for result in results:
+        _merge_profile(result)
+    return results
+
+
+def _merge_profile(result):
+    """Add the profile a result brings back to this process's profile"""
+    if result.profile is not None:
+        profiling.merge(result.profile)
+
+
+def analyze_file(filepath: str, domains: Optional[Dict[str, List[Any]]] = None,
+                 algorithm: str = 'intelligent', compare_all: bool = False,
+                 jobs: Optional[int] = None, use_cache: bool = True) -> List[ScopeResult]:
+    """
+    Analyze every function of a file, reusing cached results of unchanged functions
+
+    A function's results are keyed by its fingerprint (see LogicParser.parse_scopes)
+    together with the domains and reduction options, so only functions whose code
+    changed are parsed and reduced again.
+
+    Args:
+        filepath: Source file
+        domains: Variable domains shared by all scopes
+        algorithm: Reduction algorithm (see analyze_scope)
+        compare_all: Run every algorithm per scope and keep the best
+        jobs: Worker processes for the functions that are not cached
+        use_cache: Read and write the analysis cache
+
+    Returns:
+        ScopeResult per function with branches, in source order
+    """
+    cache = get_default_cache(ANALYSIS_FILE) if use_cache else None
+    options = json.dumps([CACHE_VERSION, domains, algorithm, compare_all], sort_keys=True, default=str)
+    hits = {}
+
+    def key(fingerprint):
+        return hashlib.sha256(f"{options}\0{fingerprint}".encode()).hexdigest()
+
+    def reuse(fingerprint):
+        entry = cache.get(key(fingerprint))
+        if entry is not None:
+            hits[fingerprint] = entry
+        return entry is not None
+
+    scopes = LogicParser().parse_scopes(filepath, reuse if cache else None)
+    fresh = iter(analyze_scopes([s for s in scopes if s.fingerprint not in hits],
+                                domains, algorithm, compare_all, jobs))
+    results = []
+    for scope in scopes:
+        if scope.fingerprint in hits:
+            result = ScopeResult(**hits[scope.fingerprint])
+            # Functions move when code above them changes; their results do not
+            result.lineno, result.cached = scope.lineno, True
+        else:
+            result = next(fresh)
+            if cache is not None and result.error is None:
+                cache.put(key(scope.fingerprint), result.to_dict())
+        results.append(result)
+    if cache is not None:
+        # Pool workers exit without running atexit handlers
+        cache.flush()
+    return results
+
+
+def _analyze_path(filepath: str, domains: Optional[Dict[str, List[Any]]], algorithm: str,
+                  compare_all: bool, use_cache: bool, profile: bool = False) -> FileResult:
+    if profile:
+        with profiling.profile() as profiler:
+            result = _analyze_path(filepath, domains, algorithm, compare_all, use_cache)
+        result.profile = profiler.to_dict()
+        return result
+    try:
+        functions = analyze_file(filepath, domains, algorithm, compare_all, jobs=1, use_cache=use_cache)
+    except Exception as e:
+        return FileResult(filepath, error=f"{type(e).__name__}: {e}")
+    return FileResult(filepath, functions)
+
+
+def analyze_files(filepaths: List[str], domains: Optional[Dict[str, List[Any]]] = None,
+                  algorithm: str = 'intelligent', compare_all: bool = False,
+                  jobs: Optional[int] = None, use_cache: bool = True) -> Iterator[FileResult]:
+    """
+    Analyze many files in a pool of worker processes, one file per task
+
+    Args:
+        filepaths: Source files
+        domains: Variable domains shared by all files
+        algorithm: Reduction algorithm (see analyze_scope)
+        compare_all: Run every algorithm per scope and keep the best
+        jobs: Worker processes (default: one per CPU; 1 analyzes in this process)
+        use_cache: Read and write the analysis cache
+
+    Returns:
+        Iterator of FileResults in input order, each yielded as soon as it is ready;
+        a file that cannot be read or parsed is reported in its error field
+    """
+    analyze = partial(_analyze_path, domains=domains, algorithm=algorithm, compare_all=compare_all,
+                      use_cache=use_cache, profile=profiling.enabled())
+    jobs = min(jobs or os.cpu_count() or 1, len(filepaths))
+    if jobs <= 1:
+        for result in map(analyze, filepaths):
+            _merge_profile(result)
+            yield result
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        for result in pool.imap(analyze, filepaths, chunksize=1):
+            _merge_profile(result)
+            yield result
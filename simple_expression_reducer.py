@@ -3,96 +3,385 @@ Simple Expression Reducer - Direct input for expressions
 Just input your expressions and get minimum test cases!
 """
 
-from core_reduction_functions import optimal_set_cover, greedy_set_cover
+from expression_result import ExpressionReductionResult, solve_coverage, solve_mcdc, render_report
 from itertools import product
+import multiprocessing
+import time
 
-def reduce_expressions(expressions, variables):
+# Limit on probe runs when tracing an expression's reads before assuming it reads everything
+MAX_TRACE_PATHS = 4096
+
+# Below this many expression calls a process pool costs more than it saves
+MIN_PARALLEL_EVALUATIONS = 4096
+
+# Combinations evaluated per pool task
+PARALLEL_CHUNK_SIZE = 1024
+
+
+class _UntraceableExpression(Exception):
+    """Raised when an expression does more with a variable than test its truth value"""
+
+
+class _ProbeValue:
+    """Stand-in for a boolean variable that records when the expression reads it"""
+    __slots__ = ('name', 'assignment', 'new_reads')
+    
+    def __init__(self, name, assignment, new_reads):
+        self.name = name
+        self.assignment = assignment
+        self.new_reads = new_reads
+    
+    def __bool__(self):
+        if self.name not in self.assignment:
+            # First read on this path - explore False now, True on a later probe
+            self.assignment[self.name] = False
+            self.new_reads.append(self.name)
+        return self.assignment[self.name]
+
+
+def _untraceable(self, *args):
+    raise _UntraceableExpression(self.name)
+
+
+# Any operation other than a truth test means the probe cannot stand in for a bool
+for _method in ('__eq__', '__ne__', '__lt__', '__le__', '__gt__', '__ge__', '__hash__',
+                '__index__', '__int__', '__float__', '__invert__', '__neg__', '__pos__',
+                '__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__',
+                '__and__', '__rand__', '__or__', '__ror__', '__xor__', '__rxor__'):
+    setattr(_ProbeValue, _method, _untraceable)
+
+
+def trace_dependencies(expr_func, variables):
     """
-    Reduce test cases for given boolean expressions
+    Find which variables an expression actually reads
+    
+    Calls the expression with probe values that record every truth test, exploring
+    each True/False outcome of those tests until all paths are covered. Each path is
+    checked again with real bools, the unread variables all False and then all True,
+    so uses the probes cannot see (such as `A is True`) fall back to every variable.
     
     Args:
-        expressions: List of expression functions that take variable values and return bool
+        expr_func: Expression function taking the variables as keyword arguments
         variables: List of variable names
         
     Returns:
-        Minimum test cases needed to make each expression True at least once
+        List of the variables read on any path, in the order of `variables`
     """
+    reads = set()
+    pending = [{}]
+    probes = 0
     
-    # Generate all possible test combinations
-    all_combinations = list(product([False, True], repeat=len(variables)))
+    while pending:
+        probes += 1
+        if probes > MAX_TRACE_PATHS:
+            return list(variables)
+        
+        assignment = pending.pop()
+        prefix = dict(assignment)
+        new_reads = []
+        proxies = {var: _ProbeValue(var, assignment, new_reads) for var in variables}
+        try:
+            result = bool(expr_func(**proxies))
+            # An expression that uses a variable without a truth test changes with it
+            for unread in (False, True):
+                values = {var: assignment.get(var, unread) for var in variables}
+                if bool(expr_func(**values)) != result:
+                    return list(variables)
+        except Exception:
+            # Not a pure truth-value expression; enumerate it over every variable
+            return list(variables)
+        
+        # Queue the True outcome of each read made for the first time on this path
+        for var in new_reads:
+            pending.append({**prefix, var: True})
+            prefix[var] = False
+        reads.update(assignment)
     
-    print(f"Testing {len(expressions)} expressions with {len(variables)} variables")
-    print(f"Total possible combinations: {len(all_combinations)}")
-    print()
+    return [var for var in variables if var in reads]
+
+
+def build_truth_table(expr_func, dependencies, variables):
+    """Evaluate an expression over the combinations of only the variables it reads"""
+    defaults = {var: False for var in variables}
+    table = {}
+    for combo in product([False, True], repeat=len(dependencies)):
+        table[combo] = bool(expr_func(**{**defaults, **dict(zip(dependencies, combo))}))
+    return table
+
+
+# Expressions shipped to each pool worker once by _init_worker
+_worker_expressions = None
+_worker_variables = None
+
+
+def _init_worker(expressions, variables):
+    """Pool initializer - keep the expressions in the worker for every later task"""
+    global _worker_expressions, _worker_variables
+    _worker_expressions = expressions
+    _worker_variables = variables
+
+
+def _evaluate_chunk(task):
+    """Evaluate one expression over a range of its combinations, returned as a packed bit row"""
+    expr_index, dependencies, start, stop = task
+    expr_func = _worker_expressions[expr_index]
+    values = {var: False for var in _worker_variables}
+    n_deps = len(dependencies)
     
-    # Build test cases
-    test_cases = []
-    for combo in all_combinations:
-        test_case = dict(zip(variables, combo))
-        test_name = ",".join([f"{var}={str(val)[0]}" for var, val in test_case.items()])
-        test_cases.append({"values": test_case, "name": test_name})
+    bits = 0
+    for offset, combo_index in enumerate(range(start, stop)):
+        # Same ordering as product([False, True], repeat=n_deps)
+        for k, var in enumerate(dependencies):
+            values[var] = bool(combo_index >> (n_deps - 1 - k) & 1)
+        if expr_func(**values):
+            bits |= 1 << offset
+    return bits
+
+
+def build_truth_tables(expressions, dependencies, variables, workers=None):
+    """
+    Build the truth table of every expression over the variables it reads
     
-    # Build coverage matrix
-    coverage_matrix = []
-    branch_names = [f"exp{i+1}" for i in range(len(expressions))]
+    Args:
+        expressions: List of expression functions
+        dependencies: Variables read by each expression (see trace_dependencies)
+        variables: List of all variable names
+        workers: Number of worker processes, or None to evaluate in this process
+        
+    Returns:
+        List of dicts mapping each combination of an expression's variables to its result
+    """
+    total_evaluations = sum(2 ** len(deps) for deps in dependencies)
+    if not workers or workers <= 1 or total_evaluations < MIN_PARALLEL_EVALUATIONS:
+        return [build_truth_table(expr_func, deps, variables)
+                for expr_func, deps in zip(expressions, dependencies)]
+    
+    tasks = []
+    for expr_index, deps in enumerate(dependencies):
+        for start in range(0, 2 ** len(deps), PARALLEL_CHUNK_SIZE):
+            tasks.append((expr_index, deps, start, min(start + PARALLEL_CHUNK_SIZE, 2 ** len(deps))))
     
-    print("COVERAGE ANALYSIS:")
-    print("Test Case" + " " * 10 + "| " + " | ".join([f"exp{i+1}" for i in range(len(expressions))]) + " | Covers")
-    print("-" * (20 + len(expressions) * 6 + 10))
+    # Expressions go to each worker once through the initializer (inherited directly
+    # under fork; they must be picklable where workers are spawned)
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(expressions, variables)) as pool:
+        bit_rows = pool.map(_evaluate_chunk, tasks)
+    
+    combos = [list(product([False, True], repeat=len(deps))) for deps in dependencies]
+    truth_tables = [{} for _ in expressions]
+    for (expr_index, deps, start, stop), bits in zip(tasks, bit_rows):
+        for offset, combo in enumerate(combos[expr_index][start:stop]):
+            truth_tables[expr_index][combo] = bool(bits >> offset & 1)
+    return truth_tables
+
+
+def dependency_groups(dependencies):
+    """
+    Split expressions into groups that read no variable in common
     
-    for tc in test_cases:
-        coverage = []
-        covered_exps = []
+    Args:
+        dependencies: Variables read by each expression (see trace_dependencies)
         
-        for i, expr_func in enumerate(expressions):
-            result = expr_func(**tc["values"])
-            coverage.append(result)
-            if result:
-                covered_exps.append(f"exp{i+1}")
+    Returns:
+        Lists of expression indices, ordered by their first expression; expressions
+        that read no variable join the first group
+    """
+    parent = list(range(len(dependencies)))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    reader = {}
+    for i, deps in enumerate(dependencies):
+        for var in deps:
+            if var in reader:
+                parent[find(i)] = find(reader[var])
+            else:
+                reader[var] = i
+    
+    groups = {}
+    constant = [i for i, deps in enumerate(dependencies) if not deps]
+    for i, deps in enumerate(dependencies):
+        if deps:
+            groups.setdefault(find(i), []).append(i)
+    groups = sorted(groups.values())
+    if not groups:
+        return [constant] if constant else []
+    groups[0] = sorted(groups[0] + constant)
+    return groups
+
+
+def _group_masks(group, group_variables, truth_tables, dependencies, variables):
+    """Coverage bitmask per combination of a group's variables (bit j: its j-th expression)"""
+    coverage_masks = []
+    for combo in product([False, True], repeat=len(group_variables)):
+        values = {var: False for var in variables}
+        values.update(zip(group_variables, combo))
+        mask = 0
+        for j, i in enumerate(group):
+            if truth_tables[i][tuple(values[var] for var in dependencies[i])]:
+                mask |= 1 << j
+        coverage_masks.append(mask)
+    return coverage_masks
+
+
+class GroupedCoverage:
+    """
+    Per-test coverage bitmasks over all active variables, looked up on demand
+    
+    Built when the expressions fall into independent groups, so the product of
+    every active variable is never enumerated. Like cube_cover.CubeCoverage it has
+    n_tests and union instead of __len__.
+    """
+    
+    def __init__(self, truth_tables, dependencies, active_variables):
+        self.truth_tables = truth_tables
+        self.dependencies = dependencies
+        self.active_variables = active_variables
+        self.union = 0
+        for i, table in enumerate(truth_tables):
+            if any(table.values()):
+                self.union |= 1 << i
+    
+    @property
+    def n_tests(self):
+        return 1 << len(self.active_variables)
+    
+    def __getitem__(self, test_idx):
+        if not 0 <= test_idx < self.n_tests:
+            raise IndexError(test_idx)
+        n_active = len(self.active_variables)
+        values = {var: bool(test_idx >> (n_active - 1 - k) & 1) for k, var in enumerate(self.active_variables)}
+        return sum(1 << i for i, (table, deps) in enumerate(zip(self.truth_tables, self.dependencies))
+                   if table[tuple(values[var] for var in deps)])
+    
+    def __iter__(self):
+        for test_idx in range(self.n_tests):
+            yield self[test_idx]
+
+
+def _reduce_groups(labels, variables, active_variables, groups, truth_tables, dependencies, coverage):
+    """
+    Reduce each group over its own variables and merge the group tests
+    
+    Groups share no variable, so tests of different groups combine into one test.
+    For true-only coverage the j-th tests of all groups are merged, which needs as
+    many tests as the largest group and is minimum when every group's set is. For
+    MC/DC both tests of a pair must agree outside their group, so each group's tests
+    are merged with the first test of every other group.
+    """
+    start_time = time.time()
+    n_active = len(active_variables)
+    position = {var: k for k, var in enumerate(active_variables)}
+    
+    group_results = []
+    for group in groups:
+        group_variables = [var for var in active_variables if any(var in dependencies[i] for i in group)]
+        masks = _group_masks(group, group_variables, truth_tables, dependencies, variables)
+        if coverage == 'mcdc':
+            # Every label, with the columns of the other groups empty, keeps the exp<i> names
+            columns = [0] * len(labels)
+            conditions = [[] for _ in labels]
+            for j, i in enumerate(group):
+                columns[i] = sum(1 << t for t, mask in enumerate(masks) if mask >> j & 1)
+                conditions[i] = dependencies[i]
+            result = solve_mcdc(labels, variables, group_variables, columns, conditions)
+        else:
+            targets = [f"exp{i+1}" for i in group]
+            result = solve_coverage([labels[i] for i in group], variables, group_variables, masks,
+                                    targets=targets)
         
-        coverage_matrix.append(coverage)
+        def to_global(test_idx, group_variables=group_variables):
+            n_group = len(group_variables)
+            return sum(1 << (n_active - 1 - position[var])
+                       for k, var in enumerate(group_variables) if test_idx >> (n_group - 1 - k) & 1)
         
-        # Display coverage
-        results = " | ".join([f"{str(coverage[i])[0]:4s}" for i in range(len(expressions))])
-        covers = ", ".join(covered_exps) if covered_exps else "none"
-        print(f"{tc['name']:18s} | {results} | {covers}")
+        group_results.append((result, [to_global(t) for t in result.selected_indices], to_global))
     
-    print()
+    coverage_masks = GroupedCoverage(truth_tables, dependencies, active_variables)
+    independence_pairs, unresolved = {}, []
+    if coverage == 'mcdc':
+        backgrounds = [tests[0] if tests else 0 for _, tests, _ in group_results]
+        selected = []
+        for g, (result, tests, to_global) in enumerate(group_results):
+            background = sum(backgrounds) - backgrounds[g]
+            selected.extend(t | background for t in tests if t | background not in selected)
+            for label, (t_false, t_true) in result.independence_pairs.items():
+                independence_pairs[label] = (to_global(t_false) | background, to_global(t_true) | background)
+            unresolved.extend(result.unresolved_conditions)
+        n_requirements = len(independence_pairs) + len(unresolved)
+        coverage_pct = len(independence_pairs) / n_requirements * 100 if n_requirements else 100.0
+        algorithm = "Greedy MC/DC"
+    else:
+        n_tests = max(len(tests) for _, tests, _ in group_results)
+        selected = [sum(tests[min(j, len(tests) - 1)] for _, tests, _ in group_results if tests)
+                    for j in range(n_tests)]
+        covered = 0
+        for t in selected:
+            covered |= coverage_masks[t]
+        coverage_pct = bin(covered).count('1') / len(labels) * 100
+        algorithm = "Optimal" if all(result.algorithm == "Optimal" for result, _, _ in group_results) else "Greedy"
     
-    # Find minimum test cases
-    test_names = [tc["name"] for tc in test_cases]
+    return ExpressionReductionResult(
+        list(labels),
+        list(variables),
+        list(active_variables),
+        coverage_masks,
+        selected,
+        algorithm,
+        coverage_pct,
+        len(selected) / coverage_masks.n_tests,
+        time.time() - start_time,
+        independence_pairs=independence_pairs,
+        unresolved_conditions=unresolved
+    )
+
+
+def reduce_expressions(expressions, variables, workers=None, coverage='true-only'):
+    """
+    Reduce test cases for given boolean expressions
     
-    # Try optimal first
-    result = optimal_set_cover(coverage_matrix, test_names, branch_names)
-    if result:
-        selected_tests, coverage_pct, reduction_ratio = result
-        print("OPTIMAL SOLUTION:")
-    else:
-        # Fall back to greedy
-        selected_tests, coverage_pct, reduction_ratio = greedy_set_cover(coverage_matrix, test_names, branch_names)
-        print("GREEDY SOLUTION:")
-    
-    print(f"Minimum test cases needed: {len(selected_tests)}/{len(test_cases)}")
-    print(f"Reduction: {(1-reduction_ratio)*100:.1f}%")
-    print(f"Coverage: {coverage_pct:.1f}%")
-    print()
-    
-    print("SELECTED TEST CASES:")
-    for test_name in selected_tests:
-        test_idx = test_names.index(test_name)
-        tc = test_cases[test_idx]
-        
-        # Show what this test covers
-        covered = []
-        for i, expr_func in enumerate(expressions):
-            if expr_func(**tc["values"]):
-                covered.append(f"exp{i+1}")
+    Expressions that read no variable in common are reduced separately, each over
+    its own variables, so the cost grows with the largest group of expressions
+    sharing variables rather than with all variables.
+    
+    Args:
+        expressions: List of expression functions that take variable values and return bool
+        variables: List of variable names
+        workers: Number of processes used to evaluate the expressions (default: sequential)
+        coverage: 'true-only' (make each expression True at least once) or 'mcdc'
+            (show every variable an expression reads to independently affect it)
         
-        print(f"  {test_name}")
-        print(f"    Values: {tc['values']}")
-        print(f"    Covers: {', '.join(covered) if covered else 'none'}")
+    Returns:
+        ExpressionReductionResult with the selected tests (use render_report to print it)
+    """
+    if coverage not in ('true-only', 'mcdc'):
+        raise ValueError(f"Unknown coverage mode '{coverage}', expected 'true-only' or 'mcdc'")
+    
+    # Trace the variables each expression reads and evaluate it once per projection
+    dependencies = [trace_dependencies(expr_func, variables) for expr_func in expressions]
+    truth_tables = build_truth_tables(expressions, dependencies, variables, workers)
+    
+    # Variables no expression reads cannot change coverage, so they stay False
+    read_variables = set().union(*dependencies)
+    active_variables = [var for var in variables if var in read_variables]
+    
+    labels = [getattr(expr_func, "__name__", f"exp{i+1}") for i, expr_func in enumerate(expressions)]
+    groups = dependency_groups(dependencies)
+    if len(groups) > 1:
+        return _reduce_groups(labels, variables, active_variables, groups, truth_tables, dependencies, coverage)
     
-    return selected_tests
+    # Look up every expression per combination into a coverage bitmask
+    coverage_masks = _group_masks(list(range(len(expressions))), active_variables, truth_tables,
+                                  dependencies, variables)
+    if coverage == 'mcdc':
+        columns = [sum(1 << t for t, mask in enumerate(coverage_masks) if mask >> i & 1)
+                   for i in range(len(expressions))]
+        return solve_mcdc(labels, variables, active_variables, columns, dependencies)
+    return solve_coverage(labels, variables, active_variables, coverage_masks)
 
 
 # Example usage with your expressions
@@ -119,7 +408,7 @@ def example_your_expressions():
     expressions = [exp1, exp2, exp3]
     variables = ["A", "B", "C"]
     
-    reduce_expressions(expressions, variables)
+    render_report(reduce_expressions(expressions, variables))
 
 
 def example_custom():
@@ -145,7 +434,7 @@ def example_custom():
     expressions = [exp1, exp2, exp3]
     variables = ["X", "Y"]
     
-    reduce_expressions(expressions, variables)
+    render_report(reduce_expressions(expressions, variables))
 
 
 if __name__ == "__main__":
@@ -4,160 +4,452 @@ Input: List of string expressions like ['A and B', 'A and not C', ...]
 Output: Minimum test cases to make each expression True
 """
 
-from core_reduction_functions import optimal_set_cover, greedy_set_cover
+from expression_result import ExpressionReductionResult, solve_coverage, solve_mcdc, render_report
+from expression_cache import cache_key, get_default_cache
+from cube_cover import CubeCoverage, expression_cubes, select_cube_tests
 from itertools import product
+from functools import lru_cache, partial
+import multiprocessing
+import time
+import ast
 import re
 
+# Python keywords the variable scan must skip
+PYTHON_KEYWORDS = {'and', 'or', 'not', 'True', 'False', 'in', 'is'}
+
+# Coverage modes of reduce_string_expressions, weakest first
+COVERAGE_MODES = ('true-only', 'decision', 'condition', 'mcdc')
+
+# Above this many variables method='auto' tries cubes instead of truth columns
+CUBE_MIN_VARIABLES = 16
+
+# Key of the all-ones column in a truth basis
+FULL_COLUMN = '__full__'
+
+# Distinct expressions whose variables, code and syntax tree stay cached; bounded
+# so a long-lived process that sees ever new expressions does not grow
+EXPRESSION_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _expression_variables(expr_str):
+    """Variable names used in one expression (cached across calls)"""
+    # Find all variable names (letters, possibly with underscores and numbers)
+    vars_in_expr = re.findall(r'\b[A-Za-z][A-Za-z0-9_]*\b', expr_str)
+    return frozenset(v for v in vars_in_expr if v not in PYTHON_KEYWORDS)
+
 def extract_variables(expressions):
     """Extract all variables from expression strings"""
     variables = set()
     for expr in expressions:
-        # Find all variable names (letters, possibly with underscores and numbers)
-        vars_in_expr = re.findall(r'\b[A-Za-z][A-Za-z0-9_]*\b', expr)
-        # Filter out Python keywords
-        python_keywords = {'and', 'or', 'not', 'True', 'False', 'in', 'is'}
-        vars_in_expr = [v for v in vars_in_expr if v not in python_keywords]
-        variables.update(vars_in_expr)
+        variables.update(_expression_variables(expr))
     return sorted(list(variables))
 
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(expr_str):
+    """Compile an expression once for evaluation with variable values"""
+    return compile(expr_str.strip(), '<expression>', 'eval')
+
 def evaluate_expression(expr_str, variable_values):
     """Safely evaluate a boolean expression string with given variable values"""
     try:
-        # Replace variable names with their values in the expression
-        expr = expr_str
-        for var, val in variable_values.items():
-            # Use word boundaries to avoid partial matches
-            expr = re.sub(r'\b' + re.escape(var) + r'\b', str(val), expr)
-        
-        # Evaluate the expression safely
-        result = eval(expr)
+        result = eval(compile_expression(expr_str), {'__builtins__': {}}, dict(variable_values))
         return bool(result)
     except Exception as e:
         print(f"Error evaluating expression '{expr_str}' with values {variable_values}: {e}")
         return False
 
-def reduce_string_expressions(expressions):
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def parse_expression(expr_str):
+    """Parse an expression once, or None if it is not valid Python"""
+    try:
+        return ast.parse(expr_str.strip(), mode='eval').body
+    except SyntaxError:
+        return None
+
+@lru_cache(maxsize=64)
+def truth_basis(variables):
     """
-    Reduce test cases for boolean expressions given as strings
+    Truth columns of the variables over all their combinations
+    
+    Bit t of a variable's column is its value in the t-th combination of
+    product([False, True], repeat=len(variables)). Cached per variable tuple so
+    expression sets over the same variables share one basis.
     
-    Args:
-        expressions: List of string expressions like ['A and B', '(A or B) and C', 'not A']
-        
     Returns:
-        Minimum test cases needed to make each expression True at least once
+        Dict of variable name -> column, plus FULL_COLUMN with every bit set
+    """
+    n = len(variables)
+    n_rows = 2 ** n
+    columns = {FULL_COLUMN: (1 << n_rows) - 1}
+    for k, var in enumerate(variables):
+        half = 2 ** (n - 1 - k)
+        period = 2 * half
+        # One period is `half` False rows then `half` True rows, repeated without carries
+        unit = ((1 << half) - 1) << half
+        repeat = ((1 << n_rows) - 1) // ((1 << period) - 1)
+        columns[var] = unit * repeat
+    return columns
+
+class ExpressionDAG:
+    """
+    Hash-consed DAG of every subexpression in a list of expressions
+    
+    Identical subexpressions - also across expressions, and with the operands of
+    and/or/==/!= in any order - become one node, so evaluating the DAG computes
+    each of them once. Nodes are evaluated bit-parallel on packed truth columns;
+    syntax beyond and/or/not/==/!= becomes an opaque node evaluated row by row.
     """
     
-    print("STRING EXPRESSION REDUCER")
-    print("=" * 50)
-    print("Input expressions:")
-    for i, expr in enumerate(expressions, 1):
-        print(f"  exp{i}: {expr}")
-    print()
+    def __init__(self, expressions):
+        self.nodes = []  # (op, args), children always precede their parents
+        self.roots = []
+        self.tree_size = 0  # Nodes the expressions would have as separate trees
+        self._ids = {}
+        
+        for expr_str in expressions:
+            tree = parse_expression(expr_str)
+            self.roots.append(self._add(tree) if tree is not None else self._opaque(expr_str, 1))
     
-    # Extract all variables from expressions
-    variables = extract_variables(expressions)
-    print(f"Variables found: {variables}")
-    print(f"Total possible combinations: {2**len(variables)}")
-    print()
-    
-    # Generate all possible test combinations
-    all_combinations = list(product([False, True], repeat=len(variables)))
-    
-    # Build test cases
-    test_cases = []
-    for combo in all_combinations:
-        test_case = dict(zip(variables, combo))
-        test_name = ",".join([f"{var}={str(val)[0]}" for var, val in test_case.items()])
-        test_cases.append({"values": test_case, "name": test_name})
-    
-    # Build coverage matrix
-    coverage_matrix = []
-    branch_names = [f"exp{i+1}" for i in range(len(expressions))]
-    
-    print("COVERAGE ANALYSIS:")
-    header = "Test Case" + " " * max(0, 20-len("Test Case")) + "| "
-    header += " | ".join([f"exp{i+1:2d}" for i in range(len(expressions))]) + " | Covers"
-    print(header)
-    print("-" * (25 + len(expressions) * 6 + 15))
-    
-    for tc in test_cases:
-        coverage = []
-        covered_exps = []
+    def _intern(self, key):
+        if key not in self._ids:
+            self._ids[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self._ids[key]
+    
+    def _opaque(self, source, size):
+        self.tree_size += size
+        return self._intern(('opaque', source))
+    
+    def _is_boolean(self, node):
+        """Whether _add turns a syntax node into a bit-parallel node (not an opaque one)"""
+        if isinstance(node, (ast.BoolOp, ast.Name)):
+            return True
+        if isinstance(node, ast.UnaryOp):
+            return isinstance(node.op, ast.Not)
+        if isinstance(node, ast.Constant):
+            return isinstance(node.value, bool)
+        return (isinstance(node, ast.Compare) and len(node.ops) == 1
+                and isinstance(node.ops[0], (ast.Eq, ast.NotEq))
+                and self._is_boolean(node.left) and self._is_boolean(node.comparators[0]))
+    
+    def _add(self, node):
+        if isinstance(node, ast.BoolOp):
+            op = 'and' if isinstance(node.op, ast.And) else 'or'
+            children = tuple(sorted({self._add(v) for v in node.values}))
+            self.tree_size += 1
+            return self._intern((op, children))
         
-        for i, expr_str in enumerate(expressions):
-            result = evaluate_expression(expr_str, tc["values"])
-            coverage.append(result)
-            if result:
-                covered_exps.append(f"exp{i+1}")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            child = self._add(node.operand)
+            self.tree_size += 1
+            return self._intern(('not', child))
         
-        coverage_matrix.append(coverage)
+        # Only booleans compare like bits; other comparisons are one opaque node
+        if isinstance(node, ast.Compare) and self._is_boolean(node):
+            left, right = self._add(node.left), self._add(node.comparators[0])
+            self.tree_size += 1
+            op = 'eq' if isinstance(node.ops[0], ast.Eq) else 'ne'
+            return self._intern((op, tuple(sorted((left, right)))))
         
-        # Display coverage
-        results = " | ".join([f"{str(coverage[i])[0]:4s}" for i in range(len(expressions))])
-        covers = ", ".join(covered_exps) if covered_exps else "none"
-        print(f"{tc['name']:23s} | {results} | {covers}")
-    
-    print()
-    
-    # Check if all expressions can be satisfied
-    satisfiable_expressions = []
-    for i, expr in enumerate(expressions):
-        can_be_true = any(coverage_matrix[j][i] for j in range(len(coverage_matrix)))
-        if can_be_true:
-            satisfiable_expressions.append(i)
-        else:
-            print(f"WARNING: Expression {i+1} '{expr}' can never be True with these variables!")
-    
-    if len(satisfiable_expressions) != len(expressions):
-        print(f"Only {len(satisfiable_expressions)}/{len(expressions)} expressions are satisfiable.")
-        print()
-    
-    # Find minimum test cases
-    test_names = [tc["name"] for tc in test_cases]
-    
-    # Try optimal first (for small problems)
-    if len(test_cases) <= 16:  # Reasonable limit for optimal
-        result = optimal_set_cover(coverage_matrix, test_names, branch_names)
-        if result:
-            selected_tests, coverage_pct, reduction_ratio = result
-            print("OPTIMAL SOLUTION:")
-        else:
-            # Fall back to greedy
-            selected_tests, coverage_pct, reduction_ratio = greedy_set_cover(coverage_matrix, test_names, branch_names)
-            print("GREEDY SOLUTION:")
-    else:
-        # Use greedy for larger problems
-        selected_tests, coverage_pct, reduction_ratio = greedy_set_cover(coverage_matrix, test_names, branch_names)
-        print("GREEDY SOLUTION:")
-    
-    print(f"Minimum test cases needed: {len(selected_tests)}/{len(test_cases)}")
-    print(f"Reduction: {(1-reduction_ratio)*100:.1f}%")
-    print(f"Coverage: {coverage_pct:.1f}%")
-    print()
-    
-    print("SELECTED TEST CASES:")
-    for i, test_name in enumerate(selected_tests, 1):
-        test_idx = test_names.index(test_name)
-        tc = test_cases[test_idx]
+        if isinstance(node, ast.Name):
+            self.tree_size += 1
+            return self._intern(('var', node.id))
+        
+        if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+            self.tree_size += 1
+            return self._intern(('const', node.value))
+        
+        return self._opaque(ast.unparse(node), sum(1 for _ in ast.walk(node)))
+    
+    def atoms(self, root):
+        """Variable and opaque nodes an expression is built from, in order of appearance"""
+        found = []
+        stack = [root]
+        seen = set()
+        while stack:
+            node_id = stack.pop()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            op, args = self.nodes[node_id]
+            if op in ('var', 'opaque'):
+                found.append(node_id)
+            elif op == 'not':
+                stack.append(args)
+            elif op != 'const':
+                stack.extend(reversed(args))
+        return found
+    
+    def evaluate(self, variables):
+        """
+        Evaluate every node over all combinations of the variables
         
-        print(f"  Test {i}: {test_name}")
-        print(f"    Variable values: {tc['values']}")
+        Returns:
+            List with the packed truth column of each expression, in input order
+        """
+        columns = self.evaluate_nodes(variables)
+        return [columns[root] for root in self.roots]
+    
+    def evaluate_nodes(self, variables):
+        """Packed truth column of every node, indexed like self.nodes"""
+        variables = tuple(variables)
+        basis = truth_basis(variables)
+        full = basis[FULL_COLUMN]
+        columns = []
         
-        # Show what this test covers
-        covered = []
-        for j, expr_str in enumerate(expressions):
-            if evaluate_expression(expr_str, tc["values"]):
-                covered.append(f"exp{j+1}")
+        for op, args in self.nodes:
+            if op == 'var':
+                column = basis[args]
+            elif op == 'const':
+                column = full if args else 0
+            elif op == 'not':
+                column = full ^ columns[args]
+            elif op == 'and':
+                column = full
+                for child in args:
+                    column &= columns[child]
+            elif op == 'or':
+                column = 0
+                for child in args:
+                    column |= columns[child]
+            elif op == 'eq':
+                column = full ^ (columns[args[0]] ^ columns[args[1]])
+            elif op == 'ne':
+                column = columns[args[0]] ^ columns[args[1]]
+            else:
+                column = 0
+                for t, combo in enumerate(product([False, True], repeat=len(variables))):
+                    if evaluate_expression(args, dict(zip(variables, combo))):
+                        column |= 1 << t
+            columns.append(column)
         
-        print(f"    Makes True: {', '.join(covered) if covered else 'none'}")
+        return columns
+
+def truth_column(expr_str, variables):
+    """Packed truth column of an expression over all combinations of the variables"""
+    return ExpressionDAG([expr_str]).evaluate(variables)[0]
+
+def _coverage_masks(columns, n_rows):
+    """Transpose expression truth columns into per-test bitmasks"""
+    coverage_masks = []
+    for t in range(n_rows):
+        mask = 0
+        for i, column in enumerate(columns):
+            if column >> t & 1:
+                mask |= 1 << i
+        coverage_masks.append(mask)
+    return coverage_masks
+
+def coverage_targets(dag, node_columns, full, coverage='true-only'):
+    """
+    Truth columns of the coverage targets of a coverage mode
+    
+    Args:
+        dag: ExpressionDAG of the expressions
+        node_columns: Result of dag.evaluate_nodes
+        full: Column with every row set
+        coverage: 'true-only' (each expression True), 'decision' (each expression
+            True and False) or 'condition' (decision plus every atomic condition
+            of each expression True and False)
         
-        # Show expression evaluations
-        for j, expr_str in enumerate(expressions):
-            result = evaluate_expression(expr_str, tc["values"])
-            print(f"      exp{j+1}: {expr_str} = {result}")
-        print()
+    Returns:
+        (target labels, target columns)
+    """
+    if coverage not in COVERAGE_MODES:
+        raise ValueError(f"Unknown coverage mode '{coverage}', expected one of {COVERAGE_MODES}")
+    
+    labels, columns = [], []
+    for i, root in enumerate(dag.roots):
+        column = node_columns[root]
+        labels.append(f"exp{i+1}")
+        columns.append(column)
+        if coverage == 'true-only':
+            continue
+        
+        # The False side is the complement of a column we already have
+        labels.append(f"exp{i+1}=F")
+        columns.append(full ^ column)
+        if coverage == 'condition':
+            for atom in dag.atoms(root):
+                atom_label = dag.nodes[atom][1]
+                labels.extend([f"exp{i+1}:{atom_label}=T", f"exp{i+1}:{atom_label}=F"])
+                columns.extend([node_columns[atom], full ^ node_columns[atom]])
+    
+    return labels, columns
+
+def _reduce_with_cubes(expressions, variables):
+    """True-only reduction from satisfying cubes, or None if some expression has no cube form"""
+    start_time = time.time()
+    dag = ExpressionDAG(expressions)
+    cube_lists = expression_cubes(dag, variables)
+    if cube_lists is None:
+        return None
+    selected = select_cube_tests(cube_lists)
+    
+    coverage = CubeCoverage(cube_lists, len(variables))
+    n_satisfiable = bin(coverage.union).count('1')
+    return ExpressionReductionResult(
+        list(expressions),
+        variables,
+        variables,
+        coverage,
+        selected,
+        "Greedy",
+        n_satisfiable / len(expressions) * 100 if expressions else 100.0,
+        len(selected) / coverage.n_tests,
+        time.time() - start_time,
+        {'cubes': sum(len(cubes) for cubes in cube_lists), 'evaluation_time': time.time() - start_time}
+    )
+
+class _RenameVariables(ast.NodeTransformer):
+    def __init__(self, names):
+        self.names = names
+    
+    def visit_Name(self, node):
+        return ast.copy_location(ast.Name(self.names.get(node.id, node.id), node.ctx), node)
+
+def _rename_label(label, names):
+    """
+    Target label with the variables of its condition renamed
+    
+    Cache entries are shared by alpha-renamed expression sets, so they store labels
+    over the positional names of cache_key (v0, v1, ...) and readers rename them back.
+    
+    Args:
+        label: 'exp1', 'exp1=T' or 'exp1:<condition>' with an optional '=T'/'=F'
+        names: Variable name -> new name
+    """
+    prefix, sep, condition = label.partition(':')
+    if not sep:
+        return label
+    suffix = condition[-2:] if condition[-2:] in ('=T', '=F') else ''
+    condition = condition[:len(condition) - len(suffix)]
+    tree = _RenameVariables(names).visit(ast.parse(condition, mode='eval'))
+    return f"{prefix}:{ast.unparse(tree)}{suffix}"
+
+def reduce_string_expressions(expressions, coverage='true-only', use_cache=True, method='auto'):
+    """
+    Reduce test cases for boolean expressions given as strings
+    
+    Args:
+        expressions: List of string expressions like ['A and B', '(A or B) and C', 'not A']
+        coverage: 'true-only' (make each expression True), 'decision' (True and False),
+            'condition' (decision plus every atomic condition True and False) or
+            'mcdc' (every variable shown to independently affect its expression)
+        use_cache: Reuse and store results in the persistent expression cache
+        method: 'truth-table', 'cubes' (true-only coverage from satisfying cubes, falling
+            back to truth tables for expressions without a cube form) or 'auto' (cubes
+            above CUBE_MIN_VARIABLES variables)
+        
+    Returns:
+        ExpressionReductionResult with the tests needed to meet every coverage target
+        at least once (use render_report to print it)
+    """
+    
+    # Extract all variables from expressions
+    variables = extract_variables(expressions)
+    
+    # Cubes never enumerate the combinations, so they are not worth caching
+    if coverage == 'true-only' and (method == 'cubes' or
+                                    (method == 'auto' and len(variables) > CUBE_MIN_VARIABLES)):
+        result = _reduce_with_cubes(expressions, variables)
+        if result is not None:
+            return result
+    
+    lookup_start = time.time()
+    cache = get_default_cache() if use_cache else None
+    key = cache_key(expressions, variables, mode=coverage) if cache is not None else None
+    cached = cache.get(key) if key is not None else None
+    if cached is not None:
+        columns = [int(column, 16) for column in cached['columns']]
+        caller_names = {f"v{i}": var for i, var in enumerate(variables)}
+        # Time of this lookup; the stored time is that of the run that filled the cache
+        return ExpressionReductionResult(
+            list(expressions),
+            variables,
+            variables,
+            _coverage_masks(columns, 2 ** len(variables)),
+            cached['selected_indices'],
+            cached['algorithm'],
+            cached['coverage_percentage'],
+            cached['reduction_ratio'],
+            time.time() - lookup_start,
+            {'cache_hit': True, 'cached_execution_time': cached['execution_time']},
+            [_rename_label(label, caller_names) for label in cached['targets']],
+            {_rename_label(label, caller_names): tuple(pair)
+             for label, pair in cached.get('independence_pairs', {}).items()},
+            [_rename_label(label, caller_names) for label in cached.get('unresolved_conditions', [])]
+        )
+    
+    # Evaluate the shared subexpression DAG over all combinations at once; every
+    # coverage mode reads its extra columns from this one pass
+    start_time = time.time()
+    dag = ExpressionDAG(expressions)
+    node_columns = dag.evaluate_nodes(variables)
+    if coverage == 'mcdc':
+        columns = [node_columns[root] for root in dag.roots]
+        targets = []
+    else:
+        targets, columns = coverage_targets(dag, node_columns, truth_basis(tuple(variables))[FULL_COLUMN], coverage)
+    evaluation_stats = {
+        'tree_nodes': dag.tree_size,
+        'dag_nodes': len(dag.nodes),
+        'evaluations_saved': dag.tree_size - len(dag.nodes),
+        'evaluation_time': time.time() - start_time,
+    }
+    
+    # Optimal only for small problems, greedy otherwise
+    if coverage == 'mcdc':
+        conditions = [sorted(_expression_variables(expr)) for expr in expressions]
+        result = solve_mcdc(expressions, variables, variables, columns, conditions, optimal_limit=16)
+    else:
+        coverage_masks = _coverage_masks(columns, 2 ** len(variables))
+        result = solve_coverage(expressions, variables, variables, coverage_masks, optimal_limit=16, targets=targets)
+    result.evaluation_stats = evaluation_stats
+    
+    if key is not None:
+        positional_names = {var: f"v{i}" for i, var in enumerate(variables)}
+        cache.put(key, {
+            'columns': [format(column, 'x') for column in columns],
+            'targets': [_rename_label(label, positional_names) for label in targets],
+            'independence_pairs': {_rename_label(label, positional_names): pair
+                                   for label, pair in result.independence_pairs.items()},
+            'unresolved_conditions': [_rename_label(label, positional_names)
+                                      for label in result.unresolved_conditions],
+            'selected_indices': result.selected_indices,
+            'algorithm': result.algorithm,
+            'coverage_percentage': result.coverage_percentage,
+            'reduction_ratio': result.reduction_ratio,
+            'execution_time': result.execution_time,
+        })
+    return result
+
+def reduce_many(expression_lists, workers=None, chunksize=1, coverage='true-only', use_cache=True):
+    """
+    Reduce many expression lists, sharing parsing, compiled expressions and truth bases
+    
+    Args:
+        expression_lists: Iterable of expression lists (each as for reduce_string_expressions)
+        workers: Number of worker processes (default: reduce in this process)
+        chunksize: Expression lists handed to a worker at a time
+        coverage: Coverage mode (see reduce_string_expressions)
+        use_cache: Reuse and store results in the persistent expression cache
+        
+    Yields:
+        ExpressionReductionResult for each list, in submission order
+    """
+    reduce = partial(reduce_string_expressions, coverage=coverage, use_cache=use_cache)
+    if not workers or workers <= 1:
+        for expressions in expression_lists:
+            yield reduce(expressions)
+        return
     
-    return selected_tests
+    # Each worker keeps its own caches warm across the lists it receives
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap(reduce, expression_lists, chunksize):
+            yield result
 
 
 # Example usage
@@ -169,7 +461,7 @@ def example_your_expressions():
         "A and not C"
     ]
     
-    reduce_string_expressions(expressions)
+    render_report(reduce_string_expressions(expressions))
 
 def example_more_complex():
     """Example with more complex expressions"""
@@ -183,7 +475,7 @@ def example_more_complex():
         "(A or B) and not (C and D)"
     ]
     
-    reduce_string_expressions(expressions)
+    render_report(reduce_string_expressions(expressions))
 
 def example_simple():
     """Simple example"""
@@ -196,7 +488,7 @@ def example_simple():
         "not X"
     ]
     
-    reduce_string_expressions(expressions)
+    render_report(reduce_string_expressions(expressions))
 
 if __name__ == "__main__":
     # Test your expressions
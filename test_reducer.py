@@ -2,11 +2,25 @@
 Test Case Reduction Algorithms - finds minimal set of test cases for 100% coverage
 """
 
-from typing import List, Set, Tuple, Optional
+from typing import List, Set, Tuple, Optional, Iterator
 from coverage_analyzer import TestCase, CoverageAnalyzer
+from observers import AnalysisObserver
 from dataclasses import dataclass
 import time
 from itertools import combinations
+import profiling
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+def _bits(bits: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
 
 
 @dataclass
@@ -33,49 +47,55 @@ class TestReducer:
     
     def __init__(self, coverage_analyzer: CoverageAnalyzer):
         self.analyzer = coverage_analyzer
-        self.test_cases, self.branches, self.coverage_matrix = coverage_analyzer.get_coverage_matrix()
+        # Bit j of coverage_rows[i]: test i covers branch j
+        self.test_cases, self.branches, self.coverage_rows = coverage_analyzer.get_coverage_rows()
+        self._all_covered = (1 << len(self.branches)) - 1
+        self.observers = list(coverage_analyzer.observers)
+    
+    def add_observer(self, observer: AnalysisObserver):
+        """Report picks, local-search moves and incumbents to an observer"""
+        self.observers.append(observer)
     
+    def _notify(self, event: str, *args):
+        for observer in self.observers:
+            getattr(observer, event)(*args)
+    
+    @profiling.timed('reduction')
     def reduce_greedy(self) -> ReductionResult:
         """Greedy algorithm: repeatedly pick test case covering most uncovered branches"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         selected_tests = []
-        covered_branches = set()
-        all_branches = set(range(len(self.branches)))
+        covered = 0
         
-        # Create mapping from test index to TestCase
-        available_tests = list(range(len(self.test_cases)))
-        
-        while covered_branches != all_branches and available_tests:
+        iterations = 0
+        while covered != self._all_covered:
+            iterations += 1
             best_test_idx = None
             best_new_coverage = 0
             
-            # Find test case that covers the most new branches
-            for test_idx in available_tests:
-                new_branches = set()
-                for branch_idx in range(len(self.branches)):
-                    if (self.coverage_matrix[test_idx][branch_idx] and 
-                        branch_idx not in covered_branches):
-                        new_branches.add(branch_idx)
-                
-                if len(new_branches) > best_new_coverage:
-                    best_new_coverage = len(new_branches)
+            # Find test case that covers the most new branches (selected tests cover none)
+            for test_idx, row in enumerate(self.coverage_rows):
+                new_coverage = _popcount(row & ~covered)
+                if new_coverage > best_new_coverage:
+                    best_new_coverage = new_coverage
                     best_test_idx = test_idx
             
             if best_test_idx is not None:
                 selected_tests.append(self.test_cases[best_test_idx])
-                available_tests.remove(best_test_idx)
-                
-                # Update covered branches
-                for branch_idx in range(len(self.branches)):
-                    if self.coverage_matrix[best_test_idx][branch_idx]:
-                        covered_branches.add(branch_idx)
+                covered |= self.coverage_rows[best_test_idx]
+                if self.observers:
+                    self._notify('on_pick', "Greedy", best_test_idx, best_new_coverage,
+                                 _popcount(covered), len(self.branches))
             else:
                 break
         
-        end_time = time.time()
+        end_time = time.perf_counter()
+        profiling.count('solver_iterations', iterations)
+        if self.observers:
+            self._notify('on_incumbent', "Greedy", len(selected_tests))
         
-        coverage_pct = len(covered_branches) / len(self.branches) * 100
+        coverage_pct = _popcount(covered) / len(self.branches) * 100
         reduction_ratio = len(selected_tests) / len(self.test_cases)
         
         return ReductionResult(
@@ -86,14 +106,16 @@ class TestReducer:
             end_time - start_time
         )
     
+    @profiling.timed('reduction')
     def reduce_optimal_small(self, max_combinations: int = 1000000) -> Optional[ReductionResult]:
         """Optimal algorithm for small problems - tries all combinations"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         n_tests = len(self.test_cases)
-        n_branches = len(self.branches)
+        rows = self.coverage_rows
         
         # Start with smallest possible sets and work up
+        tried = 0
         for set_size in range(1, n_tests + 1):
             if set_size > 20:  # Practical limit
                 break
@@ -103,18 +125,20 @@ class TestReducer:
                 combinations_count += 1
                 if combinations_count > max_combinations:
                     break
+                tried += 1
                 
                 # Check if this combination covers all branches
-                covered_branches = set()
+                covered = 0
                 for test_idx in test_indices:
-                    for branch_idx in range(n_branches):
-                        if self.coverage_matrix[test_idx][branch_idx]:
-                            covered_branches.add(branch_idx)
+                    covered |= rows[test_idx]
                 
-                if len(covered_branches) == n_branches:
+                if covered == self._all_covered:
                     # Found optimal solution
                     selected_tests = [self.test_cases[i] for i in test_indices]
-                    end_time = time.time()
+                    end_time = time.perf_counter()
+                    profiling.count('solver_iterations', tried)
+                    if self.observers:
+                        self._notify('on_incumbent', "Optimal", set_size)
                     
                     return ReductionResult(
                         selected_tests,
@@ -124,11 +148,13 @@ class TestReducer:
                         end_time - start_time
                     )
         
+        profiling.count('solver_iterations', tried)
         return None  # No solution found within limits
     
+    @profiling.timed('reduction')
     def reduce_heuristic(self) -> ReductionResult:
         """Heuristic algorithm combining greedy with local optimization"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Start with greedy solution
         greedy_result = self.reduce_greedy()
@@ -136,18 +162,25 @@ class TestReducer:
         
         # Try to improve by removing redundant tests
         improved = True
+        iterations = 0
         while improved:
             improved = False
             for i in range(len(current_tests)):
+                iterations += 1
                 # Try removing test i
                 test_without_i = current_tests[:i] + current_tests[i+1:]
                 
                 if self._check_full_coverage(test_without_i):
+                    if self.observers:
+                        self._notify('on_move', "Heuristic", 'remove', current_tests[i].index,
+                                     len(test_without_i))
+                        self._notify('on_incumbent', "Heuristic", len(test_without_i))
                     current_tests = test_without_i
                     improved = True
                     break
         
-        end_time = time.time()
+        end_time = time.perf_counter()
+        profiling.count('solver_iterations', iterations)
         
         coverage_pct = self._calculate_coverage(current_tests)
         reduction_ratio = len(current_tests) / len(self.test_cases)
@@ -160,63 +193,65 @@ class TestReducer:
             end_time - start_time
         )
     
+    @profiling.timed('reduction')
     def reduce_intelligent(self) -> ReductionResult:
         """Intelligent algorithm that considers branch importance and test case efficiency"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # Calculate branch coverage frequency (how many tests cover each branch)
+        # Calculate branch coverage frequency (how many tests cover each branch);
+        # tests with the same coverage are counted together
+        row_counts = {}
+        for row in self.coverage_rows:
+            row_counts[row] = row_counts.get(row, 0) + 1
         branch_frequency = [0] * len(self.branches)
-        for test_idx in range(len(self.test_cases)):
-            for branch_idx in range(len(self.branches)):
-                if self.coverage_matrix[test_idx][branch_idx]:
-                    branch_frequency[branch_idx] += 1
+        for row, count in row_counts.items():
+            for branch_idx in _bits(row):
+                branch_frequency[branch_idx] += count
         
         # Calculate test case efficiency (branches covered / rarity of those branches)
-        test_scores = []
-        for test_idx in range(len(self.test_cases)):
+        row_scores = {}
+        for row in row_counts:
             score = 0
             branches_covered = 0
-            for branch_idx in range(len(self.branches)):
-                if self.coverage_matrix[test_idx][branch_idx]:
-                    branches_covered += 1
-                    # Give higher score to tests covering rare branches
-                    if branch_frequency[branch_idx] > 0:
-                        score += 1.0 / branch_frequency[branch_idx]
+            for branch_idx in _bits(row):
+                branches_covered += 1
+                # Give higher score to tests covering rare branches
+                score += 1.0 / branch_frequency[branch_idx]
             
             # Normalize by number of branches covered
             if branches_covered > 0:
                 score = score / branches_covered
-            test_scores.append((test_idx, score))
+            row_scores[row] = score
+        test_scores = [(test_idx, row_scores[row]) for test_idx, row in enumerate(self.coverage_rows)]
         
         # Sort by efficiency score (descending)
         test_scores.sort(key=lambda x: x[1], reverse=True)
         
         # Select tests in order of efficiency until full coverage
         selected_tests = []
-        covered_branches = set()
+        covered = 0
         
+        iterations = 0
         for test_idx, _ in test_scores:
-            if len(covered_branches) == len(self.branches):
+            if covered == self._all_covered:
                 break
+            iterations += 1
             
             # Check if this test covers any new branches
-            new_coverage = False
-            for branch_idx in range(len(self.branches)):
-                if (self.coverage_matrix[test_idx][branch_idx] and 
-                    branch_idx not in covered_branches):
-                    new_coverage = True
-                    break
-            
+            new_coverage = self.coverage_rows[test_idx] & ~covered
             if new_coverage:
                 selected_tests.append(self.test_cases[test_idx])
-                # Update covered branches
-                for branch_idx in range(len(self.branches)):
-                    if self.coverage_matrix[test_idx][branch_idx]:
-                        covered_branches.add(branch_idx)
+                covered |= new_coverage
+                if self.observers:
+                    self._notify('on_pick', "Intelligent", test_idx, _popcount(new_coverage),
+                                 _popcount(covered), len(self.branches))
         
-        end_time = time.time()
+        end_time = time.perf_counter()
+        profiling.count('solver_iterations', iterations)
+        if self.observers:
+            self._notify('on_incumbent', "Intelligent", len(selected_tests))
         
-        coverage_pct = len(covered_branches) / len(self.branches) * 100
+        coverage_pct = _popcount(covered) / len(self.branches) * 100
         reduction_ratio = len(selected_tests) / len(self.test_cases)
         
         return ReductionResult(
@@ -229,16 +264,13 @@ class TestReducer:
     
     def _check_full_coverage(self, test_cases: List[TestCase]) -> bool:
         """Check if given test cases provide full branch coverage"""
-        covered_branches = set()
-        
+        covered = 0
         for test_case in test_cases:
-            covered_branches.update(test_case.covered_branches)
-        
-        all_branches = set(branch.branch_id for branch in self.analyzer.branches)
-        return covered_branches == all_branches
+            covered |= self.coverage_rows[test_case.index]
+        return covered == self._all_covered
     
     def _calculate_coverage(self, test_cases: List[TestCase]) -> float:
-        """Calculate coverage percentage for given test cases"""
+        """Calculate coverage percentage for given test cases (per distinct branch ID)"""
         covered_branches = set()
         for test_case in test_cases:
             covered_branches.update(test_case.covered_branches)
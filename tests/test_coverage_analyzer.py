@@ -0,0 +1,37 @@
+"""
+Tests for CoverageAnalyzer: compound conditions and test generation
+"""
+
+import os
+import sys
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coverage_analyzer import CoverageAnalyzer
+from logic_parser import LogicParser
+
+
+def _analyze(tmp_path, source, domains):
+    path = tmp_path / 'program.py'
+    path.write_text(textwrap.dedent(source))
+    parser = LogicParser()
+    analyzer = CoverageAnalyzer(parser.parse_file(str(path)), parser.variables)
+    analyzer.generate_all_test_cases(domains)
+    return analyzer
+
+
+def test_compound_conditions_are_evaluated_like_python(tmp_path):
+    domains = {'a': [0, 2], 'b': [True, False], 'c': [True, False]}
+    analyzer = _analyze(tmp_path, """
+        def f(a, b, c):
+            if a > 1 and (b or not c):
+                return 1
+            else:
+                return 0
+    """, domains)
+    assert len(analyzer.test_cases) == 8
+    for test_case in analyzer.test_cases:
+        values = test_case.values
+        taken = 'if' if values['a'] > 1 and (values['b'] or not values['c']) else 'else'
+        assert test_case.covered_branches == {f"program.py:f+1:4:{taken}"}
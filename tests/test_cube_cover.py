@@ -0,0 +1,22 @@
+"""
+Regression tests for the cube-based true-only reduction
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression_result import render_report
+from string_expression_reducer import reduce_string_expressions
+
+
+def test_more_than_63_variables():
+    expressions = [f"V{i} and V{i + 1}" for i in range(0, 70, 2)]
+    result = reduce_string_expressions(expressions, use_cache=False, method='cubes')
+    assert result.total_combinations == 2 ** 70
+    assert result.coverage_percentage == 100.0
+    assert 0 < result.reduction_ratio < 1e-15
+    assert all(result.covered_targets(t) for t in result.selected_indices)
+    render_report(result, stream=io.StringIO())
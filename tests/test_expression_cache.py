@@ -0,0 +1,35 @@
+"""
+Tests for the persistent reduction cache
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression_cache import ReductionCache
+
+
+def last_used(cache, key):
+    return cache._conn.execute("SELECT last_used FROM entries WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_hits_are_written_on_flush(tmp_path):
+    cache = ReductionCache(tmp_path / 'cache.db')
+    cache.put('a', {'value': 1})
+    stored = last_used(cache, 'a')
+
+    assert cache.get('a') == {'value': 1}
+    assert last_used(cache, 'a') == stored
+    cache.flush()
+    assert last_used(cache, 'a') > stored
+
+
+def test_eviction_sees_pending_hits(tmp_path):
+    cache = ReductionCache(tmp_path / 'cache.db', max_bytes=30)
+    cache.put('old', {'value': 1})
+    cache.put('new', {'value': 2})
+    cache.get('old')
+    cache.put('newest', {'value': 3})
+    assert cache.get('old') is not None
+    assert cache.get('new') is None
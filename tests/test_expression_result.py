@@ -0,0 +1,23 @@
+"""
+Regression tests for the MC/DC solver
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from string_expression_reducer import reduce_string_expressions
+
+
+def test_mcdc_without_independence_pairs_selects_nothing():
+    expressions = ["A or not A", "B or not B", "C or not C", "D or not D", "E or not E"]
+    result = reduce_string_expressions(expressions, coverage='mcdc', use_cache=False)
+    assert result.selected_indices == []
+    assert result.unresolved_conditions == ['exp1:A', 'exp2:B', 'exp3:C', 'exp4:D', 'exp5:E']
+
+
+def test_mcdc_set_is_minimum():
+    result = reduce_string_expressions(['A and B and C and D and E', 'A or B'], coverage='mcdc', use_cache=False)
+    assert len(result.selected_indices) == 7
+    assert result.algorithm == "Optimal MC/DC"
@@ -0,0 +1,233 @@
+"""
+Tests for LogicParser: branch extraction, path conditions, branch IDs and condition interning
+"""
+
+import gc
+import os
+import pickle
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logic_parser
+from logic_parser import Branch, CompoundCondition, Condition, LogicParser, condition_by_id
+
+
+def _branches(tmp_path, source, suffix='.py'):
+    path = tmp_path / f"program{suffix}"
+    path.write_text(textwrap.dedent(source))
+    return [str(branch) for branch in LogicParser().parse_file(str(path))]
+
+
+def test_comparisons_with_variables_are_not_contradictions(tmp_path):
+    branches = _branches(tmp_path, """
+        def g(x, y, z):
+            if x == y:
+                if x == z:
+                    return 1
+    """)
+    assert any('x == y AND x == z' in branch for branch in branches)
+
+
+def test_comparisons_with_different_literals_are_contradictions(tmp_path):
+    branches = _branches(tmp_path, """
+        def g(x):
+            if x == 1:
+                if x == 2:
+                    return 1
+            if x == -1:
+                if x > 0:
+                    return 2
+    """)
+    assert len(branches) == 2
+
+
+def test_c_comparisons_with_variables_are_not_contradictions(tmp_path):
+    branches = _branches(tmp_path, """
+        int g(int x, int y, int z) {
+            if (x == y) {
+                if (x == z) {
+                    return 1;
+                }
+            }
+            return 0;
+        }
+    """, suffix='.c')
+    assert any('x == y AND x == z' in branch for branch in branches)
+
+
+def test_assigned_locals_are_rewritten_over_inputs(tmp_path):
+    branches = _branches(tmp_path, """
+        def f(x, y):
+            level = x > 5
+            if level:
+                return 1
+            z = 0
+            if y:
+                z = 1
+            if z == 1:
+                return 2
+    """)
+    assert [branch.split(': ', 1)[1] for branch in branches] == ['x > 5', 'y == True', 'y == True']
+
+
+def test_nested_branches_carry_their_path_conditions(tmp_path):
+    branches = _branches(tmp_path, """
+        def f(x, y):
+            if x > 5:
+                if y == 1:
+                    return 1
+                if x < 3:
+                    if y == 2:
+                        return 2
+            elif x == 2:
+                return 3
+            else:
+                return 4
+    """)
+    # x > 5 AND x < 3 can never hold, so neither that arm nor the if inside it is kept
+    assert [branch.split(': ', 1)[1] for branch in branches] == [
+        'x > 5', 'x > 5 AND y == 1', 'x <= 5 AND x == 2', 'x <= 5 AND x != 2']
+
+
+def test_c_infeasible_arms_are_pruned(tmp_path):
+    branches = _branches(tmp_path, """
+        int f(int x) {
+            if (x >= 10) {
+                if (x < 10) {
+                    return 1;
+                }
+                return 2;
+            } else if (x == 10) {
+                return 3;
+            }
+            return 0;
+        }
+    """, suffix='.c')
+    assert [branch.split(': ', 1)[1] for branch in branches] == ['x >= 10']
+
+
+def _branch_ids(tmp_path, source):
+    path = tmp_path / 'program.py'
+    path.write_text(textwrap.dedent(source))
+    return [branch.branch_id for branch in LogicParser().parse_file(str(path))]
+
+
+def test_branch_ids_are_relative_to_their_function(tmp_path):
+    function = """
+        def f(x):
+            if x == 1:
+                return 1
+            elif x == 2:
+                return 2
+            else:
+                return 3
+    """
+    ids = _branch_ids(tmp_path, function)
+    assert ids == ['program.py:f+1:4:if', 'program.py:f+3:4:elif', 'program.py:f+3:4:else']
+    # Code added above the function moves it, but not its branch IDs
+    assert _branch_ids(tmp_path, "\nimport os\n\n\ndef g():\n    pass\n" + textwrap.dedent(function)) == ids
+
+
+def test_module_level_branch_ids_use_file_lines(tmp_path):
+    assert _branch_ids(tmp_path, """
+        x = 1
+        if x > 0:
+            pass
+    """) == ['program.py:3:0:if']
+
+
+C_SOURCE = """
+    #include <stdio.h>
+    /* if (fake > 1) { } */
+    int f(int x, int y, int mode) {
+        const char *s = "if (z == 1) {";  // if (w == 2)
+        if (x > 0 && !(y == 1)) {
+            return 1;
+        } else if (x == 0 || y >= 3) {
+            return 2;
+        } else {
+            return 3;
+        }
+        switch (mode) {
+            case 1:
+                return 4;
+            case 2:
+                break;
+            default:
+                return 5;
+        }
+    }
+"""
+
+
+def test_c_if_chains_are_parsed_with_their_path_conditions(tmp_path):
+    branches = _branches(tmp_path, C_SOURCE, suffix='.c')
+    assert branches[:3] == [
+        "Branch program.c:6:4:if: (x > 0 AND y != 1)",
+        "Branch program.c:8:11:elif: (x <= 0 OR y == 1) AND (x == 0 OR y >= 3)",
+        "Branch program.c:8:11:else: (x <= 0 OR y == 1) AND (x != 0 AND y < 3)",
+    ]
+
+
+def test_c_comments_and_strings_are_not_parsed(tmp_path):
+    branches = _branches(tmp_path, C_SOURCE, suffix='.c')
+    for name in ('fake', 'z', 'w'):
+        assert not any(f"{name} " in branch for branch in branches)
+
+
+def test_c_switch_cases_are_branches(tmp_path):
+    branches = _branches(tmp_path, C_SOURCE, suffix='.c')
+    assert branches[3:] == [
+        "Branch program.c:14:8:case: mode == 1",
+        "Branch program.c:16:8:case: mode == 2",
+        "Branch program.c:18:8:default: mode != 1 AND mode != 2",
+    ]
+
+
+def test_js_strict_equality_is_parsed(tmp_path):
+    branches = _branches(tmp_path, """
+        function f(x) {
+            if (x === 'a') { return 1; }
+            if (x !== 3) { return 2; }
+        }
+    """, suffix='.js')
+    assert branches == ["Branch program.js:3:4:if: x == a", "Branch program.js:4:4:if: x != 3"]
+
+
+def test_equal_conditions_are_one_interned_object():
+    first = CompoundCondition('and', [Condition('x', '>', '0'), Condition('y', '==', '1')])
+    second = CompoundCondition('and', [Condition('x', '>', '0'), Condition('y', '==', '1')])
+    assert first is second and first.id == second.id
+    assert condition_by_id(first.id) is first
+    assert Condition('x', '>', '0') is not Condition('x', '>', '1')
+
+
+def test_conditions_are_immutable():
+    condition = Condition('x', '>', '0')
+    with pytest.raises(AttributeError):
+        condition.value = '1'
+
+
+def test_pickled_branches_are_interned_again():
+    branch = Branch.from_conditions([Condition('x', '>', '0'), Condition('y', '==', '1')], 'f:1:4:if')
+    copy = pickle.loads(pickle.dumps(branch))
+    assert copy == branch and copy.conditions[0] is branch.conditions[0]
+    data = pickle.dumps(branch)
+    del branch, copy
+    gc.collect()
+    copy = pickle.loads(data)
+    assert copy.condition_ids == tuple(c.id for c in copy.conditions)
+    assert str(copy) == "Branch f:1:4:if: x > 0 AND y == 1"
+
+
+def test_unused_conditions_are_freed():
+    condition = Condition('unused', '==', '42')
+    condition_id = condition.id
+    del condition
+    gc.collect()
+    assert condition_id not in logic_parser._CONDITIONS
+    assert Condition('unused', '==', '42').id != condition_id
@@ -0,0 +1,100 @@
+"""
+Tests for the command line of main.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_main(*args):
+    env = dict(os.environ, LOGIC_REDUCTION_NO_CACHE='1')
+    return subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), *args], env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+
+def _write_tree(root):
+    (root / 'pkg').mkdir()
+    (root / 'one.py').write_text(textwrap.dedent("""
+        def f(a):
+            if a > 1:
+                return 1
+            return 0
+    """))
+    (root / 'pkg' / 'two.py').write_text(textwrap.dedent("""
+        def g(b):
+            if b == 2:
+                return 1
+            elif b == 3:
+                return 2
+            return 0
+    """))
+    (root / 'pkg' / 'latin1.py').write_bytes(b"# \xe9\ndef h(c):\n    if c:\n        return 1\n")
+    (root / 'notes.txt').write_text("if x:\n")
+
+
+def test_dir_analyzes_every_matching_file(tmp_path):
+    _write_tree(tmp_path)
+    output = tmp_path / 'report.json'
+    result = run_main('--dir', str(tmp_path), '--jobs', '2', '--output', str(output))
+    assert result.returncode == 0
+    report = json.loads(output.read_text())
+    assert [os.path.relpath(f['file'], tmp_path) for f in report['files']] == [
+        'one.py', os.path.join('pkg', 'latin1.py'), os.path.join('pkg', 'two.py')]
+    assert report['totals']['files'] == 3
+    assert report['totals']['functions'] == 2
+    assert report['totals']['failed_files'] == 1
+    assert "in 2/3 files" in result.stdout
+
+
+def test_glob_selects_the_files(tmp_path):
+    _write_tree(tmp_path)
+    output = tmp_path / 'report.json'
+    result = run_main('--dir', str(tmp_path), '--glob', 'pkg/two.py', '--jobs', '1', '--output', str(output))
+    assert result.returncode == 0
+    assert [os.path.basename(f['file']) for f in json.loads(output.read_text())['files']] == ['two.py']
+
+
+def test_dir_without_matching_files_fails(tmp_path):
+    _write_tree(tmp_path)
+    result = run_main('--dir', str(tmp_path), '--glob', '*.rs')
+    assert result.returncode == 1
+    assert "No files matching" in result.stdout
+
+
+def test_whole_file_cannot_be_used_with_dir(tmp_path):
+    result = run_main('--dir', str(tmp_path), '--whole-file')
+    assert result.returncode == 2
+    assert "--whole-file analyzes a single file" in result.stderr
+
+
+def test_profile_json_writes_the_phases(tmp_path):
+    _write_tree(tmp_path)
+    output = tmp_path / 'profile.json'
+    result = run_main('-f', str(tmp_path / 'one.py'), '--profile-json', str(output))
+    assert result.returncode == 0
+    assert "Profile:" in result.stdout
+    profile = json.loads(output.read_text())
+    assert profile['phases']['parse']['calls'] == 1
+    assert profile['counters']['tests_generated'] > 0
+
+
+def test_metrics_writes_a_textfile(tmp_path):
+    _write_tree(tmp_path)
+    output = tmp_path / 'run.prom'
+    result = run_main('--dir', str(tmp_path), '--jobs', '1', '--metrics', str(output))
+    assert result.returncode == 0
+    metrics = output.read_text()
+    assert 'logic_reduction_functions{file="' in metrics
+    assert 'level="file"} 1' in metrics
+
+
+def test_metrics_cannot_be_used_with_whole_file(tmp_path):
+    _write_tree(tmp_path)
+    result = run_main('-f', str(tmp_path / 'one.py'), '--whole-file', '--metrics', str(tmp_path / 'run.prom'))
+    assert result.returncode == 2
+    assert "--metrics reports per-function analyses" in result.stderr
@@ -0,0 +1,47 @@
+"""
+Tests for the Prometheus textfile export of run metrics
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics_export import format_metrics, write_metrics
+from scope_analysis import FileResult, ScopeResult
+
+
+def _results():
+    reduced = ScopeResult('f', 1, ['a'], 2, original_test_count=4, algorithm='Greedy',
+                          coverage_percentage=100.0, test_cases=[{}, {}],
+                          profile={'phases': {'reduction': {'calls': 1, 'time_ns': 2000000}}})
+    cached = ScopeResult('g', 8, ['b'], 1, original_test_count=2, algorithm='Greedy',
+                         coverage_percentage=100.0, test_cases=[{}], cached=True)
+    failed = ScopeResult('h', 12, [], 0, error="boom")
+    return [FileResult('a.py', [reduced, cached, failed]), FileResult('b "x".py', error="unreadable")]
+
+
+def test_metrics_are_labelled_by_file():
+    lines = format_metrics(_results(), timestamp=100.0).splitlines()
+    assert 'logic_reduction_functions{file="a.py",algorithm="Greedy"} 2' in lines
+    assert 'logic_reduction_cached_functions{file="a.py"} 1' in lines
+    assert 'logic_reduction_errors{file="a.py",level="function"} 1' in lines
+    assert 'logic_reduction_errors{file="b \\"x\\".py",level="file"} 1' in lines
+    assert 'logic_reduction_last_run_timestamp_seconds 100.0' in lines
+
+
+def test_histograms_are_cumulative():
+    lines = format_metrics(_results(), timestamp=100.0).splitlines()
+    assert 'logic_reduction_test_space_size_bucket{file="a.py",le="1.0"} 0' in lines
+    assert 'logic_reduction_test_space_size_bucket{file="a.py",le="4.0"} 2' in lines
+    assert 'logic_reduction_test_space_size_bucket{file="a.py",le="+Inf"} 2' in lines
+    assert 'logic_reduction_test_space_size_sum{file="a.py"} 6' in lines
+    assert 'logic_reduction_phase_duration_seconds_count{file="a.py",phase="reduction"} 1' in lines
+
+
+def test_write_metrics_replaces_the_file(tmp_path):
+    path = tmp_path / 'run.prom'
+    path.write_text("stale\n")
+    write_metrics(str(path), _results(), timestamp=100.0)
+    assert path.read_text() == format_metrics(_results(), timestamp=100.0)
+    assert os.listdir(tmp_path) == ['run.prom']
@@ -0,0 +1,88 @@
+"""
+Tests for observer callbacks from analyses and reductions
+"""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import observers
+import test_reducer
+from coverage_analyzer import CoverageAnalyzer
+from logic_parser import LogicParser
+from observers import AbortAnalysis, AnalysisObserver
+
+SOURCE = """
+    def f(a, b):
+        if a and b:
+            return 1
+        elif a:
+            return 2
+        return 0
+"""
+
+
+class Recorder(AnalysisObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_progress(self, done, total):
+        self.events.append(('progress', done, total))
+
+    def on_pick(self, algorithm, test_index, gain, covered, total):
+        self.events.append(('pick', algorithm, test_index, gain, covered, total))
+
+    def on_move(self, algorithm, move, test_index, size):
+        self.events.append(('move', algorithm, move, size))
+
+    def on_incumbent(self, algorithm, size):
+        self.events.append(('incumbent', algorithm, size))
+
+
+def _analyzer(tmp_path):
+    path = tmp_path / 'program.py'
+    path.write_text(textwrap.dedent(SOURCE))
+    parser = LogicParser()
+    return CoverageAnalyzer(parser.parse_file(str(path)), parser.variables)
+
+
+def test_enumeration_reports_progress(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    recorder = Recorder()
+    analyzer.add_observer(recorder)
+    analyzer.generate_all_test_cases()
+    assert recorder.events == [('progress', 0, 4), ('progress', 4, 4)]
+
+
+def test_observers_can_abort_an_enumeration(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    analyzer.add_observer(observers.TestLimit(3))
+    with pytest.raises(AbortAnalysis, match="4 test cases exceed the limit of 3"):
+        analyzer.generate_all_test_cases()
+
+
+def test_reducers_report_picks_and_incumbents(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    analyzer.generate_all_test_cases()
+    reducer = test_reducer.TestReducer(analyzer)
+    recorder = Recorder()
+    reducer.add_observer(recorder)
+    result = reducer.reduce_greedy()
+    picks = [event for event in recorder.events if event[0] == 'pick']
+    assert len(picks) == len(result.minimal_test_cases)
+    assert picks[-1][4] == picks[-1][5] == len(analyzer.branches)
+    assert sum(event[3] for event in picks) == len(analyzer.branches)
+    assert recorder.events[-1] == ('incumbent', "Greedy", len(result.minimal_test_cases))
+
+
+def test_reducers_inherit_the_analyzer_observers(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    recorder = Recorder()
+    analyzer.add_observer(recorder)
+    analyzer.generate_all_test_cases()
+    result = test_reducer.TestReducer(analyzer).reduce_intelligent()
+    assert recorder.events[-1] == ('incumbent', "Intelligent", len(result.minimal_test_cases))
@@ -0,0 +1,58 @@
+"""
+Tests for per-phase profiling of library calls
+"""
+
+import os
+import sys
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling
+from scope_analysis import analyze_file
+
+SOURCE = """
+    def f(a, b):
+        if a > 1:
+            return 1
+        elif b == 2:
+            return 2
+        return 0
+
+
+    def g(c):
+        if c:
+            return 1
+        return 0
+"""
+
+
+def _profile(tmp_path, jobs):
+    path = tmp_path / 'program.py'
+    path.write_text(textwrap.dedent(SOURCE))
+    with profiling.profile(trace_memory=False) as profiler:
+        analyze_file(str(path), jobs=jobs, use_cache=False)
+    return profiler.to_dict()
+
+
+def test_library_calls_are_profiled_by_phase(tmp_path):
+    data = _profile(tmp_path, jobs=1)
+    assert list(data['phases']) == ['parse', 'domains', 'enumeration', 'coverage_matrix', 'reduction']
+    assert data['phases']['parse']['calls'] == 1
+    assert data['phases']['reduction']['calls'] == 2
+    assert data['counters']['tests_generated'] > 0
+    assert profiling.current() is None
+
+
+def test_worker_profiles_are_merged(tmp_path):
+    sequential = _profile(tmp_path, jobs=1)
+    parallel = _profile(tmp_path, jobs=2)
+    assert ({name: stats['calls'] for name, stats in parallel['phases'].items()} ==
+            {name: stats['calls'] for name, stats in sequential['phases'].items()})
+    assert parallel['counters'] == sequential['counters']
+
+
+def test_nothing_is_recorded_without_a_profile():
+    with profiling.phase('parse'):
+        profiling.count('tests_generated')
+    assert profiling.current() is None
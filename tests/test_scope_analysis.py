@@ -0,0 +1,91 @@
+"""
+Tests for per-function analysis and its result cache
+"""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expression_cache
+from scope_analysis import analyze_file
+
+SOURCE = """
+    def f(a, b):
+        if a > 1:
+            return 1
+        elif b == 2:
+            return 2
+        return 0
+
+
+    def g(c):
+        if c:
+            return 1
+        return 0
+"""
+
+
+def _write(tmp_path, source=SOURCE):
+    path = tmp_path / 'program.py'
+    path.write_text(textwrap.dedent(source))
+    return str(path)
+
+
+def test_functions_are_reduced_over_their_own_variables(tmp_path):
+    results = analyze_file(_write(tmp_path), jobs=1, use_cache=False)
+    assert [(r.scope, r.variables) for r in results] == [('f', ['a', 'b']), ('g', ['c'])]
+    for result in results:
+        assert result.error is None and result.coverage_percentage == 100.0
+        for test_case in result.test_cases:
+            assert set(test_case['values']) == set(result.variables)
+
+
+def test_worker_processes_give_the_same_results(tmp_path):
+    path = _write(tmp_path)
+    sequential = analyze_file(path, jobs=1, use_cache=False)
+    parallel = analyze_file(path, jobs=2, use_cache=False)
+    assert [r.test_cases for r in parallel] == [r.test_cases for r in sequential]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(expression_cache, '_default_caches', {})
+    monkeypatch.setenv(expression_cache.CACHE_DIR_ENV, str(tmp_path / 'cache'))
+    monkeypatch.delenv(expression_cache.NO_CACHE_ENV, raising=False)
+    return tmp_path / 'cache'
+
+
+def test_unchanged_functions_are_reused(tmp_path, cache_dir):
+    path = _write(tmp_path)
+    first = analyze_file(path, jobs=1)
+    second = analyze_file(path, jobs=1)
+    assert [r.cached for r in first] == [False, False]
+    assert [r.cached for r in second] == [True, True]
+    assert [r.test_cases for r in second] == [r.test_cases for r in first]
+
+
+def test_only_edited_functions_are_analyzed_again(tmp_path, cache_dir):
+    path = _write(tmp_path)
+    analyze_file(path, jobs=1)
+    _write(tmp_path, SOURCE.replace("if c:", "if not c:"))
+    assert [r.cached for r in analyze_file(path, jobs=1)] == [True, False]
+
+
+def test_moved_functions_are_reused_at_their_new_line(tmp_path, cache_dir):
+    path = _write(tmp_path)
+    analyze_file(path, jobs=1)
+    _write(tmp_path, "\n    import os\n" + SOURCE)
+    results = analyze_file(path, jobs=1)
+    assert [r.cached for r in results] == [True, True]
+    assert [r.lineno for r in results] == [4, 12]
+
+
+def test_other_options_are_not_reused(tmp_path, cache_dir):
+    path = _write(tmp_path)
+    analyze_file(path, jobs=1)
+    assert [r.cached for r in analyze_file(path, algorithm='greedy', jobs=1)] == [False, False]
+    assert [r.cached for r in analyze_file(path, domains={'c': [True, False]}, jobs=1)] == [False, False]
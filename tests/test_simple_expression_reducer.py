@@ -0,0 +1,49 @@
+"""
+Regression tests for the dependency tracer and the traced-function reducer
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simple_expression_reducer import reduce_expressions, trace_dependencies
+
+
+def test_identity_tests_fall_back_to_every_variable():
+    assert trace_dependencies(lambda A, B: A is True or B, ['A', 'B']) == ['A', 'B']
+
+
+def test_unread_variables_are_dropped():
+    assert trace_dependencies(lambda A, B, C: A and not B, ['A', 'B', 'C']) == ['A', 'B']
+
+
+def pairwise_expressions(n_pairs):
+    names = [f"V{i}" for i in range(2 * n_pairs)]
+    expressions = [eval(f"lambda {', '.join(names)}: {names[2 * k]} and not {names[2 * k + 1]}")
+                   for k in range(n_pairs)]
+    return expressions, names
+
+
+def test_independent_expressions_are_reduced_per_group():
+    expressions, names = pairwise_expressions(20)
+    result = reduce_expressions(expressions, names)
+    assert result.total_combinations == 2 ** 40
+    assert result.algorithm == "Optimal"
+    assert result.coverage_percentage == 100.0
+    assert len(result.selected_indices) == 1
+    assignment = result.assignment(result.selected_indices[0])
+    assert all(expr(**assignment) for expr in expressions)
+
+
+def test_independent_mcdc_pairs_differ_in_one_variable():
+    expressions, names = pairwise_expressions(12)
+    result = reduce_expressions(expressions, names, coverage='mcdc')
+    assert result.coverage_percentage == 100.0
+    assert len(result.independence_pairs) == 24
+    for label, (t_false, t_true) in result.independence_pairs.items():
+        i, var = int(label[3:label.index(':')]) - 1, label.split(':')[1]
+        low, high = result.assignment(t_false), result.assignment(t_true)
+        assert {name for name in names if low[name] != high[name]} == {var}
+        assert expressions[i](**low) != expressions[i](**high)
+        assert t_false in result.selected_indices and t_true in result.selected_indices
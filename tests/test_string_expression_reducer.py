@@ -0,0 +1,104 @@
+"""
+Regression tests for the expression cache path of reduce_string_expressions
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import string_expression_reducer
+from expression_cache import ReductionCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ReductionCache(tmp_path / 'reductions.db')
+    monkeypatch.setattr(string_expression_reducer, 'get_default_cache', lambda: cache)
+    return cache
+
+
+def test_cache_hit_reports_lookup_time(cache):
+    expressions = ['A and B', 'A or C']
+
+    first = string_expression_reducer.reduce_string_expressions(expressions)
+    key = cache_key(expressions, ['A', 'B', 'C'], mode='true-only')
+    stored = cache.get(key)
+    stored['execution_time'] = 1000.0
+    cache.put(key, stored)
+
+    second = string_expression_reducer.reduce_string_expressions(expressions)
+    assert not first.evaluation_stats.get('cache_hit')
+    assert second.evaluation_stats == {'cache_hit': True, 'cached_execution_time': 1000.0}
+    assert second.execution_time < 1000.0
+    assert second.selected_indices == first.selected_indices
+
+
+def test_cache_hit_names_conditions_of_renamed_expressions(cache):
+    first = string_expression_reducer.reduce_string_expressions(['A and not B', 'A or C == 1'],
+                                                                coverage='condition')
+    second = string_expression_reducer.reduce_string_expressions(['X and not Y', 'X or Z == 1'],
+                                                                 coverage='condition')
+    assert second.evaluation_stats.get('cache_hit')
+    renamed = {'A': 'X', 'B': 'Y', 'C': 'Z'}
+    assert second.targets == [''.join(renamed.get(c, c) for c in label) for label in first.targets]
+    assert 'exp1:Y=T' in second.targets and 'exp2:Z == 1=F' in second.targets
+
+
+def test_cache_hit_names_mcdc_conditions_of_renamed_expressions(cache):
+    first = string_expression_reducer.reduce_string_expressions(['A and B or C', 'A or not A'],
+                                                                coverage='mcdc')
+    second = string_expression_reducer.reduce_string_expressions(['P and Q or R', 'P or not P'],
+                                                                 coverage='mcdc')
+    assert second.evaluation_stats.get('cache_hit')
+    assert second.independence_pairs == {label.replace('A', 'P').replace('B', 'Q').replace('C', 'R'): pair
+                                         for label, pair in first.independence_pairs.items()}
+    assert set(second.independence_pairs) == {'exp1:P', 'exp1:Q', 'exp1:R'}
+    assert second.unresolved_conditions == ['exp2:P']
+
+
+def test_non_boolean_comparison_is_one_opaque_node():
+    dag = string_expression_reducer.ExpressionDAG(['A == 1', 'A == B'])
+    assert dag.nodes == [('opaque', 'A == 1'), ('var', 'A'), ('var', 'B'), ('eq', (1, 2))]
+    assert dag.evaluate(['A', 'B']) == [0b1100, 0b1001]
+
+
+def test_expression_caches_are_bounded():
+    size = string_expression_reducer.EXPRESSION_CACHE_SIZE
+    for i in range(size + 10):
+        string_expression_reducer.reduce_string_expressions([f"A{i} and B"], use_cache=False)
+    for cached in (string_expression_reducer._expression_variables,
+                   string_expression_reducer.compile_expression,
+                   string_expression_reducer.parse_expression):
+        assert cached.cache_info().currsize <= size
+
+
+def _values(expression, assignment):
+    return bool(eval(expression, {}, dict(assignment)))
+
+
+def test_decision_coverage_makes_each_expression_true_and_false():
+    expressions = ['A and B', 'A or C']
+    result = string_expression_reducer.reduce_string_expressions(expressions, coverage='decision',
+                                                                 use_cache=False)
+    assert result.targets == ['exp1', 'exp1=F', 'exp2', 'exp2=F']
+    for expression in expressions:
+        outcomes = {_values(expression, assignment) for assignment in result.selected_assignments}
+        assert outcomes == {False, True}
+
+
+def test_condition_coverage_sets_each_condition_both_ways():
+    expressions = ['A and B', 'A or C']
+    result = string_expression_reducer.reduce_string_expressions(expressions, coverage='condition',
+                                                                 use_cache=False)
+    assert result.coverage_percentage == 100.0
+    assert 'exp2:C=T' in result.targets and 'exp2:C=F' in result.targets
+    for var in 'ABC':
+        assert {assignment[var] for assignment in result.selected_assignments} == {False, True}
+
+
+def test_unknown_coverage_mode():
+    with pytest.raises(ValueError):
+        string_expression_reducer.reduce_string_expressions(['A'], coverage='branch', use_cache=False)